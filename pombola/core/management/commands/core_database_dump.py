@@ -49,6 +49,28 @@ class Command(BaseCommand):
             # other data in the database; it can be recreated with
             # the popolo_name_resolver_init management command.
             'popolo_name_resolver_entityname',
+            # Likewise, this can be recreated with the
+            # core_update_current_memberships management command.
+            'core_currentmembership',
+            # ... with core_update_boundary_overlaps:
+            'core_placeboundaryoverlap',
+            # ... with hansard_update_term_counts:
+            'hansard_sittingtermcount',
+            # ... with hansard_update_appearance_counts:
+            'hansard_monthlyappearancecount',
+            # ... with interests_register_update_summaries:
+            'interests_register_personcategorysummary',
+            'interests_register_sourcecategorysummary',
+            # ... with south_africa_update_election_statistics:
+            'south_africa_electionpartystatistics',
+            'south_africa_electionstatistics',
+            'south_africa_electionstatistics_party_switchers',
+            # ... with south_africa_refresh_pmg_attendance:
+            'south_africa_pmgattendance',
+            # ... and with za_hansard_update_section_summaries:
+            'za_hansard_sectionsummary',
+            # This is just a queue of pending search index updates:
+            'search_indexqueueitem',
             'writeinpublic_configuration',
         ])
         if settings.COUNTRY_APP in ('nigeria',):
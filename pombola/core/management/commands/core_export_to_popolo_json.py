@@ -1,12 +1,13 @@
 # This command creates a new PopIt instance based on the Person,
 # Position and Organisation models in Pombola.
 
-import json
 from optparse import make_option
-from os.path import exists, isdir, join
+from os.path import exists, isdir
 import urlparse
 
-from pombola.core.popolo import get_popolo_data
+from pombola.core.popolo_json import (
+    export_pombola_json, export_popolo_collections
+)
 
 from django.core.management.base import BaseCommand, CommandError
 
@@ -22,6 +23,12 @@ class Command(BaseCommand):
                 action="store_true",
                 help="Make a single file with inline memberships"
             ),
+            make_option(
+                "--gzip",
+                dest="gzip",
+                action="store_true",
+                help="Write gzip-compressed files (with .gz appended to their names)"
+            ),
     )
 
     def handle(self, *args, **options):
@@ -41,36 +48,16 @@ class Command(BaseCommand):
         primary_id_scheme = '.'.join(reversed(parsed_url.netloc.split('.')))
 
         if options['pombola']:
-            for inline_memberships, leafname in (
-                    (True, 'pombola.json'),
-                    (False, 'pombola-no-inline-memberships.json'),
-            ):
-                popolo_data = get_popolo_data(
-                    primary_id_scheme,
-                    pombola_url,
-                    inline_memberships=inline_memberships
-                )
-                output_filename = join(output_directory, leafname)
-                with open(output_filename, 'w') as f:
-                    json.dump(popolo_data, f, indent=4, sort_keys=True)
+            export_pombola_json(
+                output_directory,
+                primary_id_scheme,
+                pombola_url,
+                use_gzip=options['gzip']
+            )
         else:
-            popolo_data = get_popolo_data(
+            export_popolo_collections(
+                output_directory,
                 primary_id_scheme,
                 pombola_url,
-                inline_memberships=False
+                use_gzip=options['gzip']
             )
-            for collection, data in popolo_data.items():
-                for mongoexport_format in (True, False):
-                    if mongoexport_format:
-                        output_basename = 'mongo-' + collection + '.dump'
-                    else:
-                        output_basename = collection + ".json"
-                    output_filename = join(output_directory, output_basename)
-                    with open(output_filename, 'w') as f:
-                        if mongoexport_format:
-                            for item in data:
-                                item['_id'] = item['id']
-                                json.dump(item, f, sort_keys=True)
-                                f.write("\n")
-                        else:
-                            json.dump(data, f, indent=4, sort_keys=True)
@@ -6,6 +6,7 @@
 # This script just extends the generation_high to generation 2 for
 # every area where it was set to generation 2.
 
+from django.core.management import call_command
 from django.core.management.base import NoArgsCommand
 from mapit.models import Area, Generation
 
@@ -18,3 +19,6 @@ class Command(NoArgsCommand):
         for area in Area.objects.filter(generation_high=g1):
             area.generation_high = g2
             area.save()
+        # The boundary changes shown on place pages depend on the
+        # generations, so recompute them:
+        call_command('core_update_boundary_overlaps')
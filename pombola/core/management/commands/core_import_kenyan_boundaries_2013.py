@@ -82,3 +82,6 @@ class Command(NoArgsCommand):
                         area.save()
                     else:
                         print >> sys.stderr, "   ... change not saved, since --commit wasn't specified"
+
+        if options['commit']:
+            call_command('core_update_boundary_overlaps')
@@ -55,6 +55,7 @@ class Command(PersonSpeakerMappingsMixin, MergeCommandBase):
                         "speaker. Not moving speeches."
 
         core_models.Position.objects.filter(person=to_delete).update(person=to_keep)
+        core_models.CurrentMembership.objects.update_for_people([to_keep.id])
 
         # Then those in hansard, if that application is installed:
         #    hansard_models.Alias
@@ -0,0 +1,30 @@
+# This command works out how each place overlaps with the places of
+# the same kind in other parliamentary sessions, which is shown as the
+# boundary changes on place pages. It should be run after importing
+# new boundaries or places, and once after the PlaceBoundaryOverlap
+# table is first created.
+
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.core.models import Place, PlaceBoundaryOverlap
+
+
+class Command(NoArgsCommand):
+
+    help = 'Recompute the overlaps between places in different sessions'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--place-kind', dest='place_kind',
+                    help='Only update places of the kind with this slug'),
+    )
+
+    def handle_noargs(self, **options):
+        places = Place.objects.all()
+        if options['place_kind']:
+            places = places.filter(kind__slug=options['place_kind'])
+        PlaceBoundaryOverlap.objects.rebuild(places)
+        if int(options['verbosity']) > 1:
+            print "There are now {0} boundary overlaps".format(
+                PlaceBoundaryOverlap.objects.count())
@@ -0,0 +1,20 @@
+# This command recomputes the CurrentMembership table, which records
+# the parties, coalitions and constituencies each person is currently
+# associated with. It should be run daily, since positions start and
+# end as the date changes without anything being saved, and once
+# after the CurrentMembership table is first created.
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.core.models import CurrentMembership
+
+
+class Command(NoArgsCommand):
+
+    help = 'Rebuild the current membership index from active positions'
+
+    def handle_noargs(self, **options):
+        CurrentMembership.objects.rebuild()
+        if int(options['verbosity']) > 1:
+            print "There are now {0} current memberships".format(
+                CurrentMembership.objects.count())
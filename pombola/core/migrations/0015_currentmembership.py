@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_auto_20190906_1342'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentMembership',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('kind', models.CharField(max_length=20, choices=[(b'party', b'Party membership'), (b'coalition', b'Coalition membership'), (b'politician', b'Political position'), (b'constituency', b'Political position with a place')])),
+                ('organisation', models.ForeignKey(related_name='current_memberships', blank=True, to='core.Organisation', null=True)),
+                ('person', models.ForeignKey(related_name='current_memberships', to='core.Person')),
+                ('place', models.ForeignKey(related_name='current_memberships', blank=True, to='core.Place', null=True)),
+                ('position', models.ForeignKey(related_name='current_memberships', to='core.Position')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='currentmembership',
+            index_together=set([('person', 'kind')]),
+        ),
+    ]
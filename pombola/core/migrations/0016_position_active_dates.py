@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import calendar
+import datetime
+
+from django.db import migrations, models
+
+
+# A copy of pombola.core.models.approximate_date_to_date, so that this
+# migration doesn't depend on the current models module.
+def approximate_date_to_date(approx_date, assume):
+    earliest = (assume == 'earliest')
+    if (earliest and not approx_date) or (approx_date and approx_date.past):
+        return datetime.date.min
+    if (not earliest and not approx_date) or (approx_date and approx_date.future):
+        return datetime.date.max
+    year, month, day = approx_date.year, approx_date.month, approx_date.day
+    # If we just have a year:
+    if month == 0 and day == 0:
+        if earliest:
+            return datetime.date(year, 1, 1)
+        else:
+            return datetime.date(year, 12, 31)
+    # If we just have a month and a year:
+    if day == 0:
+        if earliest:
+            return datetime.date(year, month, 1)
+        else:
+            last_day = calendar.monthrange(year, month)[1]
+            return datetime.date(year, month, last_day)
+    # Otherwise we must have a complete date:
+    return datetime.date(year, month, day)
+
+
+def set_active_dates(apps, schema_editor):
+    Position = apps.get_model('core', 'Position')
+    start_field = Position._meta.get_field('start_date')
+    end_field = Position._meta.get_field('end_date')
+    for position in Position.objects.all().iterator():
+        start = start_field.to_python(position.start_date)
+        end = end_field.to_python(position.end_date)
+        Position.objects.filter(pk=position.pk).update(
+            active_start_date=approximate_date_to_date(start, 'earliest'),
+            active_end_date=approximate_date_to_date(end, 'latest'),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_currentmembership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='position',
+            name='active_end_date',
+            field=models.DateField(null=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='position',
+            name='active_start_date',
+            field=models.DateField(null=True, editable=False),
+        ),
+        migrations.RunPython(
+            set_active_dates,
+            migrations.RunPython.noop,
+        ),
+        migrations.AlterIndexTogether(
+            name='position',
+            index_together=set([('active_start_date', 'active_end_date')]),
+        ),
+    ]
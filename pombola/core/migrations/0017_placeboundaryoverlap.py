@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_position_active_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceBoundaryOverlap',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('percent', models.FloatField()),
+                ('other_place', models.ForeignKey(related_name='+', to='core.Place')),
+                ('place', models.ForeignKey(related_name='boundary_overlaps', to='core.Place')),
+                ('session', models.ForeignKey(related_name='+', to='core.ParliamentarySession')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='placeboundaryoverlap',
+            index_together=set([('place', 'session')]),
+        ),
+    ]
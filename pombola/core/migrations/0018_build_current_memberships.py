@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import datetime
+
+from django.db import migrations
+
+
+def kinds_for_position(position):
+    # This is the same as CurrentMembership.kinds_for_position at the
+    # time this migration was written.
+    kinds = []
+    title_slug = position.title.slug if position.title else None
+    if title_slug == 'member' and position.organisation \
+            and position.organisation.kind.slug == 'party':
+        kinds.append('party')
+    if title_slug == 'coalition-member' and position.organisation:
+        kinds.append('coalition')
+    if position.category == 'political':
+        kinds.append('politician')
+        if position.place_id:
+            kinds.append('constituency')
+    return kinds
+
+
+def build_current_memberships(apps, schema_editor):
+    Position = apps.get_model('core', 'Position')
+    CurrentMembership = apps.get_model('core', 'CurrentMembership')
+    today = datetime.date.today()
+    positions = Position.objects \
+        .filter(active_start_date__lte=today, active_end_date__gte=today) \
+        .select_related('title', 'organisation__kind') \
+        .order_by()
+    CurrentMembership.objects.all().delete()
+    CurrentMembership.objects.bulk_create(
+        (
+            CurrentMembership(
+                person_id=position.person_id,
+                position_id=position.id,
+                kind=kind,
+                organisation_id=position.organisation_id,
+                place_id=position.place_id,
+            )
+            for position in positions.iterator()
+            for kind in kinds_for_position(position)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_placeboundaryoverlap'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            build_current_memberships,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -14,7 +14,7 @@ from django.core.validators import MinValueValidator
 
 from django.db.models import Q
 from django.db import transaction
-from django.db.models.signals import post_init
+from django.db.models.signals import post_init, post_save
 
 from django.utils.dateformat import DateFormat
 
@@ -326,7 +326,15 @@ class InformationSource(ModelBase):
 
 class PersonQuerySet(models.query.GeoQuerySet):
     def is_politician(self, when=None):
-        # FIXME - Don't like the look of this, rather a big subquery.
+        # For the current date we can use the precomputed
+        # CurrentMembership table; for any other date we have to fall
+        # back to the (rather big) subquery over positions.
+        if when is None or when == datetime.date.today():
+            return self.filter(
+                id__in=CurrentMembership.objects.filter(
+                    kind='politician'
+                ).values('person_id')
+            )
         return self.filter(position__in=Position.objects.all().current_politician_positions(when))
 
 class PersonManager(ManagerBase):
@@ -535,12 +543,18 @@ class Person(ModelBase, HasImageMixin, ScorecardMixin, IdentifierMixin):
         return self.politician_positions()
 
     def is_politician(self):
-        return self.politician_positions().exists()
+        return self.current_memberships.filter(kind='politician').exists()
+
+    def current_membership_organisations(self, *kinds):
+        """Return organisations of this person's current memberships of the given kinds"""
+        return Organisation.objects.filter(
+            current_memberships__person=self,
+            current_memberships__kind__in=kinds,
+        ).distinct()
 
     def parties(self):
         """Return list of parties that this person is currently a member of"""
-        party_memberships = self.position_set.all().currently_active().filter(title__slug='member').filter(organisation__kind__slug='party')
-        return Organisation.objects.filter(position__in=party_memberships)
+        return self.current_membership_organisations('party')
 
     def parties_ever(self):
         """Return list of parties that this person has ever been a member of"""
@@ -549,29 +563,18 @@ class Person(ModelBase, HasImageMixin, ScorecardMixin, IdentifierMixin):
 
     def coalitions(self):
         """Return list of coalitions that this person is currently a member of"""
-        coalition_memberships = self.position_set.all().currently_active().filter(title__slug='coalition-member')
-        return Organisation.objects.filter(position__in=coalition_memberships)
+        return self.current_membership_organisations('coalition')
 
     def parties_and_coalitions(self):
         """Return list of parties and coalitions that this person is currently a member of"""
-        party_memberships = (
-            self
-            .position_set
-            .all()
-            .currently_active()
-            .filter(
-              # select the political party memberships
-              ( Q(title__slug='member') & Q(organisation__kind__slug='party') )
-
-              # select the coalition memberships
-              | Q(title__slug='coalition-member')
-            )
-        )
-        return Organisation.objects.filter(position__in=party_memberships).distinct()
+        return self.current_membership_organisations('party', 'coalition')
 
     def constituencies(self):
         """Return list of constituencies that this person is currently an politician for"""
-        return Place.objects.filter(position__in=self.politician_positions()).distinct()
+        return Place.objects.filter(
+            current_memberships__person=self,
+            current_memberships__kind='constituency',
+        ).distinct()
 
     def constituency_offices(self):
         """
@@ -1052,27 +1055,20 @@ class Place(ModelBase, HasImageMixin, ScorecardMixin, BudgetsMixin, IdentifierMi
         if self.mapit_area is None:
             return result
 
+        # The overlaps are precomputed by core_update_boundary_overlaps:
+        overlaps = defaultdict(list)
+        for overlap in self.boundary_overlaps.filter(
+                session__in=[s for s in (previous_session, next_session) if s]
+        ).select_related('other_place'):
+            overlaps[overlap.session_id].append(
+                (overlap.percent, overlap.other_place))
+
         for key, session in (('previous', previous_session),
                              ('next', next_session)):
             if not session:
                 result[key] = None
                 continue
-            intersections = []
-            for area in mapit_models.Area.objects.intersect('intersects',
-                                               self.mapit_area,
-                                               [self.mapit_area.type.code],
-                                               mapit_models.Generation.objects.get(pk=session.mapit_generation)):
-                # Now work out the % intersection between the two:
-                self_geos_geometry = self.mapit_area.polygons.collect()
-                if self_geos_geometry.area == 0:
-                    continue
-                other_geos_geometry = area.polygons.collect()
-                intersection = self_geos_geometry.intersection(other_geos_geometry)
-                proportion_shared = intersection.area / self_geos_geometry.area
-                intersections.append((100 * proportion_shared,
-                                      Place.objects.get(kind=self.kind,
-                                                        parliamentary_session=session,
-                                                        mapit_area=area)))
+            intersections = overlaps[session.id]
             intersections.sort(key=lambda x: -x[0])
             result[key] = {'session': session,
                            'connector': connectors[key][session.relative_time()],
@@ -1213,63 +1209,43 @@ class PositionQuerySet(models.query.GeoQuerySet):
         if when == None:
             when = datetime.date.today()
 
-        now_approx = repr(ApproximateDate(year=when.year, month=when.month, day=when.day))
-
-        qs = (
-            self
-                .filter(sorting_start_date__lte=now_approx)
-                .filter(Q(sorting_end_date_high__gte=now_approx) | Q(end_date=''))
+        return self.filter(
+            active_start_date__lte=when,
+            active_end_date__gte=when,
         )
 
-        return qs
-
     def currently_inactive(self, when=None):
         """Filter on start and end dates to limit to currently inactive positions"""
 
         if when == None:
             when = datetime.date.today()
 
-        now_approx = repr(ApproximateDate(year=when.year, month=when.month, day=when.day))
-
-        start_criteria = Q(start_date__gt=now_approx)
-        end_criteria = Q(sorting_end_date_high__lt=now_approx) & ~Q(end_date='')
-
-        qs = self.filter(start_criteria | end_criteria)
-
-        return qs
+        return self.filter(
+            Q(active_start_date__gt=when) | Q(active_end_date__lt=when)
+        )
 
     def previous(self, when=None):
         """Filter end dates to limit to positions which are already over."""
 
         when = when or datetime.date.today()
 
-        when_approx = repr(ApproximateDate(year=when.year, month=when.month, day=when.day))
-
-        end_criteria = Q(sorting_end_date_high__lt=when_approx) & ~Q(end_date='')
-
-        return self.filter(end_criteria)
+        return self.filter(active_end_date__lt=when)
 
     def future(self, when=None):
         """Positions which have not yet started."""
 
         when = when or datetime.date.today()
 
-        when_approx = repr(ApproximateDate(year=when.year, month=when.month, day=when.day))
-
-        start_criteria = Q(sorting_start_date__gt=when_approx)
-
-        return self.filter(start_criteria)
+        return self.filter(active_start_date__gt=when)
 
     def overlapping_dates(self, start_date, end_date):
-        start_criteria = \
-            Q(start_date='') | \
-            Q(start_date='past') | \
-            Q(sorting_start_date__lte=end_date)
-        end_criteria = \
-            Q(end_date='') | \
-            Q(end_date='future') | \
-            Q(sorting_end_date_high__gte=start_date)
-        return self.filter(start_criteria & end_criteria)
+        # Positions that haven't started yet have an active_start_date
+        # of datetime.date.max, which would otherwise overlap with a
+        # range ending in 9999-12-31 (as current sessions do).
+        return self.filter(
+            active_start_date__lte=end_date,
+            active_end_date__gte=start_date,
+        ).exclude(active_start_date=datetime.date.max)
 
     def aspirant_positions(self):
         """
@@ -1378,6 +1354,21 @@ class Position(ModelBase, IdentifierMixin):
     sorting_start_date_high = models.CharField(editable=True, default='', max_length=10)
     sorting_end_date_high = models.CharField(editable=True, default='', max_length=10)
 
+    # hidden fields that are only used for filtering by date. Filled in by
+    # code.
+    #
+    # These are the earliest date the position could have started and the
+    # latest date it could have ended, as real dates so that "who held this
+    # position on a given date" can be answered with a range scan on an
+    # index. Unknown start dates and 'past' become datetime.date.min, and
+    # unknown end dates and 'future' become datetime.date.max; a position
+    # that starts in the 'future' has a start of datetime.date.max, and one
+    # that ended in the 'past' has an end of datetime.date.min, so neither
+    # is ever active. See the '_set_active_dates' method below.
+    #
+    active_start_date = models.DateField(editable=False, null=True)
+    active_end_date = models.DateField(editable=False, null=True)
+
     identifiers = GenericRelation(Identifier)
 
     objects = PositionQuerySet.as_manager()
@@ -1546,12 +1537,23 @@ class Position(ModelBase, IdentifierMixin):
         self.sorting_start_date_high = re.sub('-00', '-99', sorting_start_date)
         self.sorting_end_date_high   = re.sub('-00', '-99', sorting_end_date)
 
+    def _set_active_dates(self):
+        """Set the active date range from the actual dates (does not call save())"""
+        # The dates may still be strings (e.g. the default of 'future')
+        # if they haven't been through the field's to_python yet:
+        start = self._meta.get_field('start_date').to_python(self.start_date)
+        end = self._meta.get_field('end_date').to_python(self.end_date)
+        self.active_start_date = approximate_date_to_date(start, 'earliest')
+        self.active_end_date = approximate_date_to_date(end, 'latest')
+
     def is_nominated_politician(self):
         return self.title.slug == 'nominated-member-parliament'
 
     def save(self, *args, **kwargs):
         self._set_sorting_dates()
+        self._set_active_dates()
         super(Position, self).save(*args, **kwargs)
+        CurrentMembership.objects.update_for_position(self)
 
     def __unicode__(self):
         title = self.title or '???'
@@ -1565,6 +1567,133 @@ class Position(ModelBase, IdentifierMixin):
 
     class Meta:
         ordering = ['-sorting_end_date', '-sorting_start_date']
+        index_together = [
+            ('active_start_date', 'active_end_date'),
+        ]
+
+
+class CurrentMembershipManager(models.Manager):
+
+    def update_for_people(self, person_ids):
+        """Recompute the current memberships of the given people"""
+        person_ids = set(person_ids)
+        if not person_ids:
+            return
+        positions = Position.objects.filter(person__in=person_ids) \
+            .currently_active() \
+            .select_related('title', 'organisation__kind') \
+            .order_by()
+        with transaction.atomic():
+            self.filter(person__in=person_ids).delete()
+            self.bulk_create(
+                self.model(
+                    person_id=position.person_id,
+                    position=position,
+                    kind=kind,
+                    organisation_id=position.organisation_id,
+                    place_id=position.place_id,
+                )
+                for position in positions
+                for kind in CurrentMembership.kinds_for_position(position)
+            )
+
+    def update_for_position(self, position):
+        """Recompute current memberships after a position has been saved
+
+        Any rows for this position are removed first in case the
+        position has been moved from one person to another."""
+        self.filter(position=position).delete()
+        self.update_for_people([position.person_id])
+
+    def rebuild(self):
+        """Recompute current memberships for everyone
+
+        This needs to be run daily, since positions start and end as
+        the date changes without anything being saved."""
+        with transaction.atomic():
+            self.all().delete()
+            self.update_for_people(
+                Position.objects.currently_active().order_by()
+                    .values_list('person_id', flat=True).distinct()
+            )
+
+
+class CurrentMembership(models.Model):
+    """A denormalized index of the currently active positions of each person
+
+    This is used to answer the common questions "which parties,
+    coalitions and constituencies is this person currently associated
+    with?" and "is this person currently a politician?" without
+    filtering all their positions on the sorting date columns.  There
+    is one row per kind of membership that each currently active
+    position represents.  It's kept up to date by Position.save (and
+    deletes cascade from Position), but since positions start and end
+    with the passing of time, core_update_current_memberships should be
+    run daily as well."""
+
+    kind_choices = (
+        ('party', 'Party membership'),
+        ('coalition', 'Coalition membership'),
+        ('politician', 'Political position'),
+        ('constituency', 'Political position with a place'),
+    )
+
+    person = models.ForeignKey(Person, related_name='current_memberships')
+    position = models.ForeignKey(Position, related_name='current_memberships')
+    kind = models.CharField(max_length=20, choices=kind_choices)
+    organisation = models.ForeignKey(Organisation, null=True, blank=True, related_name='current_memberships')
+    place = models.ForeignKey(Place, null=True, blank=True, related_name='current_memberships')
+
+    objects = CurrentMembershipManager()
+
+    @staticmethod
+    def kinds_for_position(position):
+        """Return the kinds of membership that a position represents"""
+        kinds = []
+        title_slug = position.title.slug if position.title else None
+        if title_slug == 'member' and position.organisation \
+                and position.organisation.kind.slug == 'party':
+            kinds.append('party')
+        if title_slug == 'coalition-member' and position.organisation:
+            kinds.append('coalition')
+        if position.category == 'political':
+            kinds.append('politician')
+            if position.place_id:
+                kinds.append('constituency')
+        return kinds
+
+    def __unicode__(self):
+        return "%s (%s)" % (self.person_id, self.kind)
+
+    class Meta:
+        index_together = [
+            ('person', 'kind'),
+        ]
+
+
+def update_current_memberships_for_related_positions(sender, instance, created, **kwargs):
+    """If an organisation or position title changes, so might the memberships"""
+    if created:
+        return
+    CurrentMembership.objects.update_for_people(
+        instance.position_set.order_by().values_list('person_id', flat=True).distinct()
+    )
+
+post_save.connect(update_current_memberships_for_related_positions, Organisation)
+post_save.connect(update_current_memberships_for_related_positions, PositionTitle)
+
+
+def update_current_memberships_for_organisation_kind(sender, instance, created, **kwargs):
+    """If an organisation kind's slug changes, so might the membership kinds"""
+    if created:
+        return
+    CurrentMembership.objects.update_for_people(
+        Position.objects.filter(organisation__kind=instance)
+            .order_by().values_list('person_id', flat=True).distinct()
+    )
+
+post_save.connect(update_current_memberships_for_organisation_kind, OrganisationKind)
+
 
 class ParliamentarySession(ModelBase):
     start_date = DateField(blank=True, null=True)
@@ -1642,6 +1771,87 @@ class ParliamentarySession(ModelBase):
         ordering = ['start_date']
 
 
+class PlaceBoundaryOverlapManager(models.Manager):
+
+    def update_for_places(self, places):
+        """Recompute the overlaps of each place with other sessions' places
+
+        For each place, the places of the same kind in each of the
+        other parliamentary sessions that it overlaps with are found
+        with a spatial query, and the percentage of the place's area
+        that each of those covers is recorded."""
+        for place in places:
+            self.update_for_place(place)
+
+    def update_for_place(self, place):
+        overlaps = []
+        if place.mapit_area is not None:
+            self_geos_geometry = place.mapit_area.polygons.collect()
+            if self_geos_geometry is not None and self_geos_geometry.area > 0:
+                for session in place.kind.parliamentary_sessions():
+                    if session.id == place.parliamentary_session_id \
+                            or session.mapit_generation is None:
+                        continue
+                    overlaps.extend(self.overlaps_in_session(
+                        place, self_geos_geometry, session))
+        with transaction.atomic():
+            self.filter(place=place).delete()
+            self.bulk_create(overlaps)
+
+    def overlaps_in_session(self, place, self_geos_geometry, session):
+        areas = dict(
+            (area.id, area) for area in mapit_models.Area.objects.intersect(
+                'intersects',
+                place.mapit_area,
+                [place.mapit_area.type.code],
+                mapit_models.Generation.objects.get(pk=session.mapit_generation))
+        )
+        other_places = Place.objects.filter(
+            kind=place.kind_id,
+            parliamentary_session=session,
+            mapit_area__in=areas.keys())
+        for other_place in other_places:
+            other_geos_geometry = areas[other_place.mapit_area_id].polygons.collect()
+            intersection = self_geos_geometry.intersection(other_geos_geometry)
+            yield self.model(
+                place=place,
+                other_place=other_place,
+                session=session,
+                percent=100 * intersection.area / self_geos_geometry.area,
+            )
+
+    def rebuild(self, places=None):
+        if places is None:
+            places = Place.objects.all()
+        self.update_for_places(
+            places.select_related('kind', 'mapit_area__type').iterator())
+
+
+class PlaceBoundaryOverlap(models.Model):
+    """How much of a place's area is covered by a place in another session
+
+    This records the results of the (slow) spatial queries needed to
+    show the boundary changes on place pages.  It has to be updated
+    with core_update_boundary_overlaps whenever boundaries or places
+    are imported."""
+
+    place = models.ForeignKey(Place, related_name='boundary_overlaps')
+    other_place = models.ForeignKey(Place, related_name='+')
+    session = models.ForeignKey(ParliamentarySession, related_name='+')
+    percent = models.FloatField()
+
+    objects = PlaceBoundaryOverlapManager()
+
+    def __unicode__(self):
+        return "%s overlaps %s (%.1f%%)" % (
+            self.place_id, self.other_place_id, self.percent)
+
+    class Meta:
+        index_together = [
+            ('place', 'session'),
+        ]
+
+
 class OrganisationRelationshipKind(ModelBase):
     """This represent a kind of relationship two organisations can be in
 
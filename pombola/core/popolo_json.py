@@ -0,0 +1,177 @@
+"""Write the Popolo JSON exports incrementally
+
+get_popolo_data builds the whole export as one dict, which is then
+serialized in one go; for the nightly exports that means holding all
+of it (twice over, for the two variants of pombola.json) in memory at
+once.  Instead, the functions here make a single pass over the people
+with iter_people, which only loads a chunk of people at a time, and
+write each person and membership out as soon as it's been generated.
+
+The output is the same as json.dump(..., indent=4, sort_keys=True)
+would produce for the full data.  The keys of the top-level object in
+pombola.json have to be in sorted order, so the people and memberships
+are written to temporary files first and then copied into place.
+"""
+
+import gzip
+import json
+import shutil
+import tempfile
+from os.path import join
+
+from pombola.core.popolo import (
+    get_areas, get_events, get_organizations, get_title_to_sessions,
+    iter_people
+)
+
+
+INDENT = 4
+
+
+def open_output(filename, use_gzip=False):
+    if use_gzip:
+        return gzip.open(filename + '.gz', 'wb')
+    return open(filename, 'w')
+
+
+class JSONArrayWriter(object):
+    """Write a JSON array to a file one item at a time
+
+    'level' is how deeply nested the array is in the document being
+    written, which is needed to indent its items."""
+
+    def __init__(self, f, level=0):
+        self.f = f
+        self.level = level
+        self.count = 0
+
+    def write(self, item):
+        item_indent = '\n' + ' ' * (INDENT * (self.level + 1))
+        self.f.write(', ' if self.count else '[')
+        self.f.write(item_indent)
+        self.f.write(
+            json.dumps(item, indent=INDENT, sort_keys=True)
+            .replace('\n', item_indent))
+        self.count += 1
+
+    def close(self):
+        if self.count:
+            self.f.write('\n' + ' ' * (INDENT * self.level) + ']')
+        else:
+            self.f.write('[]')
+
+
+def write_json_array(f, items, level=0):
+    writer = JSONArrayWriter(f, level)
+    for item in items:
+        writer.write(item)
+    writer.close()
+
+
+def write_popolo_object(f, collections):
+    """Write a JSON object whose values are all arrays
+
+    'collections' maps each key to either a list of items or a
+    temporary file which a JSONArrayWriter with level 1 wrote to."""
+    f.write('{')
+    for i, key in enumerate(sorted(collections)):
+        f.write(', ' if i else '')
+        f.write('\n' + ' ' * INDENT + json.dumps(key) + ': ')
+        value = collections[key]
+        if isinstance(value, list):
+            write_json_array(f, value, level=1)
+        else:
+            value.seek(0)
+            shutil.copyfileobj(value, f)
+    f.write('\n}')
+
+
+def export_pombola_json(output_directory, primary_id_scheme, base_url, use_gzip=False):
+    """Write pombola.json and pombola-no-inline-memberships.json
+
+    Both files are produced from a single pass over the people."""
+    title_to_sessions = get_title_to_sessions()
+
+    inline_persons_file = tempfile.TemporaryFile()
+    persons_file = tempfile.TemporaryFile()
+    memberships_file = tempfile.TemporaryFile()
+    inline_persons = JSONArrayWriter(inline_persons_file, level=1)
+    persons = JSONArrayWriter(persons_file, level=1)
+    memberships = JSONArrayWriter(memberships_file, level=1)
+
+    for person_properties, person_memberships in iter_people(
+            primary_id_scheme, base_url, title_to_sessions):
+        persons.write(person_properties)
+        for membership in person_memberships:
+            memberships.write(membership)
+        person_properties['memberships'] = person_memberships
+        inline_persons.write(person_properties)
+
+    for writer in (inline_persons, persons, memberships):
+        writer.close()
+
+    other_collections = {
+        'organizations': get_organizations(primary_id_scheme, base_url),
+        'events': get_events(primary_id_scheme, base_url),
+        'areas': get_areas(primary_id_scheme, base_url),
+        'posts': [],
+    }
+
+    for leafname, collections in (
+            ('pombola.json', dict(other_collections, persons=inline_persons_file)),
+            ('pombola-no-inline-memberships.json',
+             dict(other_collections, persons=persons_file, memberships=memberships_file)),
+    ):
+        with open_output(join(output_directory, leafname), use_gzip) as f:
+            write_popolo_object(f, collections)
+
+    for temporary_file in (inline_persons_file, persons_file, memberships_file):
+        temporary_file.close()
+
+
+class CollectionWriter(object):
+    """Write a collection to both a JSON file and a mongoexport dump"""
+
+    def __init__(self, output_directory, collection, use_gzip=False):
+        self.json_file = open_output(
+            join(output_directory, collection + '.json'), use_gzip)
+        self.mongo_file = open_output(
+            join(output_directory, 'mongo-' + collection + '.dump'), use_gzip)
+        self.json_writer = JSONArrayWriter(self.json_file)
+
+    def write(self, item):
+        item['_id'] = item['id']
+        json.dump(item, self.mongo_file, sort_keys=True)
+        self.mongo_file.write("\n")
+        self.json_writer.write(item)
+
+    def close(self):
+        self.json_writer.close()
+        self.json_file.close()
+        self.mongo_file.close()
+
+
+def export_popolo_collections(output_directory, primary_id_scheme, base_url, use_gzip=False):
+    """Write each Popolo collection as JSON and in mongoexport format"""
+    title_to_sessions = get_title_to_sessions()
+
+    persons = CollectionWriter(output_directory, 'persons', use_gzip)
+    memberships = CollectionWriter(output_directory, 'memberships', use_gzip)
+    for person_properties, person_memberships in iter_people(
+            primary_id_scheme, base_url, title_to_sessions):
+        persons.write(person_properties)
+        for membership in person_memberships:
+            memberships.write(membership)
+    persons.close()
+    memberships.close()
+
+    for collection, items in (
+            ('organizations', get_organizations(primary_id_scheme, base_url)),
+            ('events', get_events(primary_id_scheme, base_url)),
+            ('areas', get_areas(primary_id_scheme, base_url)),
+            ('posts', []),
+    ):
+        writer = CollectionWriter(output_directory, collection, use_gzip)
+        for item in items:
+            writer.write(item)
+        writer.close()
@@ -0,0 +1,226 @@
+"""Bulk, streaming CSV export of the people holding a set of positions
+
+Producing a row for each position used to require several queries
+per person (identifiers, contacts, current parties and constituencies,
+and then the Wikidata identifiers of each party and area).  Instead,
+the positions are processed in chunks, and for each chunk everything
+needed is fetched with a fixed number of queries, so the number of
+queries grows with the number of chunks rather than the number of
+rows.  The rows are streamed to the client so that memory use stays
+flat however many positions there are.
+"""
+
+from collections import defaultdict
+
+import unicodecsv as csv
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+
+from pombola.core.models import (
+    Contact, Identifier, Organisation, Person, Place, Position
+)
+
+
+CSV_HEADER = [
+    'id',
+    'source',
+    'name',
+    'honorific_prefix',
+    'email',
+    'image',
+    'identifier__wikidata',
+    'party',
+    'party_wikidata_id',
+    'area',
+    'area_wikidata_id',
+    'start_date',
+    'end_date'
+]
+
+CHUNK_SIZE = 500
+
+
+class Echo(object):
+    """A file-like object whose write method just returns its argument
+
+    This means that csv.writer's writerow returns each formatted line,
+    which can then be yielded to a StreamingHttpResponse."""
+
+    def write(self, value):
+        return value
+
+
+def handle_approx_date(date):
+    return_date = None
+    if date and not date.future:
+        if date.year:
+            return_date = str(date.year)
+        if date.month:
+            return_date = return_date + '-' + str(date.month).zfill(2)
+        if date.day:
+            return_date = return_date + '-' + str(date.day).zfill(2)
+    return return_date
+
+
+def get_wikidata_ids(model, object_ids):
+    """Return a dict mapping object IDs to their first Wikidata identifier"""
+    result = {}
+    if not object_ids:
+        return result
+    identifiers = Identifier.objects.filter(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id__in=object_ids,
+        scheme='wikidata',
+    ).order_by('object_id', 'id').values_list('object_id', 'identifier')
+    for object_id, identifier in identifiers:
+        result.setdefault(object_id, identifier)
+    return result
+
+
+def get_preferred_emails(person_ids):
+    """Return a dict mapping person IDs to their preferred email address"""
+    result = {}
+    emails = Contact.objects.filter(
+        content_type=ContentType.objects.get_for_model(Person),
+        object_id__in=person_ids,
+        kind__slug='email',
+    ).order_by('object_id', '-preferred', 'id').values_list('object_id', 'value')
+    for person_id, email in emails:
+        result.setdefault(person_id, email)
+    return result
+
+
+def get_current_parties_and_coalitions(person_ids):
+    """Return a dict mapping person IDs to {organisation_id: name}
+
+    This is the bulk equivalent of Person.parties_and_coalitions."""
+    result = defaultdict(dict)
+    memberships = Position.objects.filter(person__in=person_ids) \
+        .currently_active() \
+        .filter(
+            (Q(title__slug='member') & Q(organisation__kind__slug='party'))
+            | Q(title__slug='coalition-member')
+        ) \
+        .exclude(organisation__isnull=True) \
+        .order_by() \
+        .values_list('person_id', 'organisation_id', 'organisation__name')
+    for person_id, organisation_id, name in memberships:
+        result[person_id][organisation_id] = name
+    return result
+
+
+def get_current_constituencies(person_ids):
+    """Return a dict mapping person IDs to {place_id: name}
+
+    This is the bulk equivalent of Person.constituencies."""
+    result = defaultdict(dict)
+    positions = Position.objects.filter(person__in=person_ids) \
+        .current_politician_positions() \
+        .exclude(place__isnull=True) \
+        .order_by() \
+        .values_list('person_id', 'place_id', 'place__name')
+    for person_id, place_id, name in positions:
+        result[person_id][place_id] = name
+    return result
+
+
+def get_primary_image(person):
+    """Find the primary image from the person's prefetched images
+
+    This avoids the extra query that HasImageMixin.primary_image would
+    make for each person."""
+    for image in person.images.all():
+        if image.is_primary:
+            return image.image
+    return None
+
+
+def summarise_related(related, wikidata_ids):
+    """Return the name and Wikidata ID to show for a party or area
+
+    If there's more than one candidate, 'MULTIPLE' is used for both."""
+    if not related:
+        return None, None
+    if len(related) > 1:
+        return 'MULTIPLE', 'MULTIPLE'
+    object_id, name = related.items()[0]
+    return name, wikidata_ids.get(object_id)
+
+
+def chunk_rows(request, positions):
+    """Return the CSV rows (as lists) for a list of positions"""
+    person_ids = set(p.person_id for p in positions)
+
+    person_wikidata_ids = get_wikidata_ids(Person, person_ids)
+    emails = get_preferred_emails(person_ids)
+    parties = get_current_parties_and_coalitions(person_ids)
+    constituencies = get_current_constituencies(person_ids)
+
+    party_wikidata_ids = get_wikidata_ids(
+        Organisation,
+        set(o for d in parties.values() if len(d) == 1 for o in d)
+    )
+    area_wikidata_ids = get_wikidata_ids(
+        Place,
+        set(p for d in constituencies.values() if len(d) == 1 for p in d)
+    )
+
+    rows = []
+    for position in positions:
+        person = position.person
+        party_name, party_wikidata_id = summarise_related(
+            parties.get(person.id), party_wikidata_ids)
+        area_name, area_wikidata_id = summarise_related(
+            constituencies.get(person.id), area_wikidata_ids)
+        rows.append([
+            person.slug,
+            request.build_absolute_uri(person.get_absolute_url())
+                        .replace('http://', 'https://'),
+            person.name,
+            person.honorific_prefix,
+            emails.get(person.id),
+            request.build_absolute_uri('/' + str(get_primary_image(person)))
+                        .replace('http://', 'https://'),
+            person_wikidata_ids.get(person.id),
+            party_name,
+            party_wikidata_id,
+            area_name,
+            area_wikidata_id,
+            handle_approx_date(position.start_date),
+            handle_approx_date(position.end_date)
+        ])
+    return rows
+
+
+def iter_position_chunks(positions, chunk_size=CHUNK_SIZE):
+    """Yield lists of positions from a queryset, chunk_size at a time
+
+    Only the (ordered) IDs of the whole queryset are held in memory;
+    each chunk is then fetched with its people's alternative names and
+    images prefetched, and returned in the original order."""
+    position_ids = list(positions.values_list('id', flat=True))
+    for i in range(0, len(position_ids), chunk_size):
+        chunk_ids = position_ids[i:i + chunk_size]
+        by_id = Position.objects.select_related('person') \
+            .prefetch_related('person__alternative_names', 'person__images') \
+            .in_bulk(chunk_ids)
+        yield [by_id[position_id] for position_id in chunk_ids
+               if position_id in by_id]
+
+
+def iter_csv_lines(request, positions, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(CSV_HEADER)
+    for chunk in iter_position_chunks(positions, chunk_size):
+        for row in chunk_rows(request, chunk):
+            yield writer.writerow(row)
+
+
+def position_csv_response(request, positions, chunk_size=CHUNK_SIZE):
+    """Return a StreamingHttpResponse with CSV for the positions' holders"""
+    return StreamingHttpResponse(
+        iter_csv_lines(request, positions, chunk_size),
+        content_type='text/csv',
+    )
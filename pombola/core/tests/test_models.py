@@ -5,6 +5,7 @@ from django.test import TestCase
 from django_date_extensions.fields import ApproximateDate
 from django.contrib.contenttypes.models import ContentType
 
+from mapit.models import Area, Generation, Type
 from slug_helpers.models import SlugRedirect
 
 from pombola.core import models
@@ -732,3 +733,51 @@ class PersonEveryPoliticianUUIDTest(TestCase):
     def test_returns_uuid(self):
         self.person.identifiers.create(scheme='everypolitician', identifier='99795f75-d2fe-4353-a177-a4b8c8cfc01d')
         self.assertEqual(self.person.everypolitician_uuid, '99795f75-d2fe-4353-a177-a4b8c8cfc01d')
+
+
+class PlaceBoundaryChangesTest(TestCase):
+    def setUp(self):
+        generation = Generation.objects.create(
+            active=True, description="Test generation")
+        area_type = Type.objects.create(code='CON', description='Constituency')
+        self.place_kind = models.PlaceKind.objects.create(
+            name="Constituency", slug="constituency")
+        self.old_session = models.ParliamentarySession.objects.create(
+            name="Old Session", slug="old-session",
+            start_date=date(2008, 1, 1), end_date=date(2012, 12, 31),
+            mapit_generation=generation.id)
+        self.new_session = models.ParliamentarySession.objects.create(
+            name="New Session", slug="new-session",
+            start_date=date(2013, 1, 1), end_date=date(2017, 12, 31),
+            mapit_generation=generation.id)
+
+        def create_place(name, slug, session):
+            area = Area.objects.create(
+                name=name, type=area_type,
+                generation_low=generation, generation_high=generation)
+            return models.Place.objects.create(
+                name=name, slug=slug, kind=self.place_kind,
+                parliamentary_session=session, mapit_area=area)
+
+        self.new_place = create_place("New Place", "new-place", self.new_session)
+        self.mostly_in = create_place("Mostly In", "mostly-in", self.old_session)
+        self.partly_in = create_place("Partly In", "partly-in", self.old_session)
+        self.new_place.boundary_overlaps.create(
+            other_place=self.mostly_in, session=self.old_session, percent=99.5)
+        self.new_place.boundary_overlaps.create(
+            other_place=self.partly_in, session=self.old_session, percent=0.5)
+
+    def test_boundary_changes_from_overlaps(self):
+        changes = self.new_place.get_boundary_changes()
+        self.assertIsNone(changes['next'])
+        previous = changes['previous']
+        self.assertEqual(previous['session'], self.old_session)
+        self.assertEqual(
+            previous['intersections'],
+            [{'percent': 99.5, 'place': self.mostly_in}])
+        self.assertEqual(previous['others'], [self.partly_in])
+
+    def test_no_boundary_changes_without_mapit_area(self):
+        self.new_place.mapit_area = None
+        self.new_place.save()
+        self.assertEqual(self.new_place.get_boundary_changes(), {})
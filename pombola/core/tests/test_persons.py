@@ -2,6 +2,7 @@ import datetime
 
 from django_webtest import WebTest
 from django.test import TestCase
+from django_date_extensions.fields import ApproximateDate
 
 from django.contrib.contenttypes.models import ContentType
 
@@ -182,6 +183,88 @@ class PersonScorecardTest(TestCase):
         assert not self.alf.is_politician()
         assert self.charlie.is_politician()
 
+class PersonCurrentMembershipTest(TestCase):
+    def setUp(self):
+        self.person = models.Person.objects.create(
+            legal_name='Dora Party',
+            slug='dora-party',
+            )
+        self.party_kind = models.OrganisationKind.objects.create(
+            name='Party',
+            slug='party',
+            )
+        self.party = models.Organisation.objects.create(
+            name='Test Party',
+            slug='test-party',
+            kind=self.party_kind,
+            )
+        self.old_party = models.Organisation.objects.create(
+            name='Old Party',
+            slug='old-party',
+            kind=self.party_kind,
+            )
+        self.member_title = models.PositionTitle.objects.create(
+            name='Member',
+            slug='member',
+            )
+        self.membership = models.Position.objects.create(
+            person=self.person,
+            organisation=self.party,
+            title=self.member_title,
+            )
+        models.Position.objects.create(
+            person=self.person,
+            organisation=self.old_party,
+            title=self.member_title,
+            start_date=ApproximateDate(year=2001),
+            end_date=ApproximateDate(year=2005),
+            )
+
+    def testParties(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.person.parties()), [self.party])
+        self.assertEqual(list(self.person.parties_and_coalitions()), [self.party])
+        self.assertEqual(list(self.person.coalitions()), [])
+        self.assertFalse(self.person.is_politician())
+
+    def testEndingPositionUpdatesMemberships(self):
+        self.membership.end_date = ApproximateDate(year=2010)
+        self.membership.save()
+        self.assertEqual(list(self.person.parties()), [])
+
+    def testDeletingPositionUpdatesMemberships(self):
+        self.membership.delete()
+        self.assertEqual(list(self.person.parties()), [])
+
+    def testReassigningPositionUpdatesMemberships(self):
+        other_person = models.Person.objects.create(
+            legal_name='Eric Party',
+            slug='eric-party',
+            )
+        self.membership.person = other_person
+        self.membership.save()
+        self.assertEqual(list(self.person.parties()), [])
+        self.assertEqual(list(other_person.parties()), [self.party])
+
+    def testChangingOrganisationKindUpdatesMemberships(self):
+        self.party.kind = models.OrganisationKind.objects.create(
+            name='Not a party',
+            slug='not-a-party',
+            )
+        self.party.save()
+        self.assertEqual(list(self.person.parties()), [])
+
+    def testChangingOrganisationKindSlugUpdatesMemberships(self):
+        self.party_kind.slug = 'former-party'
+        self.party_kind.save()
+        self.assertEqual(list(self.person.parties()), [])
+
+    def testRebuild(self):
+        models.CurrentMembership.objects.all().delete()
+        models.CurrentMembership.objects.rebuild()
+        self.assertEqual(list(self.person.parties()), [self.party])
+
+
 class PersonIdentifierTest(TestCase):
 
     def setUp(self):
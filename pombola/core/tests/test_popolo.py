@@ -1,4 +1,9 @@
 from datetime import date
+import gzip
+import json
+from os.path import join
+import shutil
+import tempfile
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.files.base import ContentFile
@@ -12,6 +17,7 @@ from images.models import Image
 
 from pombola.core import models
 from pombola.core.popolo import get_popolo_data
+from pombola.core.popolo_json import export_pombola_json
 
 
 class PopoloTest(TestCase):
@@ -300,5 +306,31 @@ class PopoloTest(TestCase):
         self.assertEqual(session['id'], example_session.id)
         self.assertEqual(session['mapit_generation'], self.generation.id)
 
+    def test_export_pombola_json(self):
+        output_directory = tempfile.mkdtemp()
+        try:
+            export_pombola_json(
+                output_directory, 'org.example', 'http://pombola.example.org/')
+            for leafname, inline_memberships in (
+                    ('pombola.json', True),
+                    ('pombola-no-inline-memberships.json', False),
+            ):
+                expected = get_popolo_data(
+                    'org.example',
+                    'http://pombola.example.org/',
+                    inline_memberships=inline_memberships)
+                with open(join(output_directory, leafname)) as f:
+                    self.assertEqual(
+                        f.read(), json.dumps(expected, indent=4, sort_keys=True))
+
+            export_pombola_json(
+                output_directory, 'org.example', 'http://pombola.example.org/',
+                use_gzip=True)
+            with gzip.open(join(output_directory, 'pombola.json.gz')) as f:
+                data = json.load(f)
+            self.assertEqual(len(data['persons'][0]['memberships']), 1)
+        finally:
+            shutil.rmtree(output_directory)
+
 # FIXME: also mock out the PopIt API to test create_organisations and
 # create_people.
@@ -507,6 +507,54 @@ class PositionTest(TestCase):
         self.assertEqual( pos_qs.previous(mid_2012).count(), 0 )
         self.assertEqual( pos_qs.previous(mid_2013).count(), 1 )
 
+    def test_active_dates(self):
+        position = models.Position.objects.create(
+            person=self.person,
+            title=self.title,
+            start_date=ApproximateDate(year=2011, month=2),
+            end_date=ApproximateDate(year=2012),
+        )
+        self.assertEqual(position.active_start_date, datetime.date(2011, 2, 1))
+        self.assertEqual(position.active_end_date, datetime.date(2012, 12, 31))
+
+        position.start_date = ApproximateDate(past=True)
+        position.end_date = ApproximateDate(future=True)
+        position.save()
+        self.assertEqual(position.active_start_date, datetime.date.min)
+        self.assertEqual(position.active_end_date, datetime.date.max)
+
+    def test_overlapping_dates(self):
+        pos_qs = models.Position.objects.all()
+        position = models.Position.objects.create(
+            person=self.person,
+            title=self.title,
+            start_date=ApproximateDate(year=2011),
+            end_date=ApproximateDate(year=2012, month=3),
+        )
+        current_session_end = datetime.date(9999, 12, 31)
+
+        self.assertEqual(
+            pos_qs.overlapping_dates(
+                datetime.date(2012, 3, 31), current_session_end).count(),
+            1)
+        self.assertEqual(
+            pos_qs.overlapping_dates(
+                datetime.date(2012, 4, 1), current_session_end).count(),
+            0)
+        self.assertEqual(
+            pos_qs.overlapping_dates(
+                datetime.date(2000, 1, 1), datetime.date(2010, 12, 31)).count(),
+            0)
+
+        # Positions that haven't started yet never overlap
+        position.start_date = ApproximateDate(future=True)
+        position.end_date = None
+        position.save()
+        self.assertEqual(
+            pos_qs.overlapping_dates(
+                datetime.date(2013, 1, 1), current_session_end).count(),
+            0)
+
     def test_position_title_no_redirect(self):
         response = self.client.get(
             reverse('position_pt', kwargs={
@@ -293,6 +293,53 @@ class PositionViewTest(WebTest):
         self.assertEqual(link, '?a=1&order=name&letter=P')
         self.assertTrue(response.context['alphabetical_link_from_query_parameter'])
 
+    def test_position_csv(self):
+        party_kind = models.OrganisationKind.objects.create(
+            name='Party',
+            slug='party',
+        )
+        party = models.Organisation.objects.create(
+            name='Test Party',
+            slug='test-party',
+            kind=party_kind,
+        )
+        member_title = models.PositionTitle.objects.create(
+            name='Member',
+            slug='member',
+        )
+        models.Position.objects.create(
+            person=self.person,
+            title=member_title,
+            organisation=party,
+        )
+        models.Identifier.objects.create(
+            scheme='wikidata',
+            identifier='Q1234',
+            content_object=party,
+        )
+        models.Contact.objects.create(
+            kind=models.ContactKind.objects.create(name='Email', slug='email'),
+            value='test@example.org',
+            content_object=self.person,
+            preferred=True,
+        )
+        resp = self.app.get('/position/test-title/?format=csv&order=name')
+        self.assertEqual(resp.content_type, 'text/csv')
+        lines = resp.body.splitlines()
+        self.assertEqual(
+            lines[0],
+            'id,source,name,honorific_prefix,email,image,identifier__wikidata,'
+            'party,party_wikidata_id,area,area_wikidata_id,start_date,end_date'
+        )
+        self.assertEqual(len(lines), 3)
+        rows = dict(
+            (line.split(',')[0], line.split(',')) for line in lines[1:]
+        )
+        row = rows['test-person']
+        self.assertEqual(row[2], 'Test Person')
+        self.assertEqual(row[4], 'test@example.org')
+        self.assertEqual(row[7:11], ['Test Party', 'Q1234', '', ''])
+
 
 class TestPersonView(WebTest):
 
@@ -0,0 +1,29 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Paginate by ID, with the 'next' and 'previous' links as cursors
+
+    Each page is fetched by filtering on the ID from the cursor rather
+    than with an offset, so the thousandth page is as quick to get as
+    the first, and pages don't shift when new rows are added."""
+
+    ordering = 'id'
+
+
+class OptionalCursorPaginationMixin(object):
+    """Use IdCursorPagination only if asked for with ?pagination=cursor
+
+    Existing clients of the API rely on the default page number
+    pagination (with its 'count' and '?page=' parameter), so that
+    stays the default.  The cursor links keep the other query
+    parameters, so the 'next' link stays cursor paginated."""
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = IdCursorPagination()
+            else:
+                return super(OptionalCursorPaginationMixin, self).paginator
+        return self._paginator
@@ -1,22 +1,95 @@
+import json
+
 from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import viewsets
+from rest_framework.decorators import list_route
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from ..models import Entry, Sitting, Source, Venue
+from .pagination import OptionalCursorPaginationMixin
 from .serializers import (
     EntrySerializer, SittingSerializer, SittingWithEntriesSerializer,
     SourceSerializer, VenueSerializer
 )
 
 
-class EntryViewSet(viewsets.ModelViewSet):
+EXPORT_BATCH_SIZE = 1000
+
+
+def filter_since(queryset, request):
+    """Only include objects created after the ID in the 'since' parameter
+
+    IDs only ever increase, so a client that keeps a copy of the data
+    can pass the highest ID it has to get just the new objects.  Note
+    that this only finds new objects, not changes to existing ones -
+    in particular, speakers that are matched to entries after they
+    were first imported (by the SpeakerMatcher's bulk updates) won't
+    be picked up, so such clients should still do a full export now
+    and then."""
+    since = request.query_params.get('since')
+    if since:
+        try:
+            queryset = queryset.filter(id__gt=int(since))
+        except ValueError:
+            raise ParseError("'since' must be an ID")
+    return queryset
+
+
+def ndjson_export(queryset, serializer_class, request, batch_size=EXPORT_BATCH_SIZE):
+    """Return a response streaming the objects as newline-delimited JSON
+
+    The objects are fetched and serialized a batch at a time in ID
+    order, each batch starting after the last ID of the one before,
+    so the whole table can be exported without holding it in memory
+    or making ever slower offset queries."""
+
+    def lines():
+        batch_queryset = queryset.order_by('id')
+        last_id = None
+        while True:
+            if last_id is not None:
+                batch_queryset = batch_queryset.filter(id__gt=last_id)
+            batch = list(batch_queryset[:batch_size])
+            if not batch:
+                return
+            serializer = serializer_class(
+                batch, many=True, context={'request': request})
+            for item in serializer.data:
+                yield json.dumps(item, cls=JSONEncoder) + '\n'
+            last_id = batch[-1].id
+
+    return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+class EntryViewSet(OptionalCursorPaginationMixin, viewsets.ModelViewSet):
     queryset = Entry.objects.order_by('id')
     serializer_class = EntrySerializer
 
+    def get_queryset(self):
+        queryset = filter_since(
+            super(EntryViewSet, self).get_queryset().select_related('speaker'),
+            self.request)
+        # This lets a sitting's entries be streamed or paged through
+        # rather than all included in the sitting's response:
+        sitting = self.request.query_params.get('sitting')
+        if sitting:
+            try:
+                queryset = queryset.filter(sitting=int(sitting))
+            except ValueError:
+                raise ParseError("'sitting' must be an ID")
+        return queryset
+
+    @list_route()
+    def export(self, request, version=None):
+        return ndjson_export(self.get_queryset(), EntrySerializer, request)
 
-class SittingViewSet(viewsets.GenericViewSet):
+
+class SittingViewSet(OptionalCursorPaginationMixin, viewsets.GenericViewSet):
 
     # FIXME: this is only needed because the GenericViewSet calls
     # get_queryset when trying to construct a filter form.  However at
@@ -26,8 +99,9 @@ class SittingViewSet(viewsets.GenericViewSet):
     queryset = Entry.objects.order_by('id')
 
     def list(self, request, version=None):
-        queryset = Sitting.objects.order_by('id') \
-            .select_related('source', 'venue')
+        queryset = filter_since(
+            Sitting.objects.order_by('id').select_related('source', 'venue'),
+            request)
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = SittingSerializer(
@@ -54,6 +128,13 @@ class SittingViewSet(viewsets.GenericViewSet):
         )
         return Response(serializer.data)
 
+    @list_route()
+    def export(self, request, version=None):
+        queryset = filter_since(
+            Sitting.objects.select_related('source', 'venue'), request)
+        return ndjson_export(queryset, SittingSerializer, request)
+
+
 class SourceViewSet(viewsets.ModelViewSet):
     queryset = Source.objects.order_by('id')
     serializer_class = SourceSerializer
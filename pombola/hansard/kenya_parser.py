@@ -8,7 +8,8 @@ from django.db import transaction
 
 from BeautifulSoup import BeautifulSoup, BeautifulStoneSoup, Tag
 
-from pombola.hansard.models import Sitting, Entry, Venue
+from pombola.hansard.models import Sitting, SittingTermCount, Entry, Venue
+from pombola.search.indexing import update_search_index
 
 
 # EXCEPTIONS
@@ -94,6 +95,14 @@ class KenyaParser():
         (?:\ in\ the\ National\ Assembly\ Chamber)?""", re.VERBOSE)
 
 
+    entry_batch_size = 1000
+
+    venue_names = {
+        'national_assembly': 'National Assembly',
+        'senate': 'Senate',
+    }
+
+
     @classmethod
     def convert_pdf_to_html(cls, pdf_file):
         """Given a PDF parse it and return the HTML string representing it"""
@@ -374,15 +383,11 @@ class KenyaParser():
     @classmethod
     def extract_meta_from_transcript(cls, transcript):
 
-        # create the two venues
-        national_assembly, created = Venue.objects.get_or_create(
-            slug = 'national_assembly',
-            defaults = {"name": "National Assembly"},
-        )
-        senate, created = Venue.objects.get_or_create(
-            slug = 'senate',
-            defaults = {"name": "Senate"},
-        )
+        # This doesn't touch the database (the venue is only created
+        # when the entries are) so that transcripts can be parsed in
+        # worker processes.
+        national_assembly = 'national_assembly'
+        senate = 'senate'
 
         reg   = None
         venue = None
@@ -407,7 +412,7 @@ class KenyaParser():
             raise Exception, "Failed to find the Venue"
 
         results = {
-            'venue': venue.slug,
+            'venue': venue,
         }
 
         for line in transcript:
@@ -503,7 +508,11 @@ class KenyaParser():
     def create_entries_from_data_and_source( cls, data, source ):
         """Create the needed sitting and entries"""
 
-        venue = Venue.objects.get( slug=data['meta']['venue'] )
+        venue_slug = data['meta']['venue']
+        venue, created = Venue.objects.get_or_create(
+            slug = venue_slug,
+            defaults = {"name": cls.venue_names[venue_slug]},
+        )
 
         # Joint Sittings can be published by both Houses (identical documents)
         # prevent the same Sitting being created twice
@@ -517,34 +526,46 @@ class KenyaParser():
             print "skipping duplicate source %s for %s" % (source.name, source.date)
             return None
 
-        sitting = Sitting(
-            source     = source,
-            venue      = venue,
-            start_date = source.date,
-            start_time = data['meta'].get('start_time', None),
-            end_date   = source.date,
-            end_time   = data['meta'].get('end_time', None),
-        )
-        sitting.save()
-
+        # Create the sitting and its entries together, so that if
+        # processing is interrupted the source can just be processed
+        # again.
         with transaction.atomic():
-            counter = 0
-            for line in data['transcript']:
-
-                counter += 1
-
-                entry = Entry(
-                    sitting       = sitting,
-                    type          = line['type'],
-                    page_number   = line['page_number'],
-                    text_counter  = counter,
-                    speaker_name  = line.get('speaker_name',  ''),
-                    speaker_title = line.get('speaker_title', ''),
-                    content       = line['text'],
-                )
-                entry.save()
+            sitting = Sitting(
+                source     = source,
+                venue      = venue,
+                start_date = source.date,
+                start_time = data['meta'].get('start_time', None),
+                end_date   = source.date,
+                end_time   = data['meta'].get('end_time', None),
+            )
+            sitting.save()
+
+            # The entries are inserted in batches rather than one at a
+            # time, since a long sitting has thousands of them; that
+            # means no signals are sent, so they're indexed for search
+            # below instead.
+            Entry.objects.bulk_create(
+                (
+                    Entry(
+                        sitting       = sitting,
+                        type          = line['type'],
+                        page_number   = line['page_number'],
+                        text_counter  = counter,
+                        speaker_name  = line.get('speaker_name',  ''),
+                        speaker_title = line.get('speaker_title', ''),
+                        content       = line['text'],
+                    )
+                    for counter, line in enumerate(data['transcript'], 1)
+                ),
+                batch_size=cls.entry_batch_size,
+            )
+
+            SittingTermCount.objects.update_for_sittings([sitting.id])
 
             source.last_processing_success = datetime.datetime.now()
             source.save()
 
+        update_search_index(
+            Entry, Entry.objects.filter(sitting=sitting).select_related('sitting'))
+
         return None
@@ -10,4 +10,6 @@ class Command(NoArgsCommand):
 
     def handle_noargs(self, **options):
         algorithm = settings.HANSARD_NAME_MATCHING_ALGORITHM
-        Entry.assign_speakers(name_matching_algorithm=algorithm)
+        assigned = Entry.assign_speakers(name_matching_algorithm=algorithm)
+        if int(options['verbosity']) > 1:
+            print "Assigned speakers to {0} entries".format(assigned)
@@ -1,33 +1,38 @@
-import datetime
+from optparse import make_option
 
-from django.core.management.base import NoArgsCommand
+from django.core.management.base import CommandError, NoArgsCommand
 
 from pombola.hansard.models import Source
-from pombola.hansard.kenya_parser import KenyaParser
+from pombola.hansard.process_sources import process_sources
 
 class Command(NoArgsCommand):
     help = 'Process all sources that have not been done'
     args = ''
 
+    option_list = NoArgsCommand.option_list + (
+        make_option('--workers', dest='workers', type='int', default=1,
+                    help='The number of sources to process at once in each stage'),
+    )
+
     def handle_noargs(self, **options):
 
         verbose = int(options.get('verbosity')) >= 2
 
-        for source in Source.objects.all().requires_processing():
-
-            if verbose:
-                message = "{0}: Looking at {1}"
-                print message.format(source.list_page, source)
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1")
 
-            pdf = source.file()
+        failures = 0
+        for source, error in process_sources(
+                Source.objects.all().requires_processing(),
+                workers=options['workers']):
 
-            source.last_processing_attempt = datetime.datetime.now()
-            source.save()
+            if error:
+                failures += 1
+                message = "There was an exception when processing {0}:\n{1}"
+                print message.format(source.cache_file_path(), error)
+            elif verbose:
+                message = "{0}: Processed {1}"
+                print message.format(source.list_page, source)
 
-            try:
-                html = KenyaParser.convert_pdf_to_html( pdf )
-                data = KenyaParser.convert_html_to_data( html )
-                KenyaParser.create_entries_from_data_and_source( data, source )
-            except Exception as e:
-                print "There was an exception when parsing {0}".format(pdf)
-                raise
+        if failures:
+            raise CommandError("Processing failed for {0} sources".format(failures))
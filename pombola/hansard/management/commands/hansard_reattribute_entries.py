@@ -79,4 +79,8 @@ class Command(BaseCommand):
             if answer != 'y':
                 raise Exception("Command halted by user, no changes made")
 
+        sitting_ids = set(entries.values_list('sitting_id', flat=True))
         entries.update(speaker=entries_to)
+        hansard_models.SittingTermCount.objects.update_for_sittings(sitting_ids)
+        hansard_models.MonthlyAppearanceCount.objects.update_for_speakers(
+            [entries_from.id, entries_to.id])
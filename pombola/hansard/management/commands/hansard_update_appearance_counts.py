@@ -0,0 +1,20 @@
+# This command recounts the monthly Hansard appearances of every
+# speaker. The counts are filled in when the MonthlyAppearanceCount
+# table is created, and kept up to date as speakers are assigned and
+# entries are reattributed, so this only needs to be run if entries
+# have been edited by hand.
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.hansard.models import MonthlyAppearanceCount
+
+
+class Command(NoArgsCommand):
+
+    help = 'Rebuild the monthly appearance counts shown on person pages'
+
+    def handle_noargs(self, **options):
+        MonthlyAppearanceCount.objects.rebuild()
+        if int(options['verbosity']) > 1:
+            print "There are now {0} monthly appearance counts".format(
+                MonthlyAppearanceCount.objects.count())
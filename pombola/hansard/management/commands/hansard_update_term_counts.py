@@ -0,0 +1,19 @@
+# This command recounts the terms used in every sitting, which are
+# used to make word clouds. The counts are kept up to date as sittings
+# are created and speakers are assigned, and the migration that creates
+# the table fills it, so this shouldn't normally need to be run.
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.hansard.models import SittingTermCount
+
+
+class Command(NoArgsCommand):
+
+    help = 'Rebuild the per-sitting term counts used for word clouds'
+
+    def handle_noargs(self, **options):
+        SittingTermCount.objects.rebuild()
+        if int(options['verbosity']) > 1:
+            print "There are now {0} term counts".format(
+                SittingTermCount.objects.count())
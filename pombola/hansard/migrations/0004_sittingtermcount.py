@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_position_active_dates'),
+        ('hansard', '0003_datetimefield_remove_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SittingTermCount',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('term', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField()),
+                ('sitting', models.ForeignKey(related_name='term_counts', to='hansard.Sitting')),
+                ('speaker', models.ForeignKey(related_name='hansard_term_counts', blank=True, to='core.Person', null=True)),
+            ],
+        ),
+    ]
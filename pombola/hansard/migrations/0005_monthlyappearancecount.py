@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_placeboundaryoverlap'),
+        ('hansard', '0004_sittingtermcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAppearanceCount',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField()),
+                ('speaker', models.ForeignKey(related_name='hansard_monthly_appearances', to='core.Person')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlyappearancecount',
+            unique_together=set([('speaker', 'month')]),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hansard', '0005_monthlyappearancecount'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            INSERT INTO hansard_monthlyappearancecount (speaker_id, month, count)
+            SELECT e.speaker_id, date_trunc('month', s.start_date)::date, count(*)
+            FROM hansard_entry e
+            JOIN hansard_sitting s ON s.id = e.sitting_id
+            WHERE e.speaker_id IS NOT NULL
+            GROUP BY e.speaker_id, date_trunc('month', s.start_date)
+            """,
+            "DELETE FROM hansard_monthlyappearancecount",
+        ),
+    ]
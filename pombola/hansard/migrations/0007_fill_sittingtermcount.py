@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import re
+from collections import Counter
+
+from django.db import migrations
+
+
+# These are the same as in pombola.hansard.models.term_count at the
+# time this migration was written.
+MAX_TERM_LENGTH = 100
+
+
+def tokenize(text):
+    return re.sub(r'[^\w\s]', '', text.lower()).split()
+
+
+def count_terms(apps, schema_editor):
+    Entry = apps.get_model('hansard', 'Entry')
+    Sitting = apps.get_model('hansard', 'Sitting')
+    SittingTermCount = apps.get_model('hansard', 'SittingTermCount')
+    SittingTermCount.objects.all().delete()
+    sitting_ids = list(
+        Sitting.objects.order_by('id').values_list('id', flat=True))
+    # Count a few sittings at a time to limit memory use:
+    chunk_size = 50
+    for i in range(0, len(sitting_ids), chunk_size):
+        counts = Counter()
+        entries = Entry.objects \
+            .filter(sitting__in=sitting_ids[i:i + chunk_size]) \
+            .order_by() \
+            .values_list('sitting_id', 'speaker_id', 'content')
+        for sitting_id, speaker_id, content in entries.iterator():
+            for term in tokenize(content):
+                if len(term) <= MAX_TERM_LENGTH:
+                    counts[(sitting_id, speaker_id, term)] += 1
+        SittingTermCount.objects.bulk_create(
+            (
+                SittingTermCount(
+                    sitting_id=sitting_id,
+                    speaker_id=speaker_id,
+                    term=term,
+                    count=count,
+                )
+                for (sitting_id, speaker_id, term), count in counts.iteritems()
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hansard', '0006_fill_monthlyappearancecount'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            count_terms,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -5,3 +5,5 @@ from source import Source, SourceUrlCouldNotBeRetrieved, SourceCouldNotParseTime
 from venue import Venue
 from sitting import Sitting
 from entry import Entry, NAME_SUBSTRING_MATCH, NAME_SET_INTERSECTION_MATCH
+from term_count import SittingTermCount, tokenize
+from appearance_count import MonthlyAppearanceCount
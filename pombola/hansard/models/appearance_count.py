@@ -0,0 +1,115 @@
+import datetime
+from collections import Counter
+
+from django.db import models, transaction
+
+from pombola.core.models import Person
+
+
+def counts_by_period(date_counts, period):
+    """Add up (date, count) pairs by month or year
+
+    This returns a list of dictionaries with the first date of each
+    period and its total count, most recent first, in the form that
+    the person summary templates expect."""
+    totals = Counter()
+    for date, count in date_counts:
+        if period == 'month':
+            totals[datetime.date(date.year, date.month, 1)] += count
+        elif period == 'year':
+            totals[datetime.date(date.year, 1, 1)] += count
+        else:
+            raise ValueError("Unknown period: {0}".format(period))
+    return [
+        dict(date=date, count=totals[date])
+        for date in sorted(totals, reverse=True)
+    ]
+
+
+class MonthlyAppearanceCountQuerySet(models.query.QuerySet):
+    def monthly_counts(self):
+        """Return a list of dictionaries for dates and counts for each month"""
+        return counts_by_period(self.month_totals(), 'month')
+
+    def yearly_counts(self):
+        """Return a list of dictionaries for dates and counts for each year"""
+        return counts_by_period(self.month_totals(), 'year')
+
+    def month_totals(self):
+        return (
+            self.order_by()
+            .values('month')
+            .annotate(total=models.Sum('count'))
+            .values_list('month', 'total')
+        )
+
+
+class MonthlyAppearanceCountManager(models.Manager):
+    def get_queryset(self):
+        return MonthlyAppearanceCountQuerySet(self.model, using=self._db)
+
+    def update_for_speakers(self, speaker_ids, chunk_size=100):
+        """Recount the monthly appearances of each of these speakers
+
+        Each chunk of speakers is counted with one grouped query."""
+        speaker_ids = sorted(set(s for s in speaker_ids if s is not None))
+        for i in range(0, len(speaker_ids), chunk_size):
+            self.recount(speaker_ids[i:i + chunk_size])
+
+    def recount(self, speaker_ids):
+        # import here to avoid creating an import loop
+        from pombola.hansard.models import Entry
+
+        counts = Counter()
+        date_counts = Entry.objects.filter(speaker__in=speaker_ids) \
+            .order_by() \
+            .values('speaker_id', 'sitting__start_date') \
+            .annotate(count=models.Count('id')) \
+            .values_list('speaker_id', 'sitting__start_date', 'count')
+        for speaker_id, date, count in date_counts:
+            counts[(speaker_id, datetime.date(date.year, date.month, 1))] += count
+
+        with transaction.atomic():
+            self.filter(speaker__in=speaker_ids).delete()
+            self.bulk_create(
+                (
+                    self.model(speaker_id=speaker_id, month=month, count=count)
+                    for (speaker_id, month), count in counts.iteritems()
+                ),
+                batch_size=1000,
+            )
+
+    def rebuild(self):
+        # import here to avoid creating an import loop
+        from pombola.hansard.models import Entry
+
+        self.exclude(
+            speaker__in=Entry.objects.exclude(speaker=None).values('speaker_id')
+        ).delete()
+        self.update_for_speakers(
+            Entry.objects.exclude(speaker=None)
+            .order_by()
+            .values_list('speaker_id', flat=True)
+            .distinct()
+        )
+
+
+class MonthlyAppearanceCount(models.Model):
+    """The number of Hansard entries a person spoke in a month
+
+    This lets the appearance summaries on person pages be made with
+    one small query, however long someone has been speaking for."""
+
+    speaker = models.ForeignKey(Person, related_name='hansard_monthly_appearances')
+    # The first day of the month:
+    month = models.DateField()
+    count = models.PositiveIntegerField()
+
+    objects = MonthlyAppearanceCountManager()
+
+    def __unicode__(self):
+        return u"%s: %s (%d)" % (self.speaker, self.month.strftime('%B %Y'), self.count)
+
+    class Meta:
+        app_label = 'hansard'
+        unique_together = ('speaker', 'month')
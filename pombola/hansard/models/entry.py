@@ -5,6 +5,7 @@ from django.db import models
 
 from pombola.core.models import Person, Place, ParliamentarySession
 from pombola.hansard.models import Sitting, Alias
+from pombola.hansard.models.appearance_count import counts_by_period
 from pombola.hansard.models.base import HansardModelBase
 
 from pombola.hansard.constants import NAME_SUBSTRING_MATCH, NAME_SET_INTERSECTION_MATCH
@@ -13,31 +14,25 @@ from pombola.hansard.constants import NAME_SUBSTRING_MATCH, NAME_SET_INTERSECTIO
 class EntryQuerySet(models.query.QuerySet):
     def monthly_appearance_counts(self):
         """Return an list of dictionaries for dates and counts for each month"""
-
-        # would prefer to do this as a single query but I can't seem to make the ORM do that.
-
-        dates = self.dates('sitting__start_date','month', 'DESC')
-        counts = []
-
-        for d in dates:
-            qs = self.filter(sitting__start_date__month=d.month, sitting__start_date__year=d.year)
-            counts.append(dict(date=d, count=qs.count()))
-
-        return counts
+        return counts_by_period(self.sitting_date_counts(), 'month')
 
     def yearly_appearance_counts(self):
         """Return an list of dictionaries for dates and counts for each year"""
-
-        # would prefer to do this as a single query but I can't seem to make the ORM do that.
-
-        dates = self.dates('sitting__start_date', 'year', 'DESC')
-        counts = []
-
-        for d in dates:
-            qs = self.filter(sitting__start_date__year=d.year)
-            counts.append(dict(date=d, count=qs.count()))
-
-        return counts
+        return counts_by_period(self.sitting_date_counts(), 'year')
+
+    def sitting_date_counts(self):
+        """Return (date, count) pairs with the number of entries on each date
+
+        This is a single grouped query; the dates are added up into
+        months or years afterwards, since the ORM can't group by those.
+        For all of one person's entries, MonthlyAppearanceCount has
+        the same counts precomputed."""
+        return (
+            self.order_by()
+            .values('sitting__start_date')
+            .annotate(count=models.Count('id'))
+            .values_list('sitting__start_date', 'count')
+        )
 
     def unassigned_speeches(self):
         """All speeches that do not have a speaker assigned"""
@@ -98,30 +93,16 @@ class Entry(HansardModelBase):
 
     @classmethod
     def assign_speakers(cls, name_matching_algorithm=NAME_SET_INTERSECTION_MATCH):
-        """Go through all entries and assign speakers"""
+        """Go through all entries and assign speakers
 
-        entries = cls.objects.all().unassigned_speeches()
+        The matching is done in bulk by SpeakerMatcher; see
+        possible_matching_speakers for the equivalent for one entry."""
 
-        # create an in memory cache of speaker names and the sitting dates, to
-        # avoid hitting the db as badly with all the repeated requests
-        cache = {}
+        # import here to avoid creating an import loop
+        from pombola.hansard.speaker_matching import SpeakerMatcher
 
-        for entry in entries:
-            cache_key = "%s-%s" % (entry.sitting.start_date, entry.speaker_name)
-
-            if cache_key in cache:
-                speakers = cache[cache_key]
-            else:
-                speakers = entry.possible_matching_speakers(
-                    update_aliases=True,
-                    name_matching_algorithm=name_matching_algorithm,
-                    )
-                cache[cache_key] = speakers
-
-            if speakers and len(speakers) == 1:
-                speaker = speakers[0]
-                entry.speaker = speaker
-                entry.save()
+        matcher = SpeakerMatcher(name_matching_algorithm=name_matching_algorithm)
+        return matcher.assign_speakers(cls.objects.all().unassigned_speeches())
 
     def alias_match_score(self, name_one, name_two):
         """
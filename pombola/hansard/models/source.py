@@ -1,4 +1,5 @@
 import os
+import tempfile
 import httplib2
 
 from django.db import models
@@ -73,12 +74,17 @@ class Source(HansardModelBase):
 
 
     def delete(self):
-        """After deleting from db, delete the cached file too"""
-        cache_file_path = self.cache_file_path()
+        """After deleting from db, delete the cached files too"""
+        cache_file_paths = [
+            self.cache_file_path(),
+            self.html_cache_file_path(),
+            self.data_cache_file_path(),
+        ]
         super( Source, self ).delete()
 
-        if os.path.exists( cache_file_path ):
-            os.remove( cache_file_path )
+        for cache_file_path in cache_file_paths:
+            if os.path.exists( cache_file_path ):
+                os.remove( cache_file_path )
 
 
     def file(self, http_object=None):
@@ -111,8 +117,18 @@ class Source(HansardModelBase):
         if response.status != 200:
             raise SourceUrlCouldNotBeRetrieved("status code: %s, url: %s" % (response.status, self.url) )
 
-        with open(cache_file_path, "w") as new_cache_file:
-            new_cache_file.write(content)
+        # Write to a temporary file and rename it into place, so that
+        # if this is interrupted a partial file isn't left in the cache
+        # (and then taken as the complete PDF):
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(cache_file_path))
+        try:
+            with os.fdopen(fd, "w") as new_cache_file:
+                new_cache_file.write(content)
+            os.rename(temporary_path, cache_file_path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
 
         return open(cache_file_path, 'r')
 
@@ -135,3 +151,13 @@ class Source(HansardModelBase):
         # create the path to the file
         cache_file_path = os.path.join(cache_dir, id_str)
         return cache_file_path
+
+
+    def html_cache_file_path(self):
+        """Absolute path to the cached HTML converted from the source"""
+        return self.cache_file_path() + '.html'
+
+
+    def data_cache_file_path(self):
+        """Absolute path to the cached JSON data parsed from the HTML"""
+        return self.cache_file_path() + '.json'
@@ -0,0 +1,105 @@
+import re
+from collections import Counter
+
+from django.db import models, transaction
+
+from pombola.core.models import Person
+from pombola.hansard.models import Sitting
+
+
+# Terms longer than this (which are most likely mangled URLs) aren't
+# worth counting:
+MAX_TERM_LENGTH = 100
+
+
+def tokenize(text):
+    """Return the lowercased words in some text, without punctuation"""
+    return re.sub(ur'[^\w\s]', '', text.lower()).split()
+
+
+class SittingTermCountQuerySet(models.query.QuerySet):
+    def popular_terms(self, exclude_terms=(), limit=50):
+        """Return a list of (term, count) tuples for the most used terms
+
+        The counts are summed over all the rows in this queryset, so
+        for example filtering on sittings and speakers first gives the
+        most popular words in those sittings and by those speakers."""
+        return list(
+            self.exclude(term__in=exclude_terms)
+            .order_by()
+            .values('term')
+            .annotate(total=models.Sum('count'))
+            .order_by('-total', 'term')
+            .values_list('term', 'total')[:limit]
+        )
+
+
+class SittingTermCountManager(models.Manager):
+    def get_queryset(self):
+        return SittingTermCountQuerySet(self.model, using=self._db)
+
+    def popular_terms(self, *args, **kwargs):
+        return self.get_queryset().popular_terms(*args, **kwargs)
+
+    def update_for_sittings(self, sitting_ids, chunk_size=50):
+        """Recount the terms used by each speaker in these sittings
+
+        This is done a few sittings at a time to limit memory use."""
+        sitting_ids = list(sitting_ids)
+        for i in range(0, len(sitting_ids), chunk_size):
+            self.recount(sitting_ids[i:i + chunk_size])
+
+    def recount(self, sitting_ids):
+        # import here to avoid creating an import loop
+        from pombola.hansard.models import Entry
+
+        counts = Counter()
+        entries = Entry.objects.filter(sitting__in=sitting_ids) \
+            .order_by() \
+            .values_list('sitting_id', 'speaker_id', 'content')
+        for sitting_id, speaker_id, content in entries.iterator():
+            for term in tokenize(content):
+                if len(term) <= MAX_TERM_LENGTH:
+                    counts[(sitting_id, speaker_id, term)] += 1
+
+        with transaction.atomic():
+            self.filter(sitting__in=sitting_ids).delete()
+            self.bulk_create(
+                (
+                    self.model(
+                        sitting_id=sitting_id,
+                        speaker_id=speaker_id,
+                        term=term,
+                        count=count,
+                    )
+                    for (sitting_id, speaker_id, term), count in counts.iteritems()
+                ),
+                batch_size=1000,
+            )
+
+    def rebuild(self):
+        self.update_for_sittings(
+            Sitting.objects.order_by('id').values_list('id', flat=True))
+
+
+class SittingTermCount(models.Model):
+    """The number of times a speaker used a term in a sitting
+
+    Entries without a speaker assigned are counted with a null speaker.
+    This lets word clouds for any number of sittings, or for a
+    particular speaker, be made with one aggregate query rather than
+    by reading the text of every entry."""
+
+    sitting = models.ForeignKey(Sitting, related_name='term_counts')
+    speaker = models.ForeignKey(
+        Person, blank=True, null=True, related_name='hansard_term_counts')
+    term = models.CharField(max_length=MAX_TERM_LENGTH)
+    count = models.PositiveIntegerField()
+
+    objects = SittingTermCountManager()
+
+    def __unicode__(self):
+        return u"%s: %s (%d)" % (self.sitting, self.term, self.count)
+
+    class Meta:
+        app_label = 'hansard'
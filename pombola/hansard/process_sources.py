@@ -0,0 +1,187 @@
+"""Process Hansard sources in stages, optionally in parallel
+
+Processing a source happens in four stages:
+
+  1. download: fetch the PDF into the cache (with Source.file, which
+     also renames a complete download into place)
+  2. convert: run pdftohtml on the PDF
+  3. parse: turn the HTML into the transcript data
+  4. write: create the sitting and its entries
+
+The output of each of the first three stages is kept in a cache file
+next to the PDF, and acts as a checkpoint: a stage whose output
+already exists is skipped.  A source is only marked as attempted once
+it has failed or reached the write stage, so if a run crashes or is
+killed, the next run picks up each unfinished source after the last
+stage it completed.
+
+With more than one worker, the stages run concurrently, connected by
+bounded queues so that a slow stage holds back the earlier ones
+rather than letting work pile up in memory.  Downloading and
+converting (which waits on a pdftohtml subprocess) use threads, while
+parsing is CPU bound so is done in worker processes.  All the database
+writes happen in the main process.
+"""
+
+import datetime
+import json
+import multiprocessing
+import os
+import Queue
+import tempfile
+import threading
+import traceback
+
+from pombola.hansard.kenya_parser import KenyaParser
+
+
+# This is put on a queue to tell a worker that there's no more work:
+STOP = None
+
+
+def write_checkpoint(path, content):
+    """Write a stage's output, so that a partial file is never left"""
+    fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+    os.rename(temporary_path, path)
+
+
+def download(source):
+    source.file().close()
+
+
+def convert(source):
+    path = source.html_cache_file_path()
+    if os.path.exists(path):
+        return
+    with source.file() as pdf:
+        html = KenyaParser.convert_pdf_to_html(pdf)
+    write_checkpoint(path, html)
+
+
+def parse(source):
+    path = source.data_cache_file_path()
+    if os.path.exists(path):
+        return
+    with open(source.html_cache_file_path()) as f:
+        data = KenyaParser.convert_html_to_data(f.read())
+    write_checkpoint(path, json.dumps(data))
+
+
+def record_attempt(source):
+    source.last_processing_attempt = datetime.datetime.now()
+    source.save()
+
+
+def write(source):
+    record_attempt(source)
+    with open(source.data_cache_file_path()) as f:
+        data = json.load(f)
+    KenyaParser.create_entries_from_data_and_source(data, source)
+
+
+def run_stage(function, source):
+    """Run one stage for a source, returning the traceback if it fails"""
+    try:
+        function(source)
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+def finish(source, error):
+    """Write the entries for a source, unless an earlier stage failed"""
+    if error is None:
+        error = run_stage(write, source)
+    else:
+        record_attempt(source)
+    return source, error
+
+
+def stage_worker(function, input_queue, output_queue):
+    while True:
+        item = input_queue.get()
+        if item is STOP:
+            return
+        source, error = item
+        if error is None:
+            error = run_stage(function, source)
+        output_queue.put((source, error))
+
+
+def start_stage(worker_class, function, workers, input_queue, output_queue, next_stage_workers):
+    """Start the workers for a stage
+
+    Once they have all finished, the workers of the next stage are
+    told to stop."""
+    stage_workers = [
+        worker_class(target=stage_worker, args=(function, input_queue, output_queue))
+        for i in range(workers)
+    ]
+    for worker in stage_workers:
+        worker.daemon = True
+        worker.start()
+
+    def stop_next_stage():
+        for worker in stage_workers:
+            worker.join()
+        for i in range(next_stage_workers):
+            output_queue.put(STOP)
+
+    stopper = threading.Thread(target=stop_next_stage)
+    stopper.daemon = True
+    stopper.start()
+
+
+def process_sources_sequentially(sources):
+    for source in sources:
+        error = None
+        for function in (download, convert, parse):
+            error = run_stage(function, source)
+            if error:
+                break
+        yield finish(source, error)
+
+
+def process_sources_in_parallel(sources, workers):
+    queue_size = 2 * workers
+    download_queue = Queue.Queue(queue_size)
+    convert_queue = Queue.Queue(queue_size)
+    parse_queue = multiprocessing.Queue(queue_size)
+    write_queue = multiprocessing.Queue(queue_size)
+
+    # The worker processes never touch the database, so they can't
+    # interfere with the main process's connection.  They're started
+    # before any threads, since forking while other threads are
+    # running isn't safe.
+    start_stage(multiprocessing.Process, parse, workers, parse_queue, write_queue, 1)
+    start_stage(threading.Thread, convert, workers, convert_queue, parse_queue, workers)
+    start_stage(threading.Thread, download, workers, download_queue, convert_queue, workers)
+
+    def feed():
+        for source in sources:
+            download_queue.put((source, None))
+        for i in range(workers):
+            download_queue.put(STOP)
+
+    feeder = threading.Thread(target=feed)
+    feeder.daemon = True
+    feeder.start()
+
+    while True:
+        item = write_queue.get()
+        if item is STOP:
+            return
+        yield finish(*item)
+
+
+def process_sources(sources, workers=1):
+    """Process each source, yielding (source, error) as each is finished
+
+    'error' is None if the source was processed successfully, or
+    the traceback of the exception that stopped it otherwise.  With
+    more than one worker, sources may finish in any order."""
+    if workers > 1:
+        return process_sources_in_parallel(list(sources), workers)
+    return process_sources_sequentially(sources)
@@ -0,0 +1,228 @@
+"""Assign speakers to many Hansard entries at once
+
+Entry.possible_matching_speakers works out the possible speakers of a
+single entry, which involves several queries (for the alias, the
+politicians at the time of the sitting, etc.).  When assigning
+speakers to years of backfilled Hansard that adds up to a very large
+number of queries, so SpeakerMatcher does the same matching for all
+unassigned entries in bulk:
+
+  - all the aliases are loaded once at the start
+  - the politicians (and the words in their names) are loaded once
+    for each sitting date, and only the current date's are kept
+  - each distinct (sitting, speaker name) pair is only matched once
+  - the new speakers are written back with one UPDATE per person, and
+    the search index is updated in batches.
+"""
+
+import re
+from collections import defaultdict
+
+from django.db import transaction
+
+from pombola.core.models import Person, Position
+from pombola.hansard.constants import NAME_SUBSTRING_MATCH, NAME_SET_INTERSECTION_MATCH
+from pombola.hansard.models import (
+    Alias, Entry, MonthlyAppearanceCount, Sitting, SittingTermCount
+)
+from pombola.search.indexing import update_search_index
+
+
+def person_name_words(name):
+    """Return the set of words used to match a person's title and name"""
+    return set(w for w in re.sub('[^A-Za-z]', ' ', name).split() if len(w) > 1)
+
+
+def speaker_name_words(name):
+    """Return the set of words used to match a name from the transcript"""
+    return set(w for w in re.sub('[^A-za-z]', ' ', name).split() if len(w) > 1)
+
+
+def name_for_matching(speaker_name, speaker_title):
+    """Return the cleaned up name that should be matched for an entry"""
+    name = speaker_name
+    # Nominated reps don't have a unique speaker name, so fall back to the speaker title
+    if re.split(r'[,\s]+', speaker_name)[0] == 'Nominated':
+        name = speaker_title
+    return Alias.clean_up_name(name)
+
+
+class SpeakerMatcher(object):
+
+    update_batch_size = 1000
+
+    def __init__(self, name_matching_algorithm=NAME_SET_INTERSECTION_MATCH):
+        self.name_matching_algorithm = name_matching_algorithm
+        self.aliases = dict(
+            (a.alias, a) for a in Alias.objects.select_related('person')
+        )
+        # Aliases that need admin attention, which will be created at
+        # the end of the run, and existing aliases that turned out to
+        # be unambiguous and should be deleted:
+        self.new_aliases = set()
+        self.aliases_to_delete = set()
+        # The entries are matched in sitting date order, so only the
+        # roster for the most recent date is kept:
+        self.roster_date = None
+        self.roster_entries = None
+
+    def roster(self, when):
+        """Return a list of (person, name words, title names) for politicians at a date"""
+        if when != self.roster_date or self.roster_entries is None:
+            people = list(
+                Person.objects.all()
+                .is_politician(when=when)
+                .exclude(hidden=True)
+                .distinct()
+            )
+            title_names = defaultdict(list)
+            if self.name_matching_algorithm == NAME_SUBSTRING_MATCH:
+                for person_id, title_name in Position.objects.filter(
+                        person__in=people, title__isnull=False
+                ).values_list('person_id', 'title__name'):
+                    title_names[person_id].append(title_name)
+            self.roster_date = when
+            self.roster_entries = [
+                (p,
+                 person_name_words('%s %s' % (p.title, p.legal_name)),
+                 title_names[p.id])
+                for p in people
+            ]
+        return self.roster_entries
+
+    def candidates_by_substring(self, sitting, name):
+        # drop the prefix
+        stripped_name = re.sub(r'^\w+\.\s', '', name).lower()
+        roster = [r for r in self.roster(sitting.start_date)
+                  if stripped_name in r[0].legal_name.lower()]
+        # if the results are ambiguous, try restricting to members of
+        # the current house unless it's a joint sitting (see the
+        # corresponding FIXME in Entry.possible_matching_speakers)
+        if len(roster) > 1 and 'Joint Sitting' not in sitting.source.name:
+            if sitting.venue.name == 'Senate':
+                house_title = 'Senator'
+            else:
+                house_title = sitting.venue.name
+            current_house = [r for r in roster
+                             if any(house_title in t for t in r[2])]
+            if current_house:
+                roster = current_house
+        return [r[0] for r in roster]
+
+    def candidates_by_set_intersection(self, sitting, name):
+        name_words = speaker_name_words(name)
+        scored = [(len(words & name_words), person)
+                  for person, words, _ in self.roster(sitting.start_date)]
+        scored = [t for t in scored if t[0] > 1]
+        scored.sort(key=lambda t: t[0], reverse=True)
+        return [person for _, person in scored]
+
+    def match(self, sitting, name):
+        """Return the possible speakers for a cleaned-up name in a sitting
+
+        This should behave as Entry.possible_matching_speakers with
+        update_aliases=True, except that changes to aliases are
+        recorded to be saved by save_aliases."""
+
+        alias = self.aliases.get(name)
+        is_new_alias = name in self.new_aliases
+        if alias:
+            if alias.ignored:
+                return []
+            elif alias.person:
+                return [alias.person]
+
+        if self.name_matching_algorithm == NAME_SUBSTRING_MATCH:
+            results = self.candidates_by_substring(sitting, name)
+        elif self.name_matching_algorithm == NAME_SET_INTERSECTION_MATCH:
+            results = self.candidates_by_set_intersection(sitting, name)
+        else:
+            results = [r[0] for r in self.roster(sitting.start_date)]
+
+        if len(results) == 0:
+            # The constituency and party lookup only needs the sitting:
+            entry = Entry(sitting=sitting)
+            place_name, party_initials = entry.place_name_and_party_initials_from_hansard_name(name)
+            if place_name and party_initials:
+                matches = entry.find_person_from_constituency_and_party_reference(place_name, party_initials)
+                if matches:
+                    results = matches
+                else:
+                    # Create alias so admins can manually match
+                    if not alias:
+                        self.new_aliases.add(name)
+                    return []
+
+        found_one_result = len(results) == 1
+
+        # If there is a single matching speaker and an unassigned alias delete it
+        if found_one_result:
+            if alias:
+                self.aliases_to_delete.add(alias.id)
+                del self.aliases[name]
+            elif is_new_alias:
+                self.new_aliases.discard(name)
+
+        # create an entry in the aliases table if one is needed
+        if not alias and not found_one_result and not Alias.can_ignore_name(name):
+            self.new_aliases.add(name)
+
+        return results
+
+    def save_aliases(self):
+        Alias.objects.filter(id__in=self.aliases_to_delete).delete()
+        Alias.objects.bulk_create(
+            Alias(alias=name, ignored=False, person=None)
+            for name in sorted(self.new_aliases)
+        )
+
+    def assign_speakers(self, entries):
+        """Assign speakers to the entries in the queryset 'entries'
+
+        Returns the number of entries that were assigned a speaker."""
+
+        rows = list(entries.values_list(
+            'id', 'sitting_id', 'speaker_name', 'speaker_title'))
+        sittings = Sitting.objects.select_related('source', 'venue') \
+            .in_bulk(set(r[1] for r in rows))
+
+        # Process sitting by sitting date so that each date's roster of
+        # politicians is only needed for a short stretch of the run.
+        rows.sort(key=lambda r: (sittings[r[1]].start_date, r[1]))
+
+        matches = {}
+        entry_ids_by_speaker = defaultdict(list)
+        assigned_sitting_ids = set()
+        for entry_id, sitting_id, speaker_name, speaker_title in rows:
+            name = name_for_matching(speaker_name, speaker_title)
+            key = (sitting_id, name)
+            if key not in matches:
+                matches[key] = self.match(sittings[sitting_id], name)
+            speakers = matches[key]
+            if len(speakers) == 1:
+                entry_ids_by_speaker[speakers[0].id].append(entry_id)
+                assigned_sitting_ids.add(sitting_id)
+
+        with transaction.atomic():
+            self.save_aliases()
+            for speaker_id, entry_ids in entry_ids_by_speaker.items():
+                for i in range(0, len(entry_ids), self.update_batch_size):
+                    Entry.objects.filter(
+                        id__in=entry_ids[i:i + self.update_batch_size]
+                    ).update(speaker=speaker_id)
+            # The term counts are split by speaker, so recount them:
+            SittingTermCount.objects.update_for_sittings(assigned_sitting_ids)
+            MonthlyAppearanceCount.objects.update_for_speakers(entry_ids_by_speaker)
+
+        assigned_ids = [i for ids in entry_ids_by_speaker.values() for i in ids]
+        for i in range(0, len(assigned_ids), self.update_batch_size):
+            update_search_index(
+                Entry,
+                Entry.objects.filter(
+                    id__in=assigned_ids[i:i + self.update_batch_size]
+                ).select_related('sitting', 'speaker').prefetch_related(
+                    'speaker__alias_set', 'speaker__alternative_names'
+                )
+            )
+
+        return len(assigned_ids)
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+
+from django.test import TestCase
+
+from mock import patch
+from nose.plugins.attrib import attr
+
+from pombola.hansard.api.pagination import IdCursorPagination
+from pombola.hansard.models import Entry, Sitting, Source, Venue
+
+
+@attr(country='kenya')
+class HansardAPITest(TestCase):
+
+    def setUp(self):
+        venue = Venue.objects.create(name='National Assembly', slug='national_assembly')
+        source = Source.objects.create(date=date(2015, 8, 24), name='test source')
+        self.sittings = [
+            Sitting.objects.create(
+                start_date=date(2015, 8, day), source=source, venue=venue)
+            for day in (24, 25)
+        ]
+        self.entries = [
+            Entry.objects.create(
+                sitting=sitting,
+                type='speech',
+                page_number=1,
+                text_counter=i,
+                content='Entry {0}'.format(i),
+            )
+            for sitting in self.sittings
+            for i in range(3)
+        ]
+
+    def test_entries_are_paginated_by_page_number_by_default(self):
+        response = self.client.get('/api/v0.1/hansard/entries/')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(data['count'], 6)
+        self.assertEqual(
+            [e['id'] for e in data['results']],
+            [e.id for e in self.entries])
+
+    @patch.object(IdCursorPagination, 'page_size', 2)
+    def test_entries_are_paginated_with_cursors(self):
+        ids = []
+        url = '/api/v0.1/hansard/entries/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.content)
+            ids += [e['id'] for e in data['results']]
+            url = data['next']
+        self.assertEqual(ids, [e.id for e in self.entries])
+
+    def test_entries_export_since(self):
+        response = self.client.get(
+            '/api/v0.1/hansard/entries/export/',
+            {'since': self.entries[1].id})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line)['id'] for line in lines],
+            [e.id for e in self.entries[2:]])
+
+    def test_sittings_export(self):
+        response = self.client.get('/api/v0.1/hansard/sittings/export/')
+        lines = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(
+            [json.loads(line)['start_date'] for line in lines],
+            ['2015-08-24', '2015-08-25'])
+
+    def test_invalid_since(self):
+        response = self.client.get(
+            '/api/v0.1/hansard/entries/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.test import TestCase
+
+from pombola.core.models import Person
+from pombola.hansard.models import (
+    Entry, MonthlyAppearanceCount, Sitting, Source, Venue
+)
+
+
+class MonthlyAppearanceCountTest(TestCase):
+
+    def setUp(self):
+        venue = Venue.objects.create(name='test', slug='test')
+        source = Source.objects.create(date=date(2012, 1, 1), name='test')
+        self.person = Person.objects.create(legal_name='Daffy Duck', slug='daffy-duck')
+        sitting_dates = (
+            date(2011, 11, 15), date(2011, 11, 16), date(2011, 12, 1), date(2012, 3, 5)
+        )
+        for text_counter, start_date in enumerate(sitting_dates):
+            sitting = Sitting.objects.create(
+                start_date=start_date, source=source, venue=venue)
+            for i in range(2):
+                Entry.objects.create(
+                    speaker=self.person,
+                    sitting=sitting,
+                    page_number=1,
+                    text_counter=text_counter * 2 + i,
+                )
+
+    def test_counts_match_entries(self):
+        MonthlyAppearanceCount.objects.update_for_speakers([self.person.id])
+        entries = Entry.objects.filter(speaker=self.person)
+        counts = MonthlyAppearanceCount.objects.filter(speaker=self.person)
+
+        expected_monthly = [
+            {'date': date(2012, 3, 1), 'count': 2},
+            {'date': date(2011, 12, 1), 'count': 2},
+            {'date': date(2011, 11, 1), 'count': 4},
+        ]
+        self.assertEqual(entries.monthly_appearance_counts(), expected_monthly)
+        self.assertEqual(counts.monthly_counts(), expected_monthly)
+
+        expected_yearly = [
+            {'date': date(2012, 1, 1), 'count': 2},
+            {'date': date(2011, 1, 1), 'count': 6},
+        ]
+        self.assertEqual(entries.yearly_appearance_counts(), expected_yearly)
+        self.assertEqual(counts.yearly_counts(), expected_yearly)
+
+    def test_recount_removes_old_months(self):
+        MonthlyAppearanceCount.objects.update_for_speakers([self.person.id])
+        Entry.objects.filter(sitting__start_date__year=2011).update(speaker=None)
+        MonthlyAppearanceCount.objects.update_for_speakers([self.person.id])
+
+        self.assertEqual(
+            MonthlyAppearanceCount.objects.filter(speaker=self.person).monthly_counts(),
+            [{'date': date(2012, 3, 1), 'count': 2}])
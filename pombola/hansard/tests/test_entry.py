@@ -153,3 +153,39 @@ class HansardEntryTest(TestCase):
             self.mp,
             possible_speakers[0]
         )
+
+    def test_assign_speakers_in_bulk(self):
+        self.na_sitting.save()
+        self.senate_sitting.save()
+        na_entries = [
+            Entry.objects.create(
+                sitting       = self.na_sitting,
+                type          = 'speech',
+                page_number   = 12,
+                text_counter  = i,
+                speaker_name  = 'Jones',
+                speaker_title = 'Hon.',
+                content       = 'test',
+            )
+            for i in range(3)
+        ]
+        senate_entry = Entry.objects.create(
+            sitting       = self.senate_sitting,
+            type          = 'speech',
+            page_number   = 12,
+            text_counter  = 1,
+            speaker_name  = 'Jones',
+            speaker_title = 'Hon.',
+            content       = 'test',
+        )
+
+        assigned = Entry.assign_speakers(
+            name_matching_algorithm=NAME_SUBSTRING_MATCH)
+
+        self.assertEqual(assigned, 4)
+        for entry in na_entries:
+            self.assertEqual(Entry.objects.get(pk=entry.pk).speaker, self.mp)
+        self.assertEqual(
+            Entry.objects.get(pk=senate_entry.pk).speaker,
+            self.senator
+        )
@@ -0,0 +1,67 @@
+import datetime
+import json
+import os
+import shutil
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from nose.plugins.attrib import attr
+
+from pombola.hansard.models import Entry, Sitting, Source
+
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+@attr(country='kenya')
+class ProcessSourcesTest(TestCase):
+
+    def setUp(self):
+        self.source = Source.objects.create(
+            name='Test source',
+            url='http://example.com/foo/bar/testing',
+            date=datetime.date(2011, 9, 1),
+        )
+        # Put the PDF in the cache, and the HTML converted from it in
+        # place as a checkpoint, so that neither the download nor the
+        # conversion (which needs a particular version of pdftohtml)
+        # has to happen:
+        shutil.copy(
+            os.path.join(tests_dir, '2011-09-01-assembly-sample.pdf'),
+            self.source.cache_file_path())
+        shutil.copy(
+            os.path.join(tests_dir, '2011-09-01-assembly-sample.html'),
+            self.source.html_cache_file_path())
+        with open(os.path.join(tests_dir, '2011-09-01-assembly-sample.json')) as f:
+            self.expected_data = json.load(f)
+
+    def tearDown(self):
+        self.source.delete()
+
+    def check_processed(self):
+        source = Source.objects.get(pk=self.source.id)
+        self.assertTrue(source.last_processing_attempt)
+        self.assertTrue(source.last_processing_success)
+        sitting = Sitting.objects.get(source=source)
+        self.assertEqual(
+            Entry.objects.filter(sitting=sitting).count(),
+            len(self.expected_data['transcript']))
+        self.assertTrue(os.path.exists(source.data_cache_file_path()))
+
+    def test_process_sources(self):
+        call_command('hansard_process_sources')
+        self.check_processed()
+
+    def test_process_sources_in_parallel(self):
+        call_command('hansard_process_sources', workers=2)
+        self.check_processed()
+
+    def test_resumes_from_parsed_data(self):
+        # If the data was parsed before a run was interrupted, the
+        # entries should be created from it without parsing again:
+        os.remove(self.source.html_cache_file_path())
+        with open(self.source.data_cache_file_path(), 'w') as f:
+            json.dump(self.expected_data, f)
+        call_command('hansard_process_sources', workers=2)
+        self.check_processed()
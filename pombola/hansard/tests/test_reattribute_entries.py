@@ -5,7 +5,7 @@ from mock import patch
 
 from pombola.core.models import Person
 from pombola.hansard.models import (
-    Entry, Source, Sitting, Venue
+    Entry, MonthlyAppearanceCount, Source, Sitting, Venue
 )
 
 from django.core.management import call_command
@@ -81,6 +81,11 @@ class ReattributeEntriesCommandTest(TestCase):
         self.assertEqual(0, Entry.objects.filter(speaker=self.person_a).count())
         self.assertEqual(3, Entry.objects.filter(speaker=self.person_b).count())
 
+        # ... and that the monthly appearances have been recounted:
+        self.assertFalse(MonthlyAppearanceCount.objects.filter(speaker=self.person_a).exists())
+        self.assertEqual(
+            3, len(MonthlyAppearanceCount.objects.filter(speaker=self.person_b).monthly_counts()))
+
     @patch('__builtin__.raw_input', return_value='y')
     def test_reassign_all_with_slugs(self, mock_input):
         options = {
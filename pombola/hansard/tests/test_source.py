@@ -4,6 +4,8 @@ from collections import namedtuple
 
 from django.test import TestCase
 
+from mock import patch
+
 from pombola.hansard.models import Source, SourceUrlCouldNotBeRetrieved
 
 
@@ -86,6 +88,22 @@ class HansardSourceTest(TestCase):
         self.assertFalse( os.path.exists( source.cache_file_path() ))
 
 
+    def test_interrupted_download_leaves_no_cache_file(self):
+        """Check that a partly written download isn't left in the cache"""
+        source = self.source
+        cache_file_path = source.cache_file_path()
+        with patch('pombola.hansard.models.source.os.rename',
+                   side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                source.file(http_object=FakeHttp())
+        self.assertFalse( os.path.exists( cache_file_path ))
+
+        # The next attempt should fetch the whole file again:
+        self.assertTrue( len( source.file(http_object=FakeHttp()).read() ) )
+        self.assertTrue( os.path.exists( cache_file_path ))
+        source.delete()
+
+
     def test_requires_processing(self):
         """Check requires_processing qs works"""
         
@@ -6,7 +6,7 @@ from django.http import Http404
 from django.template   import RequestContext
 from django.views.generic import TemplateView, DetailView, ListView
 
-from pombola.hansard.models import Sitting, Entry
+from pombola.hansard.models import Sitting, Entry, MonthlyAppearanceCount
 from pombola.core.models import Person
 
 # import models
@@ -159,7 +159,8 @@ def person_summary(request, slug):
 
     entries_qs = Entry.objects.filter(speaker=person)
 
-    lifetime_summary = entries_qs.monthly_appearance_counts()
+    lifetime_summary = MonthlyAppearanceCount.objects.filter(
+        speaker=person).monthly_counts()
 
     context = {
         'person':           person,
@@ -1,6 +1,7 @@
 from optparse import make_option
 from django.core.management.base import NoArgsCommand
 from ...models import Release, Category, Entry, EntryLineItem
+from ...tabulation import invalidate_tabulations
 
 
 class Command(NoArgsCommand):
@@ -28,5 +29,6 @@ class Command(NoArgsCommand):
             print "  Executing the delete"
             Release.objects.all().delete()
             Category.objects.all().delete()
+            invalidate_tabulations()
         else:
             print "  Not executing the delete (--commit not specified)"
@@ -1,10 +1,14 @@
 import json
+from optparse import make_option
+import time
 
 from django.contrib.contenttypes.models import ContentType
-from django.core.management.base import LabelCommand
+from django.core.management.base import CommandError, LabelCommand
+from django.db import transaction
 
 from pombola.core.models import Person, InformationSource
-from ...models import Release, Category, Entry, EntryLineItem
+from ...models import Release, Category, Entry, EntryLineItem, update_summaries
+from ...tabulation import invalidate_tabulations
 
 
 release_content_type = ContentType.objects.get_for_model(Release)
@@ -13,12 +17,157 @@ class Command(LabelCommand):
     help = 'Import entries from our own JSON format'
     args = '<JSON file>'
 
+    option_list = LabelCommand.option_list + (
+        make_option('--bulk', action='store_true', dest='bulk', default=False,
+                    help='Look everything up first and insert all the entries in one transaction'),
+    )
+
+    batch_size = 1000
+
     def handle_label(self,  input_filename, **options):
 
+        start = time.time()
         with open(input_filename) as fp:
             data = json.load(fp)
+
+        if options['bulk']:
+            release_ids, entries_count, line_items_count = self.bulk_import(data)
+        else:
+            release_ids = set()
+            entries_count = line_items_count = 0
             for grouping in data:
-                self.handle_grouping(grouping)
+                release = self.handle_grouping(grouping)
+                if release:
+                    release_ids.add(release.id)
+                    entries_count += len(grouping['entries'])
+                    line_items_count += sum(len(lines) for lines in grouping['entries'])
+
+        # Recompute the numbers of declarations shown in the
+        # interests register browser, and make sure that no tables of
+        # interests from before the import are shown:
+        update_summaries(release_ids)
+        invalidate_tabulations()
+
+        if int(options['verbosity']) > 0:
+            elapsed = time.time() - start
+            self.stdout.write(
+                "Imported {0} entries and {1} line items in {2:.1f}s ({3:.0f} entries/s)".format(
+                    entries_count, line_items_count, elapsed,
+                    entries_count / elapsed if elapsed else 0))
+
+    def get_people(self, groupings):
+        """Find the person for each grouping, returning a list in the same order
+
+        The people are looked up in one query per set of fields used
+        to identify them (normally just the slug)."""
+        lookups_by_fields = {}
+        for grouping in groupings:
+            lookup = grouping['person']
+            lookups_by_fields.setdefault(tuple(sorted(lookup)), set()).add(
+                tuple(lookup[f] for f in sorted(lookup)))
+
+        people = {}
+        for fields, values in lookups_by_fields.items():
+            if len(fields) == 1:
+                field = fields[0]
+                for person in Person.objects.filter(**{field + '__in': [v[0] for v in values]}):
+                    people[(fields, (getattr(person, field),))] = person
+            else:
+                for value in values:
+                    try:
+                        people[(fields, value)] = Person.objects.get(**dict(zip(fields, value)))
+                    except Person.DoesNotExist:
+                        pass
+
+        result = []
+        for grouping in groupings:
+            lookup = grouping['person']
+            fields = tuple(sorted(lookup))
+            person = people.get((fields, tuple(lookup[f] for f in fields)))
+            if person is None:
+                self.stderr.write("Failed to find the person from: " + repr(lookup))
+            result.append(person)
+        return result
+
+    def bulk_import(self, data):
+        """Import all the groupings at once, returning the release IDs and counts
+
+        The people, releases and categories are all looked up or
+        created before any entries are, and then the entries and their
+        line items are inserted in batches in a single transaction, so
+        either the whole file is imported or none of it is."""
+
+        with transaction.atomic():
+            people = self.get_people(data)
+
+            releases = {}
+            categories = {}
+            release_sources = set()
+            for grouping in data:
+                release_data = dict(grouping['release'])
+                source_url = release_data.pop('source_url')
+                release_key = tuple(sorted(release_data.items()))
+                if release_key not in releases:
+                    releases[release_key], _ = Release.objects.get_or_create(**release_data)
+                release = releases[release_key]
+                grouping['release'] = release
+
+                category_key = tuple(sorted(grouping['category'].items()))
+                if category_key not in categories:
+                    categories[category_key], _ = Category.objects.get_or_create(**grouping['category'])
+                grouping['category'] = categories[category_key]
+
+                release_sources.add((source_url, release.name, release.id))
+
+            # record release sources
+            for source_url, release_name, release_id in release_sources:
+                InformationSource.objects.get_or_create(
+                    source=source_url,
+                    note=release_name,
+                    entered=True,
+                    content_type=release_content_type,
+                    object_id=release_id
+                )
+
+            # As with the one-at-a-time import, refuse to add entries for
+            # a person, release and category that already has some,
+            # including those earlier in the same file.
+            release_ids = set(release.id for release in releases.values())
+            seen = set(Entry.objects.filter(release__in=release_ids).values_list(
+                'person_id', 'release_id', 'category_id').distinct())
+
+            entries = []
+            line_items_data = {}
+            for grouping, person in zip(data, people):
+                if person is None:
+                    continue
+                entry_args = dict(person=person, release=grouping['release'], category=grouping['category'])
+                key = (person.id, grouping['release'].id, grouping['category'].id)
+                if key in seen:
+                    raise CommandError("Found existing entries for {person}, {category} and {release}. Please delete before continuing.".format(**entry_args))
+                seen.add(key)
+
+                for sort_order, lines in enumerate(grouping['entries'], 1):
+                    entries.append(Entry(sort_order=sort_order, **entry_args))
+                    line_items_data[key + (sort_order,)] = lines
+
+            Entry.objects.bulk_create(entries, batch_size=self.batch_size)
+
+            # bulk_create doesn't set the primary keys of the new
+            # entries, so fetch them to attach the line items to:
+            line_items = []
+            new_entries = Entry.objects.filter(release__in=release_ids).values_list(
+                'id', 'person_id', 'release_id', 'category_id', 'sort_order')
+            for entry_id, person_id, release_id, category_id, sort_order in new_entries:
+                lines = line_items_data.get((person_id, release_id, category_id, sort_order))
+                if lines is None:
+                    continue
+                for key, value in lines.items():
+                    line_items.append(EntryLineItem(entry_id=entry_id, key=key, value=value))
+
+            EntryLineItem.objects.bulk_create(line_items, batch_size=self.batch_size)
+
+        return release_ids, len(entries), len(line_items)
 
     def handle_grouping(self, grouping):
         # print grouping
@@ -58,3 +207,5 @@ class Command(LabelCommand):
             # print entry
             for key, value in lines.items():
                 line_item = EntryLineItem.objects.create(entry=entry, key=key, value=value)
+
+        return release
@@ -0,0 +1,20 @@
+# This command recomputes the numbers of declarations by person and by
+# source that are shown in the interests register browser.  They're
+# filled when the summary tables are created and updated after each
+# import, so this only needs to be run if entries are edited.
+
+from django.core.management.base import NoArgsCommand
+
+from ...models import PersonCategorySummary, SourceCategorySummary, Release, update_summaries
+
+
+class Command(NoArgsCommand):
+
+    help = 'Rebuild the summary tables used by the interests register browser'
+
+    def handle_noargs(self, **options):
+        update_summaries(Release.objects.values_list('id', flat=True))
+        if int(options['verbosity']) > 1:
+            print "There are now {0} person and {1} source summaries".format(
+                PersonCategorySummary.objects.count(),
+                SourceCategorySummary.objects.count())
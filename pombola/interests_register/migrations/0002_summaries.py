@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_add_related_name'),
+        ('interests_register', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonCategorySummary',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(related_name='+', to='interests_register.Category')),
+                ('person', models.ForeignKey(related_name='+', to='core.Person')),
+                ('release', models.ForeignKey(related_name='+', to='interests_register.Release')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SourceCategorySummary',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('source', models.TextField()),
+                ('count', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(related_name='+', to='interests_register.Category')),
+                ('release', models.ForeignKey(related_name='+', to='interests_register.Release')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='sourcecategorysummary',
+            index_together=set([('release', 'category')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='personcategorysummary',
+            index_together=set([('release', 'category')]),
+        ),
+    ]
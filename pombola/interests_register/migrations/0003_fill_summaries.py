@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interests_register', '0002_summaries'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            INSERT INTO interests_register_personcategorysummary
+                (release_id, category_id, person_id, count)
+            SELECT release_id, category_id, person_id, count(*)
+            FROM interests_register_entry
+            GROUP BY release_id, category_id, person_id
+            """,
+            "DELETE FROM interests_register_personcategorysummary",
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO interests_register_sourcecategorysummary
+                (release_id, category_id, source, count)
+            SELECT e.release_id, e.category_id, li.value, count(*)
+            FROM interests_register_entrylineitem li
+            JOIN interests_register_entry e ON e.id = li.entry_id
+            WHERE li.key = 'Source'
+            GROUP BY e.release_id, e.category_id, li.value
+            """,
+            "DELETE FROM interests_register_sourcecategorysummary",
+        ),
+    ]
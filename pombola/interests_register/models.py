@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count
 from django.utils.text import slugify
 
 from pombola.core.models import Person
@@ -70,3 +71,114 @@ class EntryLineItem(models.Model):
     def __unicode__(self):
         return u"{0}: {1}".format(self.key, self.value)
 
+
+class SummaryManager(models.Manager):
+    """A manager for tables of precomputed numbers of declarations
+
+    The counts are recomputed for whole releases at a time, after
+    they've been imported."""
+
+    def replace_for_releases(self, release_ids, rows):
+        """Replace the rows for these releases
+
+        'rows' should be an iterable of dictionaries of field values."""
+        with transaction.atomic():
+            self.filter(release__in=release_ids).delete()
+            self.bulk_create(
+                (self.model(**row) for row in rows),
+                batch_size=1000,
+            )
+
+
+class PersonCategorySummaryManager(SummaryManager):
+
+    def update_for_releases(self, release_ids):
+        release_ids = list(release_ids)
+        rows = (
+            Entry.objects.filter(release__in=release_ids)
+            .order_by()
+            .values('release', 'category', 'person')
+            .annotate(count=Count('id'))
+        )
+        self.replace_for_releases(release_ids, (
+            {
+                'release_id': row['release'],
+                'category_id': row['category'],
+                'person_id': row['person'],
+                'count': row['count'],
+            }
+            for row in rows
+        ))
+
+
+class PersonCategorySummary(models.Model):
+    """The number of entries a person declared in a category in a release"""
+
+    release  = models.ForeignKey(Release, related_name="+")
+    category = models.ForeignKey(Category, related_name="+")
+    person   = models.ForeignKey(Person, related_name="+")
+    count    = models.PositiveIntegerField()
+
+    objects = PersonCategorySummaryManager()
+
+    def __unicode__(self):
+        return u'{0} entries for {1} in {2} ({3})'.format(
+            self.count, self.person_id, self.category_id, self.release_id)
+
+    class Meta(object):
+        index_together = [
+            ('release', 'category'),
+        ]
+
+
+class SourceCategorySummaryManager(SummaryManager):
+
+    def update_for_releases(self, release_ids):
+        release_ids = list(release_ids)
+        rows = (
+            EntryLineItem.objects.filter(
+                entry__release__in=release_ids,
+                key='Source',
+            )
+            .order_by()
+            .values('entry__release', 'entry__category', 'value')
+            .annotate(count=Count('id'))
+        )
+        self.replace_for_releases(release_ids, (
+            {
+                'release_id': row['entry__release'],
+                'category_id': row['entry__category'],
+                'source': row['value'],
+                'count': row['count'],
+            }
+            for row in rows
+        ))
+
+
+class SourceCategorySummary(models.Model):
+    """The number of entries in a category and release from one source
+
+    The source is the value of the entries' 'Source' line items."""
+
+    release  = models.ForeignKey(Release, related_name="+")
+    category = models.ForeignKey(Category, related_name="+")
+    source   = models.TextField()
+    count    = models.PositiveIntegerField()
+
+    objects = SourceCategorySummaryManager()
+
+    def __unicode__(self):
+        return u'{0} entries from {1} in {2} ({3})'.format(
+            self.count, self.source, self.category_id, self.release_id)
+
+    class Meta(object):
+        index_together = [
+            ('release', 'category'),
+        ]
+
+
+def update_summaries(release_ids):
+    """Recompute the summary tables for these releases"""
+    release_ids = list(release_ids)
+    PersonCategorySummary.objects.update_for_releases(release_ids)
+    SourceCategorySummary.objects.update_for_releases(release_ids)
@@ -0,0 +1,205 @@
+"""Tabulate people's declarations of interests for display
+
+Entries are turned into a table per release and category, with a
+column for each line item key.  This is done for all of a person's
+releases on their page, and for one release of each of a page of
+people in the complete view of the register.  Building the tables
+needs the entries and all their line items, so the results are
+cached.
+
+The cache keys include a generation number, which
+interests_register_import_from_json (and deleting the existing
+register) increases with invalidate_tabulations, so that nothing
+tabulated before an import is used afterwards.
+"""
+
+import time
+from collections import OrderedDict
+from itertools import groupby
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from pombola.core.models import InformationSource
+
+from .models import Entry, EntryLineItem, Release
+
+
+GENERATION_CACHE_KEY = 'interests-register-generation'
+PERSON_CACHE_KEY = 'interests-register-person:{generation}:{person_id}:{release_id}'
+RELEASE_PERSON_CACHE_KEY = 'interests-register-release-person:{generation}:{release_id}:{person_id}'
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def get_generation():
+    """Return the current generation of cached interests tables"""
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        # Start from the current time rather than 1, so that if the
+        # generation is evicted from the cache, any tables cached
+        # before that still can't be used:
+        cache.add(GENERATION_CACHE_KEY, int(time.time()), None)
+        generation = cache.get(GENERATION_CACHE_KEY)
+    return generation
+
+
+def invalidate_tabulations():
+    """Stop any previously cached interests tables from being used"""
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        # There wasn't a generation yet, so there's nothing cached:
+        pass
+
+
+def get_release_sources(release_ids):
+    """Return a dict mapping release IDs to lists of their sources"""
+    sources = dict((release_id, []) for release_id in release_ids)
+    for source in InformationSource.objects.filter(
+            content_type=ContentType.objects.get_for_model(Release),
+            object_id__in=sources.keys()):
+        sources[source.object_id].append(source)
+    return sources
+
+
+def tabulate_line_items(entries):
+    """Return the headings and rows of a table of entries
+
+    There's a column for each line item key, in the order they're
+    first seen, and every row has a cell for each column.  The
+    entries' line items should be prefetched."""
+    headings = []
+    heading_index = {}
+    rows = []
+    for entry in entries:
+        row = [''] * len(headings)
+        rows.append(row)
+        for line_item in entry.line_items.all():
+            # If the heading for the column doesn't exist yet, add it,
+            # with an empty cell in every row so far:
+            if line_item.key not in heading_index:
+                heading_index[line_item.key] = len(headings)
+                headings.append(line_item.key)
+                for line in rows:
+                    line.append('')
+            row[heading_index[line_item.key]] = line_item.value
+    return headings, rows
+
+
+def entries_with_line_items(entries):
+    return entries.select_related('release', 'category').prefetch_related(
+        Prefetch('line_items', queryset=EntryLineItem.objects.order_by('id')))
+
+
+def tabulate_person_interests(person):
+    """Return a person's interests as a list of (release data, date) tuples
+
+    These are most recent first.  The release data is a dictionary
+    with the release's name, its sources and a dictionary of tables,
+    one per category, keyed by category ID.  Every row in a table has
+    a cell for each of its headings."""
+
+    entries_by_table = OrderedDict()
+    for entry in entries_with_line_items(person.interests_register_entries.all()):
+        entries_by_table.setdefault(
+            (entry.release, entry.category), []).append(entry)
+
+    tabulated = {}
+    release_dates = {}
+    for (release, category), entries in entries_by_table.items():
+        if release.id not in tabulated:
+            tabulated[release.id] = {
+                'name': release.name,
+                'categories': {},
+            }
+            release_dates[release.id] = release.date
+
+        headings, rows = tabulate_line_items(entries)
+        tabulated[release.id]['categories'][category.id] = {
+            'name': category.name,
+            'headings': headings,
+            'headingindex': dict((key, i) for i, key in enumerate(headings)),
+            'headingcount': len(headings) + 1,
+            'entries': rows,
+        }
+
+    sources = get_release_sources(tabulated.keys())
+    for release_id, release_data in tabulated.items():
+        release_data['informationsource'] = sources[release_id]
+
+    return sorted(
+        ((release_data, release_dates[release_id])
+         for release_id, release_data in tabulated.items()),
+        key=lambda x: x[1],
+        reverse=True)
+
+
+def tabulate_release_entries(entries):
+    """Turn one person's entries in a release into a table per category
+
+    This is the form used by the complete view of the register.
+    'entries' should be ordered by category ID and then sort order."""
+    tables = []
+    for category, category_entries in groupby(entries, lambda e: e.category):
+        headings, rows = tabulate_line_items(category_entries)
+        tables.append({
+            'category': category,
+            'headers': headings,
+            'data': rows,
+        })
+    return tables
+
+
+def get_release_tables(release_and_person_ids):
+    """Return a dict mapping (release ID, person ID) to tabulated entries
+
+    Any tables that aren't cached are made from a single query."""
+    generation = get_generation()
+
+    def cache_key(ids):
+        release_id, person_id = ids
+        return RELEASE_PERSON_CACHE_KEY.format(
+            generation=generation, release_id=release_id, person_id=person_id)
+
+    keys = dict((cache_key(ids), ids) for ids in release_and_person_ids)
+    cached = cache.get_many(keys.keys())
+    tables = dict((keys[key], table) for key, table in cached.items())
+
+    missing = set(ids for key, ids in keys.items() if key not in cached)
+    if missing:
+        # Order by the IDs rather than the release and person, since
+        # those would use the models' default orderings, which might
+        # interleave the entries of different people.
+        entries = entries_with_line_items(Entry.objects.filter(
+            release__in=set(release_id for release_id, person_id in missing),
+            person__in=set(person_id for release_id, person_id in missing),
+        )).order_by('release__id', 'person__id', 'category__id', 'sort_order', 'id')
+
+        to_cache = {}
+        for ids, person_entries in groupby(
+                entries, lambda e: (e.release_id, e.person_id)):
+            if ids in missing:
+                tables[ids] = to_cache[cache_key(ids)] = \
+                    tabulate_release_entries(person_entries)
+        cache.set_many(to_cache, CACHE_TIMEOUT)
+
+    return tables
+
+
+def get_tabulated_interests(person):
+    """Return tabulate_person_interests for a person, using the cache
+
+    The cached tables are per person and latest release, so a new
+    release is picked up even if the generation hasn't changed."""
+    latest_release_id = Release.objects.order_by('-id') \
+        .values_list('id', flat=True).first()
+    key = PERSON_CACHE_KEY.format(
+        generation=get_generation(),
+        person_id=person.id,
+        release_id=latest_release_id)
+    tabulated = cache.get(key)
+    if tabulated is None:
+        tabulated = tabulate_person_interests(person)
+        cache.set(key, tabulated, CACHE_TIMEOUT)
+    return tabulated
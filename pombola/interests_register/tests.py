@@ -5,8 +5,24 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
+import json
+from StringIO import StringIO
+from tempfile import NamedTemporaryFile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
-from .models import Category, Release
+from django.test.utils import override_settings
+
+from pombola.core.models import Person
+
+from .models import (
+    Category, Entry, EntryLineItem, PersonCategorySummary, Release,
+    SourceCategorySummary, update_summaries
+)
+from .tabulation import (
+    get_release_tables, get_tabulated_interests, invalidate_tabulations
+)
 
 class InterestsRegisterModelTests(TestCase):
     def test_category_creates_own_slug(self):
@@ -16,3 +32,191 @@ class InterestsRegisterModelTests(TestCase):
     def test_release_creates_own_slug(self):
         rel = Release.objects.create(name=u"Foo Bar", date="2013-12-04")
         self.assertEqual(rel.slug, 'foo-bar')
+
+
+class SummaryTests(TestCase):
+    def setUp(self):
+        self.person = Person.objects.create(legal_name=u"Alice Smith", slug='asmith')
+        self.category = Category.objects.create(name=u"Gifts", sort_order=1)
+        self.release = Release.objects.create(name=u"2013 Data", date="2013-02-16")
+        for sort_order, source in enumerate((u'Source1', u'Source1', u'Source2'), 1):
+            entry = Entry.objects.create(
+                person=self.person,
+                category=self.category,
+                release=self.release,
+                sort_order=sort_order)
+            EntryLineItem.objects.create(entry=entry, key=u'Source', value=source)
+            EntryLineItem.objects.create(entry=entry, key=u'Value', value=u'R100')
+
+    def test_update_summaries(self):
+        update_summaries([self.release.id])
+
+        person_summary = PersonCategorySummary.objects.get()
+        self.assertEqual(person_summary.person, self.person)
+        self.assertEqual(person_summary.category, self.category)
+        self.assertEqual(person_summary.release, self.release)
+        self.assertEqual(person_summary.count, 3)
+
+        self.assertEqual(
+            sorted(SourceCategorySummary.objects.values_list('source', 'count')),
+            [(u'Source1', 2), (u'Source2', 1)])
+
+    def test_update_summaries_replaces_old_counts(self):
+        update_summaries([self.release.id])
+        Entry.objects.filter(sort_order=3).delete()
+        update_summaries([self.release.id])
+
+        self.assertEqual(PersonCategorySummary.objects.get().count, 2)
+        self.assertEqual(
+            list(SourceCategorySummary.objects.values_list('source', 'count')),
+            [(u'Source1', 2)])
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.alice = Person.objects.create(legal_name=u"Alice Smith", slug='asmith')
+        self.bob = Person.objects.create(legal_name=u"Bob Jones", slug='bjones')
+        release = {
+            'name': u"2013 Data",
+            'date': '2013-02-16',
+            'source_url': 'http://example.com/register.pdf',
+        }
+        self.data = [
+            {
+                'person': {'slug': 'asmith'},
+                'release': release,
+                'category': {'name': u"Gifts", 'sort_order': 1},
+                'entries': [
+                    {'Source': u'Source1', 'Value': u'R100'},
+                    {'Source': u'Source2'},
+                ],
+            },
+            {
+                'person': {'slug': 'bjones'},
+                'release': release,
+                'category': {'name': u"Gifts", 'sort_order': 1},
+                'entries': [{'Source': u'Source1'}],
+            },
+            {
+                'person': {'slug': 'nobody'},
+                'release': release,
+                'category': {'name': u"Gifts", 'sort_order': 1},
+                'entries': [{'Source': u'Source3'}],
+            },
+        ]
+
+    def import_data(self, data, **options):
+        with NamedTemporaryFile(suffix='.json') as f:
+            json.dump(data, f)
+            f.flush()
+            call_command(
+                'interests_register_import_from_json', f.name,
+                verbosity=0, stderr=StringIO(), **options)
+
+    def check_imported(self):
+        release = Release.objects.get()
+        self.assertEqual(release.name, u"2013 Data")
+        self.assertEqual(
+            [(e.sort_order, sorted((li.key, li.value) for li in e.line_items.all()))
+             for e in Entry.objects.filter(person=self.alice).order_by('sort_order')],
+            [(1, [(u'Source', u'Source1'), (u'Value', u'R100')]),
+             (2, [(u'Source', u'Source2')])])
+        self.assertEqual(Entry.objects.filter(person=self.bob).count(), 1)
+        self.assertEqual(Entry.objects.count(), 3)
+        self.assertEqual(
+            PersonCategorySummary.objects.get(person=self.alice).count, 2)
+
+    def test_import(self):
+        self.import_data(self.data)
+        self.check_imported()
+
+    def test_bulk_import(self):
+        self.import_data(self.data, bulk=True)
+        self.check_imported()
+
+    def test_bulk_import_refuses_duplicates(self):
+        self.import_data(self.data, bulk=True)
+        with self.assertRaises(CommandError):
+            self.import_data(self.data[:1], bulk=True)
+        self.assertEqual(Entry.objects.count(), 3)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class TabulationTests(TestCase):
+    def setUp(self):
+        invalidate_tabulations()
+        self.person = Person.objects.create(legal_name=u"Alice Smith", slug='asmith')
+        self.category = Category.objects.create(name=u"Gifts", sort_order=1)
+        self.release = Release.objects.create(name=u"2013 Data", date="2013-02-16")
+        self.add_entry(1, [(u'Source', u'Source1')])
+        self.add_entry(2, [(u'Value', u'R100'), (u'Source', u'Source2')])
+
+    def add_entry(self, sort_order, line_items):
+        entry = Entry.objects.create(
+            person=self.person,
+            category=self.category,
+            release=self.release,
+            sort_order=sort_order)
+        for key, value in line_items:
+            EntryLineItem.objects.create(entry=entry, key=key, value=value)
+
+    def test_tabulation(self):
+        [(release_data, release_date)] = get_tabulated_interests(self.person)
+        self.assertEqual(release_data['name'], u"2013 Data")
+        table = release_data['categories'][self.category.id]
+        self.assertEqual(table['headings'], [u'Source', u'Value'])
+        self.assertEqual(
+            table['entries'],
+            [[u'Source1', ''], [u'Source2', u'R100']])
+
+    def test_tabulation_cached_until_invalidated(self):
+        get_tabulated_interests(self.person)
+        self.add_entry(3, [(u'Source', u'Source3')])
+
+        with self.assertNumQueries(1):
+            [(release_data, _)] = get_tabulated_interests(self.person)
+        self.assertEqual(
+            len(release_data['categories'][self.category.id]['entries']), 2)
+
+        invalidate_tabulations()
+        [(release_data, _)] = get_tabulated_interests(self.person)
+        self.assertEqual(
+            len(release_data['categories'][self.category.id]['entries']), 3)
+
+    def test_release_tables_for_people_with_the_same_name(self):
+        other_person = Person.objects.create(
+            legal_name=u"Alice Smith", slug='asmith-2')
+        other_category = Category.objects.create(name=u"Benefits", sort_order=2)
+        entry = Entry.objects.create(
+            person=other_person,
+            category=self.category,
+            release=self.release,
+            sort_order=1)
+        EntryLineItem.objects.create(entry=entry, key=u'Source', value=u'Source3')
+        entry = Entry.objects.create(
+            person=self.person,
+            category=other_category,
+            release=self.release,
+            sort_order=3)
+        EntryLineItem.objects.create(entry=entry, key=u'Benefit', value=u'Car')
+
+        tables = get_release_tables([
+            (self.release.id, self.person.id),
+            (self.release.id, other_person.id),
+        ])
+
+        self.assertEqual(
+            [(t['category'], t['headers'], t['data'])
+             for t in tables[(self.release.id, self.person.id)]],
+            [
+                (self.category, [u'Source', u'Value'],
+                 [[u'Source1', ''], [u'Source2', u'R100']]),
+                (other_category, [u'Benefit'], [[u'Car']]),
+            ])
+        self.assertEqual(
+            [(t['category'], t['headers'], t['data'])
+             for t in tables[(self.release.id, other_person.id)]],
+            [(self.category, [u'Source'], [[u'Source3']])])
+
@@ -26,6 +26,7 @@ from pombola.experiments.views import (
     ExperimentViewDataMixin, ExperimentFormSubmissionMixin,
     sanitize_parameter
 )
+from pombola.hansard.models import MonthlyAppearanceCount
 from pombola.hansard.views import HansardPersonMixin
 from pombola.kenya import shujaaz
 from pombola.sms.models import Message, Question
@@ -218,8 +219,8 @@ class KEPersonDetailAppearances(HansardPersonMixin, PersonDetailSub, KEPersonDet
     def get_context_data(self, **kwargs):
         context = super(KEPersonDetailAppearances, self).get_context_data(**kwargs)
         context['hansard_entries_to_show'] = ":5"
-        context['lifetime_summary'] = context['hansard_entries'] \
-            .yearly_appearance_counts()
+        context['lifetime_summary'] = MonthlyAppearanceCount.objects \
+            .filter(speaker=self.object).yearly_counts()
         return context
 
 
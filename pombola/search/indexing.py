@@ -0,0 +1,106 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+
+from haystack import connection_router, connections
+from haystack.exceptions import NotHandled
+
+from pombola.search.models import IndexQueueItem
+
+
+QUEUED_SIGNAL_PROCESSOR = 'pombola.search.signals.QueuedSignalProcessor'
+
+
+def indexing_is_queued():
+    return settings.HAYSTACK_SIGNAL_PROCESSOR == QUEUED_SIGNAL_PROCESSOR
+
+
+def update_search_index(model, objects):
+    """Update the search index for many objects of the same model at once
+
+    This is useful after bulk database operations (e.g. QuerySet.update
+    or bulk_create) which don't send the signals that the signal
+    processor relies on.  If indexing is queued, the objects are just
+    added to the queue; otherwise it sends a single batch of documents
+    to each search backend rather than one request per object.
+    'objects' can be any iterable of model instances, such as a
+    queryset with the related objects that the index needs already
+    selected."""
+
+    if indexing_is_queued():
+        if hasattr(objects, 'values_list'):
+            object_ids = objects.values_list('pk', flat=True)
+        else:
+            object_ids = [o.pk for o in objects]
+        IndexQueueItem.objects.enqueue(model, object_ids, IndexQueueItem.UPDATE)
+        return
+
+    for using in connection_router.for_write():
+        try:
+            index = connections[using].get_unified_index().get_index(model)
+        except NotHandled:
+            continue
+        connections[using].get_backend().update(index, objects)
+
+
+def apply_index_changes(model, object_ids_to_update, object_ids_to_remove):
+    """Update and remove the index entries for objects of one model
+
+    Objects that are to be updated but which no longer exist (or are
+    no longer included by the index's index_queryset) are removed."""
+
+    for using in connection_router.for_write():
+        try:
+            index = connections[using].get_unified_index().get_index(model)
+        except NotHandled:
+            continue
+        backend = connections[using].get_backend()
+
+        objects = list(index.index_queryset(using=using).filter(
+            pk__in=object_ids_to_update))
+        if objects:
+            backend.update(
+                index, [o for o in objects if index.should_update(o)])
+
+        missing_ids = set(object_ids_to_update) - set(o.pk for o in objects)
+        for object_id in sorted(missing_ids | set(object_ids_to_remove)):
+            backend.remove('{0}.{1}.{2}'.format(
+                model._meta.app_label, model._meta.model_name, object_id))
+
+
+def process_index_queue_batch(batch_size=500):
+    """Apply the oldest queued index changes, returning how many there were
+
+    If an object was queued more than once in the batch, only its
+    latest action is applied."""
+
+    items = list(
+        IndexQueueItem.objects.order_by('id')
+        .values_list('id', 'content_type_id', 'object_id', 'action')
+        [:batch_size]
+    )
+    if not items:
+        return 0
+
+    latest_actions = {}
+    for item_id, content_type_id, object_id, action in items:
+        latest_actions[(content_type_id, object_id)] = action
+
+    changes = defaultdict(lambda: ([], []))
+    for (content_type_id, object_id), action in latest_actions.items():
+        to_update, to_remove = changes[content_type_id]
+        if action == IndexQueueItem.DELETE:
+            to_remove.append(object_id)
+        else:
+            to_update.append(object_id)
+
+    for content_type_id, (to_update, to_remove) in changes.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is not None:
+            apply_index_changes(model, to_update, to_remove)
+
+    # Only the items that were processed are deleted, so anything
+    # queued in the meantime will be dealt with by the next batch.
+    IndexQueueItem.objects.filter(id__in=[i[0] for i in items]).delete()
+    return len(items)
@@ -0,0 +1,43 @@
+# This command applies the search index changes that have been queued
+# by QueuedSignalProcessor (or by update_search_index) when saving or
+# deleting objects.  It should be run every minute from cron.
+
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.search.indexing import process_index_queue_batch
+from pombola.search.models import IndexQueueItem
+
+
+class Command(NoArgsCommand):
+
+    help = 'Update the search index from the queue of changed objects'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--batch-size', dest='batch_size', type='int', default=500,
+                    help='How many queued changes to apply at once'),
+    )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options['verbosity'])
+
+        lag = IndexQueueItem.objects.lag()
+        if verbosity > 0:
+            if lag is None:
+                print "The search index queue is empty"
+            else:
+                print "{0} queued changes, the oldest was queued {1} seconds ago".format(
+                    IndexQueueItem.objects.count(), int(lag.total_seconds()))
+
+        processed = 0
+        while True:
+            batch_processed = process_index_queue_batch(options['batch_size'])
+            processed += batch_processed
+            if batch_processed < options['batch_size']:
+                break
+            if verbosity > 1:
+                print "Applied {0} queued changes so far".format(processed)
+
+        if verbosity > 1:
+            print "Applied {0} queued changes".format(processed)
@@ -0,0 +1,55 @@
+import datetime
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class IndexQueueItemManager(models.Manager):
+
+    def enqueue(self, model, object_ids, action):
+        """Queue index updates (or removals) for these objects"""
+        content_type = ContentType.objects.get_for_model(model)
+        self.bulk_create(
+            (
+                self.model(
+                    content_type=content_type,
+                    object_id=object_id,
+                    action=action,
+                )
+                for object_id in object_ids
+            ),
+            batch_size=1000,
+        )
+
+    def lag(self):
+        """Return how long the oldest item has been waiting, or None"""
+        oldest = self.aggregate(oldest=models.Min('queued'))['oldest']
+        if oldest is None:
+            return None
+        return datetime.datetime.now() - oldest
+
+
+class IndexQueueItem(models.Model):
+    """An object whose entry in the search index is out of date
+
+    These are queued by QueuedSignalProcessor whenever an indexed
+    object is saved or deleted, and are dealt with in batches by the
+    search_process_index_queue command.  The same object may be queued
+    many times; only its latest action matters."""
+
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = (
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+    )
+
+    content_type = models.ForeignKey(ContentType, related_name='+')
+    object_id = models.PositiveIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    queued = models.DateTimeField(auto_now_add=True)
+
+    objects = IndexQueueItemManager()
+
+    def __unicode__(self):
+        return u"%s %s.%s" % (self.action, self.content_type_id, self.object_id)
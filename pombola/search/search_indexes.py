@@ -1,11 +1,12 @@
 from django.conf import settings
 
 from haystack import indexes
+from sorl.thumbnail import get_thumbnail
 
 from pombola.core import models as core_models
 
-# TODO - currently this uses the realtime search index - which is possibly a bad
-# idea if the site gets heavy load. Switch to a queue as suggested in the docs:
+# Changes to these objects are queued by pombola.search.signals.QueuedSignalProcessor
+# and applied by the search_process_index_queue command, as suggested in the docs:
 #   http://docs.haystacksearch.org/dev/best_practices.html#use-of-a-queue-for-a-better-user-experience
 
 # TODO - all the search result html could be cached to save db access when
@@ -19,26 +20,61 @@ from pombola.core import models as core_models
 class BaseIndex(indexes.SearchIndex):
     text = indexes.CharField(document=True, use_template=True)
 
-class PersonIndex(BaseIndex, indexes.Indexable):
+class BaseAutocompleteIndex(BaseIndex):
+    """An index which also stores what the autocomplete view displays
+
+    These fields aren't searchable, but are returned with each result
+    so that the autocomplete view doesn't need to load each object
+    (or generate thumbnails) from the database for every keystroke."""
+
+    autocomplete_url = indexes.CharField(indexed=False)
+    autocomplete_name = indexes.CharField(indexed=False, model_attr='name')
+    autocomplete_image_url = indexes.CharField(indexed=False)
+    autocomplete_type = indexes.CharField(indexed=False)
+    autocomplete_extra_data = indexes.CharField(indexed=False, null=True)
+    autocomplete_session_end_date = indexes.DateField(indexed=False, null=True)
+
+    def prepare_autocomplete_url(self, obj):
+        return obj.get_absolute_url()
+
+    def prepare_autocomplete_image_url(self, obj):
+        if hasattr(obj, 'primary_image'):
+            image = obj.primary_image()
+            if image:
+                return get_thumbnail(image, '16x16', crop="center").url
+        return "/static/images/" + obj.css_class() + "-16x16.jpg"
+
+    def prepare_autocomplete_type(self, obj):
+        return obj.css_class()
+
+    def prepare_autocomplete_extra_data(self, obj):
+        return getattr(obj, 'extra_autocomplete_data', None)
+
+    def prepare_autocomplete_session_end_date(self, obj):
+        session = getattr(obj, 'parliamentary_session', None)
+        if session:
+            return session.end_date
+
+class PersonIndex(BaseAutocompleteIndex, indexes.Indexable):
     name_auto = indexes.EdgeNgramField(model_attr='name')
     hidden = indexes.BooleanField(model_attr='hidden')
 
     def get_model(self):
         return core_models.Person
 
-class PlaceIndex(BaseIndex, indexes.Indexable):
+class PlaceIndex(BaseAutocompleteIndex, indexes.Indexable):
     name_auto = indexes.EdgeNgramField(model_attr='name')
 
     def get_model(self):
         return core_models.Place
 
-class OrganisationIndex(BaseIndex, indexes.Indexable):
+class OrganisationIndex(BaseAutocompleteIndex, indexes.Indexable):
     name_auto = indexes.EdgeNgramField(model_attr='name')
 
     def get_model(self):
         return core_models.Organisation
 
-class PositionTitleIndex(BaseIndex, indexes.Indexable):
+class PositionTitleIndex(BaseAutocompleteIndex, indexes.Indexable):
     name_auto = indexes.EdgeNgramField(model_attr='name')
 
     def get_model(self):
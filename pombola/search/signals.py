@@ -0,0 +1,45 @@
+from django.db import models
+
+from haystack.exceptions import NotHandled
+from haystack.signals import BaseSignalProcessor
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """Queue changes to indexed objects rather than indexing them at once
+
+    With haystack's RealtimeSignalProcessor, every save of an indexed
+    object waits for the search backend to be updated, which slows down
+    admin saves and imports.  Instead, this just records which objects
+    need updating or removing in the database, and those changes are
+    applied in batches by the search_process_index_queue command."""
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+
+    def is_indexed(self, sender, instance):
+        for using in self.connection_router.for_write(instance=instance):
+            try:
+                self.connections[using].get_unified_index().get_index(sender)
+                return True
+            except NotHandled:
+                pass
+        return False
+
+    def enqueue(self, sender, instance, action):
+        # This is imported here since signal processors are created
+        # before the models are loaded:
+        from pombola.search.models import IndexQueueItem
+
+        if self.is_indexed(sender, instance):
+            IndexQueueItem.objects.enqueue(sender, [instance.pk], action)
+
+    def handle_save(self, sender, instance, **kwargs):
+        self.enqueue(sender, instance, 'update')
+
+    def handle_delete(self, sender, instance, **kwargs):
+        self.enqueue(sender, instance, 'delete')
@@ -0,0 +1,63 @@
+from django.test import TestCase
+
+from haystack import connection_router, connections
+from mock import patch
+
+from pombola.core.models import ContactKind, Person
+from pombola.search.indexing import process_index_queue_batch
+from pombola.search.models import IndexQueueItem
+from pombola.search.signals import QueuedSignalProcessor
+
+
+class QueuedSignalProcessorTest(TestCase):
+
+    def setUp(self):
+        self.signal_processor = QueuedSignalProcessor(connections, connection_router)
+
+    def tearDown(self):
+        self.signal_processor.teardown()
+
+    def test_changes_are_queued(self):
+        person = Person.objects.create(legal_name='Alice Smith', slug='alice-smith')
+        person_id = person.id
+        person.delete()
+        self.assertEqual(
+            list(IndexQueueItem.objects.order_by('id').values_list('object_id', 'action')),
+            [(person_id, 'update'), (person_id, 'delete')])
+
+    def test_saving_an_indexed_model_queues_one_update(self):
+        person = Person.objects.create(legal_name='Alice Smith', slug='alice-smith')
+        self.assertEqual(
+            list(IndexQueueItem.objects.values_list('object_id', 'action')),
+            [(person.id, IndexQueueItem.UPDATE)])
+
+    def test_unindexed_models_are_not_queued(self):
+        ContactKind.objects.create(name='Phone', slug='phone')
+        self.assertFalse(IndexQueueItem.objects.exists())
+
+
+class ProcessIndexQueueTest(TestCase):
+
+    @patch('pombola.search.indexing.apply_index_changes')
+    def test_latest_action_is_applied(self, apply_index_changes):
+        IndexQueueItem.objects.enqueue(Person, [1, 2], IndexQueueItem.UPDATE)
+        IndexQueueItem.objects.enqueue(Person, [1], IndexQueueItem.DELETE)
+        IndexQueueItem.objects.enqueue(Person, [2, 3], IndexQueueItem.UPDATE)
+
+        self.assertEqual(process_index_queue_batch(), 5)
+
+        self.assertEqual(apply_index_changes.call_count, 1)
+        model, to_update, to_remove = apply_index_changes.call_args[0]
+        self.assertEqual(model, Person)
+        self.assertEqual(sorted(to_update), [2, 3])
+        self.assertEqual(to_remove, [1])
+        self.assertFalse(IndexQueueItem.objects.exists())
+
+    @patch('pombola.search.indexing.apply_index_changes')
+    def test_batches(self, apply_index_changes):
+        IndexQueueItem.objects.enqueue(Person, range(1, 6), IndexQueueItem.UPDATE)
+        self.assertEqual(process_index_queue_batch(batch_size=3), 3)
+        self.assertEqual(
+            sorted(IndexQueueItem.objects.values_list('object_id', flat=True)),
+            [4, 5])
+        self.assertIsNotNone(IndexQueueItem.objects.lag())
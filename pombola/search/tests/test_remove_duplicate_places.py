@@ -0,0 +1,23 @@
+from datetime import date
+import unittest
+
+from pombola.search.views import remove_duplicate_places
+
+
+class RemoveDuplicatePlacesTest(unittest.TestCase):
+
+    def result(self, name, result_type, session_end_date):
+        return {
+            'name': name,
+            'extra_data': 'Constituency',
+            'type': result_type,
+            'session_end_date': session_end_date,
+        }
+
+    def test_keeps_place_from_latest_session(self):
+        older = self.result('Ainabkoi', 'place', date(2013, 1, 14))
+        newer = self.result('Ainabkoi', 'place', date(9999, 12, 31))
+        other = self.result('Ainamoi', 'place', date(2013, 1, 14))
+        response_data = [older, other, newer]
+        remove_duplicate_places(response_data)
+        self.assertEqual(response_data, [other, newer])
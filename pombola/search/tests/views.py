@@ -174,3 +174,4 @@ class SearchPaginationTest(TestCase):
         self.assertEqual(paginator._count, 3)
         self.assertEqual(paginator._num_pages, 2)
         self.assertEqual(page.number, 1)
+
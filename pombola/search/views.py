@@ -1,4 +1,5 @@
 from datetime import datetime
+import hashlib
 import re
 import sys
 import simplejson
@@ -6,6 +7,7 @@ import simplejson
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import HttpResponse, HttpResponseBadRequest
 from django.conf import settings
+from django.core.cache import cache
 
 from django.views.generic import TemplateView
 
@@ -15,7 +17,6 @@ from haystack.query import SearchQuerySet
 from haystack.inputs import AutoQuery, Raw
 
 from pygeolib import GeocoderError
-from sorl.thumbnail import get_thumbnail
 from .geocoder import geocoder
 
 
@@ -373,12 +374,15 @@ known_kinds = {
 }
 
 def places_ordered_by_session(place_a, place_b):
-    """Return True if both places have sessions and place_b's is later"""
-    a_session = place_a.parliamentary_session
-    b_session = place_b.parliamentary_session
-    if not (a_session and b_session):
+    """Return True if both places have sessions and place_b's is later
+
+    The places are autocomplete results, with the end date of their
+    parliamentary session (if any) in 'session_end_date'."""
+    a_end_date = place_a['session_end_date']
+    b_end_date = place_b['session_end_date']
+    if not (a_end_date and b_end_date):
         return False
-    return a_session.end_date < b_session.end_date
+    return a_end_date < b_end_date
 
 def remove_duplicate_places(response_data):
     """Remove all but the newest of places with indistinguishable labels
@@ -398,10 +402,9 @@ def remove_duplicate_places(response_data):
 
     for i, result in enumerate(response_data):
         this_label = (result['name'], result['extra_data'])
-        this_object = result['object']
-        if (this_label in previous_label_index) and type(this_object) == models.Place:
+        if (this_label in previous_label_index) and result['type'] == 'place':
             previous_i = previous_label_index[this_label]
-            if places_ordered_by_session(response_data[previous_i]['object'], this_object):
+            if places_ordered_by_session(response_data[previous_i], result):
                 indices_to_remove.append(previous_i)
                 previous_label_index[this_label] = i
             else:
@@ -414,78 +417,91 @@ def remove_duplicate_places(response_data):
     for index_to_remove in indices_to_remove:
         del response_data[index_to_remove]
 
-def autocomplete(request):
-    """Return autocomplete JSON results"""
+# Autocomplete results are requested on every keystroke, and the same
+# prefixes are typed by many people, so cache them briefly:
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
 
-    term = request.GET.get('term','').strip()
-    response_data = []
+def autocomplete_cache_key(term, model_kind):
+    key_data = u'{0}:{1}'.format(model_kind or '', term).encode('utf-8')
+    return 'autocomplete:' + hashlib.md5(key_data).hexdigest()
 
-    if len(term):
+def get_autocomplete_results(term, model_kind):
+    """Return the autocomplete results for a normalized search term
 
-        # Does not work - probably because the FLAG_PARTIAL is not set on Xapian
-        # (trying to set it in settings.py as documented appears to have no effect)
-        # sqs = SearchQuerySet().autocomplete(name_auto=term)
+    All the data for each result comes from fields stored in the
+    search index, so this doesn't query the database at all."""
 
-        # Split the search term up into little bits
-        terms = re.split(r'\s+', term)
+    response_data = []
 
-        # Build up a query based on the bits
-        sqs = SearchQuerySet()
-        for bit in terms:
-            # print "Adding '%s' to the '%s' query" % (bit,term)
-            sqs = sqs.filter_and(
-                name_auto__startswith = sqs.query.clean( bit )
-            )
-        sqs = sqs.exclude(hidden=False)
-
-        # If we have a kind then filter on that too
-        model_kind = request.GET.get('model', None)
-        if model_kind:
-            model = known_kinds.get(model_kind, None)
-            if model:
-                sqs = sqs.models(model)
-        else:
-            sqs = sqs.models(
-                models.Person,
-                models.Organisation,
-                models.Place,
-                models.PositionTitle,
-            )
+    # Does not work - probably because the FLAG_PARTIAL is not set on Xapian
+    # (trying to set it in settings.py as documented appears to have no effect)
+    # sqs = SearchQuerySet().autocomplete(name_auto=term)
+
+    # Split the search term up into little bits
+    terms = re.split(r'\s+', term)
 
-        # collate the results into json for the autocomplete js
-        for result in sqs.all()[0:10]:
+    # Build up a query based on the bits
+    sqs = SearchQuerySet()
+    for bit in terms:
+        # print "Adding '%s' to the '%s' query" % (bit,term)
+        sqs = sqs.filter_and(
+            name_auto__startswith = sqs.query.clean( bit )
+        )
+    sqs = sqs.exclude(hidden=False)
+
+    # If we have a kind then filter on that too
+    model = known_kinds.get(model_kind, None) if model_kind else None
+    if model:
+        sqs = sqs.models(model)
+    elif not model_kind:
+        sqs = sqs.models(
+            models.Person,
+            models.Organisation,
+            models.Place,
+            models.PositionTitle,
+        )
 
-            o = result.object
-            css_class = o.css_class()
+    # collate the results into json for the autocomplete js
+    for result in sqs.values(
+            'autocomplete_url',
+            'autocomplete_name',
+            'autocomplete_image_url',
+            'autocomplete_type',
+            'autocomplete_extra_data',
+            'autocomplete_session_end_date',
+    )[0:10]:
+        response_data.append({
+            'url': result['autocomplete_url'],
+            'name': result['autocomplete_name'],
+            'image_url': result['autocomplete_image_url'],
+            'extra_data': result['autocomplete_extra_data'],
+            'type': result['autocomplete_type'],
+            'value': result['autocomplete_name'],
+            'session_end_date': result['autocomplete_session_end_date'],
+        })
 
-            extra_autocomplete_data = None
-            if hasattr(o, 'extra_autocomplete_data'):
-                extra_autocomplete_data = o.extra_autocomplete_data
+    remove_duplicate_places(response_data)
 
-            image_url = None
-            if hasattr(o, 'primary_image'):
-                image = o.primary_image()
-                if image:
-                    image_url = get_thumbnail(image, '16x16', crop="center").url
+    # Remove the 'session_end_date' elements before returning the response:
+    for d in response_data:
+        del d['session_end_date']
 
-            if not image_url:
-                image_url = "/static/images/" + css_class + "-16x16.jpg"
+    return response_data
 
-            response_data.append({
-                'url': o.get_absolute_url(),
-                'name': o.name,
-                'image_url': image_url,
-                'extra_data': extra_autocomplete_data,
-                'type': css_class,
-                'value': o.name,
-                'object': o
-            })
+def autocomplete(request):
+    """Return autocomplete JSON results"""
 
-    remove_duplicate_places(response_data)
+    # Normalize the term so that equivalent requests share a cache entry:
+    term = ' '.join(request.GET.get('term', '').lower().split())
+    model_kind = request.GET.get('model', None)
+    response_data = []
 
-    # Remove the 'object' elements before returning the response:
-    for d in response_data:
-        del d['object']
+    if len(term):
+        cache_key = autocomplete_cache_key(term, model_kind)
+        response_data = cache.get(cache_key)
+        if response_data is None:
+            response_data = get_autocomplete_results(term, model_kind)
+            cache.set(cache_key, response_data, AUTOCOMPLETE_CACHE_TIMEOUT)
 
     # send back the results as JSON
     return HttpResponse(
@@ -312,7 +312,9 @@ HAYSTACK_CONNECTIONS = {
     },
 }
 
-HAYSTACK_SIGNAL_PROCESSOR = 'haystack.signals.RealtimeSignalProcessor'
+# Changes to indexed objects are queued, and the index is updated from
+# the queue by the search_process_index_queue command:
+HAYSTACK_SIGNAL_PROCESSOR = 'pombola.search.signals.QueuedSignalProcessor'
 
 # Admin autocomplete
 AJAX_LOOKUP_CHANNELS = {
@@ -37,3 +37,7 @@ MAP_BOUNDING_BOX_WEST = None
 # assets, as suggested here:
 #   https://github.com/cyberdelia/django-pipeline/issues/277
 STATICFILES_STORAGE = 'pipeline.storage.PipelineStorage'
+
+# Update the search index immediately, so that tests can search for
+# objects that they've just created:
+HAYSTACK_SIGNAL_PROCESSOR = 'haystack.signals.RealtimeSignalProcessor'
@@ -12,6 +12,7 @@ from optparse import make_option
 from pombola.core.models import (Organisation, OrganisationKind,
                          Person, Position,
                          PositionTitle, AlternativePersonName)
+from pombola.south_africa.models import ElectionStatistics
 from django.core.management.base import NoArgsCommand
 from django.db.models import Q
 
@@ -336,3 +337,6 @@ class Command(NoArgsCommand):
             for row in candidiates:
                 if not search(row[3], row[4], row[0], row[2], row[1]):
                     add_new_person(row[0], row[2], row[1], row[3], row[4])
+
+        if COMMIT:
+            ElectionStatistics.objects.update_for_year(YEAR)
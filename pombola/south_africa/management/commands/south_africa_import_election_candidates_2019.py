@@ -17,6 +17,7 @@ from pombola.core.models import (
     PositionTitle,
     AlternativePersonName,
 )
+from pombola.south_africa.models import ElectionStatistics
 from django.core.management.base import NoArgsCommand
 from django.db.models import Q
 from django.db.utils import IntegrityError
@@ -481,6 +482,9 @@ class Command(NoArgsCommand):
             if not search(full_names, surname, party_name, order_number, list_type, id_number):
                 add_new_person(party_name, order_number, list_type, full_names, surname, id_number)
 
+        if COMMIT:
+            ElectionStatistics.objects.update_for_year(YEAR)
+
         if errors:
             print("ERRORS:")
             for error in errors:
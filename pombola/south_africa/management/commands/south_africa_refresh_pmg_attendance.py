@@ -0,0 +1,50 @@
+# This command fetches the committee meeting attendance data from the
+# PMG API into the PMGAttendance table, which is where the attendance
+# views read it from - they never fetch it themselves.  It should be
+# run regularly from cron.
+
+import requests
+
+from django.core.management.base import BaseCommand
+
+from pombola.south_africa.pmg_attendance import (
+    PMG_API_BASE_URL, PMGAttendanceFetcher, people_needing_attendance
+)
+
+
+class Command(BaseCommand):
+    help = "Refresh the stored committee meeting attendance data from PMG"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--api-url', default=PMG_API_BASE_URL,
+                            help="The base URL of the PMG API")
+        parser.add_argument('--workers', type=int, default=8,
+                            help="The number of concurrent requests to make")
+        parser.add_argument('--skip-members', action='store_true',
+                            help="Only refresh the all-members dataset")
+
+    def handle(self, **options):
+        verbose_level = int(options['verbosity'])
+
+        fetcher = PMGAttendanceFetcher(
+            base_url=options['api_url'], workers=options['workers'])
+        try:
+            try:
+                results = fetcher.refresh_meetings_by_member()
+                verbose_level > 1 and self.stdout.write(
+                    "Stored {0} years of attendance for all members\n".format(len(results)))
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.stderr.write(
+                    "Failed to refresh the attendance of all members: {0}\n".format(e))
+
+            if not options['skip_members']:
+                failures = fetcher.refresh_members(people_needing_attendance())
+                if failures:
+                    self.stderr.write(
+                        "Failed to refresh the attendance of {0} members\n".format(failures))
+        finally:
+            fetcher.close()
+
+        verbose_level > 1 and self.stdout.write(
+            "Fetched {0} pages, {1} pages were not modified\n".format(
+                fetcher.pages_fetched, fetcher.pages_not_modified))
@@ -0,0 +1,27 @@
+# This command recalculates the statistics shown on the election
+# statistics page. They're updated whenever election candidates are
+# imported, so this only needs to be run if positions have been edited
+# by hand since then.
+
+from optparse import make_option
+
+from django.core.management.base import CommandError, NoArgsCommand
+
+from pombola.south_africa.models import ElectionStatistics
+
+
+class Command(NoArgsCommand):
+
+    help = 'Recalculate the statistics for an election'
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--year', '-y', help="The year of the election"),
+    )
+
+    def handle_noargs(self, **options):
+        if not options['year']:
+            raise CommandError("You must specify a year")
+        statistics = ElectionStatistics.objects.update_for_year(options['year'])
+        if int(options['verbosity']) > 1:
+            print "{0} of {1} current MPs are standing again".format(
+                statistics.rerunning_mps, statistics.current_mps)
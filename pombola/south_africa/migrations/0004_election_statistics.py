@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_placeboundaryoverlap'),
+        ('south_africa', '0003_attendancefororganisationtoggle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ElectionStatistics',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('election_year', models.CharField(unique=True, max_length=4)),
+                ('current_mps', models.PositiveIntegerField()),
+                ('rerunning_mps', models.PositiveIntegerField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('party_switchers', models.ManyToManyField(related_name='election_statistics_party_switches', to='core.Person')),
+            ],
+            options={
+                'verbose_name_plural': 'election statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='ElectionPartyStatistics',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('current_mps', models.PositiveIntegerField()),
+                ('rerunning_mps', models.PositiveIntegerField()),
+                ('party', models.ForeignKey(related_name='election_statistics', to='core.Organisation')),
+                ('statistics', models.ForeignKey(related_name='parties', to='south_africa.ElectionStatistics')),
+            ],
+            options={
+                'verbose_name_plural': 'election party statistics',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='electionpartystatistics',
+            unique_together=set([('statistics', 'party')]),
+        ),
+    ]
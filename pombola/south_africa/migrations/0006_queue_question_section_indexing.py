@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+# Searches of the question index use a search document for each
+# question section, so queue all the existing ones to be indexed by the
+# search_process_index_queue command, rather than leaving the searches
+# empty until someone runs update_index.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('south_africa', '0005_pmgattendance'),
+        ('speeches', '0001_initial'),
+        ('za_hansard', '0006_fill_sectionsummary'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            INSERT INTO search_indexqueueitem (content_type_id, object_id, action, queued)
+            SELECT ct.id, s.id, 'update', now()
+            FROM speeches_section s
+            JOIN speeches_section minister ON minister.id = s.parent_id
+            JOIN speeches_section questions ON questions.id = minister.parent_id
+            JOIN za_hansard_sectionsummary summary ON summary.section_id = s.id
+            JOIN django_content_type ct
+                ON ct.app_label = 'speeches' AND ct.model = 'section'
+            WHERE questions.heading = 'Questions'
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,10 +1,16 @@
-from pombola.core.models import Place, Position, Organisation
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Q, When
+
+from pombola.core.models import Place, Person, Position, Organisation
 
 class ZAPlace(Place):
     class Meta:
         proxy = True
 
     def postal_addresses(self):
+        # LatLonDetailBaseView prefetches these for many places at once:
+        if hasattr(self.organisation, 'address_contacts'):
+            return self.organisation.address_contacts
         return self.organisation.contacts.filter(kind__slug='address')
 
     def related_positions(self):
@@ -29,4 +35,191 @@ class AttendanceForOrganisationToggle(Organisation):
     class Meta:
         proxy = True
         verbose_name = 'Toggle attendance for party'
-        verbose_name_plural = 'Toggle attendance for parties'
\ No newline at end of file
+        verbose_name_plural = 'Toggle attendance for parties'
+
+
+def election_list_query(election_year):
+    """Return a Q object matching the candidate lists for an election
+
+    These are the national lists, and the regional lists for the
+    national election."""
+    return (
+        Q(organisation__slug__contains='national-election-list-' + election_year) |
+        (Q(organisation__slug__contains='election-list-' + election_year) &
+         Q(organisation__slug__contains='regional'))
+    )
+
+
+def percent_rerunning(current_mps, rerunning_mps):
+    if not current_mps:
+        return 0
+    return 100 * rerunning_mps / current_mps
+
+
+class ElectionStatisticsManager(models.Manager):
+
+    def calculate_for_year(self, election_year):
+        """Calculate the statistics for an election, without storing them
+
+        The counts for every party are made with one grouped query.
+        This returns a dictionary with the total 'current_mps' and
+        'rerunning_mps', a list of (party ID, current MPs, rerunning
+        MPs) tuples as 'parties', and the 'party_switcher_ids'."""
+
+        current_na_people = Position.objects \
+            .filter(organisation__slug='national-assembly') \
+            .currently_active() \
+            .values('person_id')
+        rerunning_people = Position.objects \
+            .filter(election_list_query(election_year)) \
+            .values('person_id')
+
+        party_counts = Position.objects \
+            .filter(
+                organisation__kind__slug='party',
+                person_id__in=current_na_people) \
+            .order_by() \
+            .values('organisation_id') \
+            .annotate(
+                current=Count('person_id', distinct=True),
+                rerunning=Count(
+                    Case(When(person_id__in=rerunning_people, then=F('person_id'))),
+                    distinct=True)) \
+            .values_list('organisation_id', 'current', 'rerunning')
+
+        # People who have been a member of more than one party, and
+        # who are standing in this election:
+        party_switcher_ids = Person.objects \
+            .filter(
+                position__organisation__kind__slug='party',
+                position__title__slug='member') \
+            .annotate(num_parties=Count('position')) \
+            .filter(num_parties__gt=1) \
+            .filter(
+                id__in=Position.objects
+                .filter(organisation__slug__contains='election-list-' + election_year)
+                .values('person_id')) \
+            .values_list('id', flat=True)
+
+        return {
+            'current_mps': Person.objects.filter(id__in=current_na_people).count(),
+            'rerunning_mps': Person.objects
+                .filter(id__in=current_na_people)
+                .filter(id__in=rerunning_people)
+                .count(),
+            'parties': list(party_counts),
+            'party_switcher_ids': list(party_switcher_ids),
+        }
+
+    def update_for_year(self, election_year):
+        """Recalculate and store the statistics for an election
+
+        This is done by the candidate import commands, so that it
+        doesn't need to be done for each request to the election
+        statistics page."""
+
+        calculated = self.calculate_for_year(election_year)
+        with transaction.atomic():
+            statistics, _ = self.update_or_create(
+                election_year=election_year,
+                defaults={
+                    'current_mps': calculated['current_mps'],
+                    'rerunning_mps': calculated['rerunning_mps'],
+                })
+            statistics.parties.all().delete()
+            ElectionPartyStatistics.objects.bulk_create(
+                ElectionPartyStatistics(
+                    statistics=statistics,
+                    party_id=party_id,
+                    current_mps=current,
+                    rerunning_mps=rerunning,
+                )
+                for party_id, current, rerunning in calculated['parties']
+            )
+            statistics.party_switchers = calculated['party_switcher_ids']
+        return statistics
+
+    def get_for_year(self, election_year):
+        """Return the statistics for an election, in the same form as calculate_for_year
+
+        The stored statistics are used if there are any; otherwise
+        they're calculated, but not stored, so that viewing the
+        statistics page never writes to the database."""
+        try:
+            statistics = self.get(election_year=election_year)
+        except self.model.DoesNotExist:
+            return self.calculate_for_year(election_year)
+        return {
+            'current_mps': statistics.current_mps,
+            'rerunning_mps': statistics.rerunning_mps,
+            'parties': list(statistics.parties.values_list(
+                'party_id', 'current_mps', 'rerunning_mps')),
+            'party_switcher_ids': list(statistics.party_switchers.values_list(
+                'id', flat=True)),
+        }
+
+
+class ElectionStatistics(models.Model):
+    """Statistics about the candidates standing in an election
+
+    These are refreshed by the election candidate import commands, or
+    with south_africa_update_election_statistics."""
+
+    election_year = models.CharField(max_length=4, unique=True)
+    # The number of current members of the National Assembly, and how
+    # many of them are standing again:
+    current_mps = models.PositiveIntegerField()
+    rerunning_mps = models.PositiveIntegerField()
+    party_switchers = models.ManyToManyField(
+        Person, related_name='election_statistics_party_switches')
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = ElectionStatisticsManager()
+
+    def __unicode__(self):
+        return u"Statistics for the {0} election".format(self.election_year)
+
+    @property
+    def percent_rerunning(self):
+        return percent_rerunning(self.current_mps, self.rerunning_mps)
+
+    class Meta:
+        verbose_name_plural = 'election statistics'
+
+
+class ElectionPartyStatistics(models.Model):
+    statistics = models.ForeignKey(ElectionStatistics, related_name='parties')
+    party = models.ForeignKey(Organisation, related_name='election_statistics')
+    current_mps = models.PositiveIntegerField()
+    rerunning_mps = models.PositiveIntegerField()
+
+    def __unicode__(self):
+        return u"{0} in the {1} election".format(
+            self.party, self.statistics.election_year)
+
+    @property
+    def percent_rerunning(self):
+        return percent_rerunning(self.current_mps, self.rerunning_mps)
+
+    class Meta:
+        unique_together = ('statistics', 'party')
+        verbose_name_plural = 'election party statistics'
+
+
+class PMGAttendance(models.Model):
+    """Committee meeting attendance data fetched from the PMG API
+
+    This is kept up to date by south_africa_refresh_pmg_attendance, and
+    is what the attendance views read from.  There's a row for each
+    canonical api.pmg.org.za URL of a dataset, holding the results from
+    all its pages as JSON."""
+
+    url = models.URLField(max_length=1000, unique=True)
+    results = models.TextField()
+    updated = models.DateTimeField(auto_now=True)
+
+    def __unicode__(self):
+        return self.url
+
+    class Meta:
+        verbose_name_plural = 'PMG attendance'
@@ -0,0 +1,268 @@
+"""Prefetch committee meeting attendance data from the PMG API
+
+The attendance data from api.pmg.org.za is paginated, and the
+all-members dataset in particular runs to dozens of pages, so it's
+far too slow to fetch from within a web request.  Instead, the
+south_africa_refresh_pmg_attendance command uses PMGAttendanceFetcher
+to fetch it ahead of time into the PMGAttendance table, and the views
+only ever read from there with get_stored_attendance.
+
+The data is stored under the canonical api.pmg.org.za URL of each
+dataset, whichever server it was actually fetched from, so that the
+fetcher can be pointed at a test server.  Each page is also kept in
+the 'pmg_api' cache with its ETag and Last-Modified headers so that
+subsequent refreshes can make conditional requests; if a page has
+been culled from the cache it's just fetched in full.
+"""
+
+import json
+import logging
+import math
+import threading
+import urllib
+from multiprocessing.pool import ThreadPool
+from urlparse import parse_qs, urlsplit, urlunsplit
+
+import requests
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db.models import Q
+
+from pombola.core.models import Identifier, Person
+from pombola.south_africa.models import PMGAttendance
+
+
+logger = logging.getLogger(__name__)
+
+PMG_API_BASE_URL = 'https://api.pmg.org.za'
+MEETINGS_BY_MEMBER_PATH = '/committee-meeting-attendance/meetings-by-member/'
+MEMBER_ATTENDANCE_PATH = '/member/{}/attendance/'
+PMG_MEMBER_SCHEME = 'za.org.pmg.api/member'
+
+# This is only used in the background, so it can be rather more
+# patient than API_REQUESTS_TIMEOUT in the views:
+REQUEST_TIMEOUT = 30
+
+PAGE_KEY_PREFIX = 'page:'
+
+
+def meetings_by_member_url(base_url=PMG_API_BASE_URL):
+    return base_url + MEETINGS_BY_MEMBER_PATH
+
+
+def member_attendance_url(identifier, base_url=PMG_API_BASE_URL):
+    return base_url + MEMBER_ATTENDANCE_PATH.format(identifier)
+
+
+def get_stored_attendance(url):
+    """Return the stored results for a canonical PMG API URL
+
+    If the data hasn't been fetched yet, None is returned.  Results are
+    returned from the API most recent first."""
+    try:
+        return json.loads(PMGAttendance.objects.get(url=url).results)
+    except PMGAttendance.DoesNotExist:
+        return None
+
+
+def store_attendance(url, results):
+    """Store the results for a canonical PMG API URL"""
+    PMGAttendance.objects.update_or_create(
+        url=url, defaults={'results': json.dumps(results)})
+
+
+def people_needing_attendance():
+    """Return the people whose attendance data should be prefetched
+
+    These are the people currently in a party whose attendance is
+    shown, and anyone else who's already known to be a PMG member."""
+    return Person.objects.filter(
+        Q(current_memberships__kind='party',
+          current_memberships__organisation__show_attendance=True)
+        | Q(identifiers__scheme=PMG_MEMBER_SCHEME)
+    ).exclude(hidden=True).distinct()
+
+
+class PMGAttendanceFetcher(object):
+
+    def __init__(self, base_url=PMG_API_BASE_URL, workers=8, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool = ThreadPool(workers)
+        self.lock = threading.Lock()
+        self.pages_fetched = 0
+        self.pages_not_modified = 0
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def fetch_page(self, url):
+        """Fetch a page of results from the API
+
+        If the page has been fetched before, this is a conditional
+        request, and the stored page is returned if PMG says it's not
+        been modified.  This is called from the worker threads, so
+        mustn't touch the database."""
+        store = caches['pmg_api']
+        key = PAGE_KEY_PREFIX + url
+        stored = store.get(key)
+        headers = {}
+        if stored:
+            if stored['etag']:
+                headers['If-None-Match'] = stored['etag']
+            if stored['last_modified']:
+                headers['If-Modified-Since'] = stored['last_modified']
+
+        resp = requests.get(url, headers=headers, timeout=self.timeout)
+        if stored and resp.status_code == 304:
+            with self.lock:
+                self.pages_not_modified += 1
+            return stored['data']
+        resp.raise_for_status()
+        data = resp.json()
+
+        store.set(key, {
+            'etag': resp.headers.get('ETag'),
+            'last_modified': resp.headers.get('Last-Modified'),
+            'data': data,
+        }, None)
+        with self.lock:
+            self.pages_fetched += 1
+        return data
+
+    def remaining_page_urls(self, first_page):
+        """Work out the URLs of the pages after the first one
+
+        PMG's 'next' links have a 'page' parameter, so from the total
+        count and the size of the first page, the URLs of all the
+        other pages can be worked out up front, which means they can be
+        fetched concurrently.  If that's not possible, None is
+        returned."""
+        next_url = first_page.get('next')
+        if not next_url:
+            return []
+        count = first_page.get('count')
+        per_page = len(first_page.get('results') or [])
+        scheme, netloc, path, query, fragment = urlsplit(next_url)
+        params = parse_qs(query)
+        page = params.get('page', [''])
+        if not (count and per_page and len(page) == 1 and page[0].isdigit()):
+            return None
+        first_next_page = int(page[0])
+        total_pages = int(math.ceil(count / float(per_page)))
+        urls = []
+        for page in range(first_next_page, first_next_page + total_pages - 1):
+            params['page'] = [str(page)]
+            urls.append(urlunsplit((
+                scheme, netloc, path, urllib.urlencode(params, doseq=True), fragment)))
+        return urls
+
+    def follow_next_links(self, url):
+        """Fetch each page in turn, by following the 'next' links"""
+        pages = []
+        while url:
+            page = self.fetch_page(url)
+            pages.append(page)
+            url = page.get('next')
+        return pages
+
+    def refresh_meetings_by_member(self):
+        """Fetch and store the attendance data for all members
+
+        The pages are fetched concurrently by the worker threads."""
+        first_page = self.fetch_page(meetings_by_member_url(self.base_url))
+        page_urls = self.remaining_page_urls(first_page)
+        if page_urls is None:
+            pages = [first_page] + self.follow_next_links(first_page.get('next'))
+        else:
+            pages = [first_page] + self.pool.map(self.fetch_page, page_urls)
+
+        results = []
+        for page in pages:
+            results.extend(page.get('results') or [])
+        store_attendance(meetings_by_member_url(), results)
+        return results
+
+    def find_member_id(self, person_slug):
+        """Search the PMG API for the ID of a member from their PA link"""
+        pa_link = urllib.quote(
+            "https://www.pa.org.za/person/{}/".format(person_slug))
+        search_url = "{}/member/?filter[pa_link]={}".format(self.base_url, pa_link)
+        try:
+            resp = requests.get(search_url, timeout=self.timeout)
+            resp.raise_for_status()
+            search_data = resp.json()
+        except (requests.exceptions.RequestException, ValueError):
+            logger.exception('Failed to search for PMG member {}'.format(person_slug))
+            return None
+
+        if not search_data.get('count'):
+            return None
+        if search_data['count'] > 1:
+            logger.error(
+                'Duplicate members at PMG with slug {} - SKIPPING'.format(person_slug))
+            return None
+        return search_data['results'][0]['id']
+
+    def member_ids(self, people):
+        """Return a dict mapping person IDs to PMG member IDs
+
+        Any people without a PMG member identifier are looked up
+        (concurrently) and the identifiers that are found are saved."""
+        people = list(people)
+        identifiers = Identifier.objects.filter(
+            content_type=ContentType.objects.get_for_model(Person),
+            object_id__in=[p.id for p in people],
+            scheme=PMG_MEMBER_SCHEME,
+        ).order_by('object_id', 'id').values_list('object_id', 'identifier')
+        result = {}
+        for person_id, identifier in identifiers:
+            result.setdefault(person_id, identifier)
+
+        missing = [p for p in people if p.id not in result]
+        found = self.pool.map(self.find_member_id, [p.slug for p in missing])
+        for person, identifier in zip(missing, found):
+            if identifier is None:
+                continue
+            Identifier.objects.create(
+                scheme=PMG_MEMBER_SCHEME,
+                identifier=identifier,
+                content_object=person,
+            )
+            result[person.id] = unicode(identifier)
+        return result
+
+    def fetch_member(self, identifier):
+        """Fetch the attendance data for one member
+
+        Returns None if it couldn't be fetched.  This is called from
+        the worker threads, so mustn't touch the database."""
+        try:
+            pages = self.follow_next_links(
+                member_attendance_url(identifier, self.base_url))
+        except (requests.exceptions.RequestException, ValueError):
+            logger.exception(
+                'Failed to fetch attendance for PMG member {}'.format(identifier))
+            return None
+
+        results = []
+        for page in pages:
+            results.extend(page.get('results') or [])
+        return results
+
+    def refresh_members(self, people):
+        """Fetch and store the attendance data of each of the people
+
+        Returns the number of members whose data couldn't be fetched,
+        for whom any previously stored data is left in place."""
+        identifiers = sorted(set(self.member_ids(people).values()))
+        failures = 0
+        for identifier, results in zip(
+                identifiers, self.pool.map(self.fetch_member, identifiers)):
+            if results is None:
+                failures += 1
+            else:
+                store_attendance(member_attendance_url(identifier), results)
+        return failures
@@ -1,8 +1,9 @@
 from haystack import indexes
 
-from speeches.models import Speech
+from speeches.models import Section, Speech
 
 from pombola.search import search_indexes
+from pombola.za_hansard.models import question_sections
 
 class SAPlaceIndex(search_indexes.PlaceIndex):
 
@@ -28,10 +29,48 @@ class SASpeechIndex(indexes.SearchIndex, indexes.Indexable):
 
     def index_queryset(self, using=None):
         """Used when the entire index for model is updated."""
-        return self.get_model().objects # .filter(pub_date__lte=datetime.datetime.now())
+        return self.get_model().objects \
+            .select_related('instance', 'speaker') \
+            .prefetch_related('tags')
 
     def get_updated_field(self):
         return 'modified'
 
     def prepare_tags(self, obj):
         return ' '.join(t.name for t in obj.tags.all())
+
+# Each question, with its answer, is also indexed as one document, so
+# that searches of the question index can be filtered, ordered and
+# paginated by the search backend.  These are updated whenever the
+# section summaries are.
+
+class SAQuestionSectionIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True)
+    # This is faceted so that it's also indexed unanalysed, as
+    # minister_exact, for filtering on the whole slug:
+    minister = indexes.CharField(model_attr='parent__slug', faceted=True)
+    question_date = indexes.DateField(model_attr='summary__earliest_speech_date', null=True)
+    answer_date = indexes.DateField(model_attr='summary__latest_speech_date', null=True)
+    answered = indexes.BooleanField()
+    first_speech_id = indexes.IntegerField(model_attr='summary__first_speech_id')
+
+    def get_model(self):
+        return Section
+
+    def index_queryset(self, using=None):
+        return question_sections().prefetch_related('speech_set')
+
+    def should_update(self, instance, **kwargs):
+        # Sections are saved for all sorts of things, and before their
+        # speeches are added, so only index questions with a summary:
+        parent = instance.parent
+        return parent is not None and parent.parent is not None \
+            and parent.parent.heading == 'Questions' \
+            and hasattr(instance, 'summary')
+
+    def prepare_text(self, obj):
+        return '\n\n'.join(speech.text or '' for speech in obj.speech_set.all())
+
+    def prepare_answered(self, obj):
+        # If there's more than one speech, the question is answered:
+        return obj.summary.speech_count > 1
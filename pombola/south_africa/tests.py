@@ -2,9 +2,13 @@ from __future__ import division
 
 import re
 import os
+import hashlib
+import threading
+import BaseHTTPServer
+import SocketServer
 from datetime import date, time
 from StringIO import StringIO
-from urlparse import urlparse
+from urlparse import parse_qs, urlparse
 from collections import OrderedDict
 from datetime import datetime
 
@@ -24,6 +28,8 @@ from django.core.management import call_command
 from django_date_extensions.fields import ApproximateDate
 from django_webtest import WebTest
 
+from haystack import connections
+
 from mapit.models import Type, Area, Geometry, Generation
 
 from django.conf import settings
@@ -36,10 +42,17 @@ from info.models import InfoPage
 
 from pombola.core import models
 from pombola import south_africa
+from pombola.south_africa.models import (
+    ElectionPartyStatistics, ElectionStatistics, PMGAttendance
+)
+from pombola.south_africa.pmg_attendance import get_stored_attendance, store_attendance
 from pombola.south_africa.views import SAPersonDetail
+from pombola.za_hansard.models import SectionSummary
 from pombola.core.views import PersonSpeakerMappingsMixin
 from instances.models import Instance
-from pombola.interests_register.models import Category, Release, Entry, EntryLineItem
+from pombola.interests_register.models import (
+    Category, Release, Entry, EntryLineItem, update_summaries
+)
 
 from nose.plugins.attrib import attr
 from pygeolib import GeocoderError
@@ -184,6 +197,49 @@ class ConstituencyOfficesTestCase(WebTest):
             )
 
 
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    })
+    @patch('requests.get', side_effect=requests.exceptions.ConnectionError)
+    def test_latlon_constituency_office_people(self, m):
+        contact = models.PositionTitle.objects.create(
+            name='Constituency Contact', slug='constituency-contact')
+        member = models.PositionTitle.objects.create(name='Member', slug='member')
+        parliament = models.OrganisationKind.objects.create(
+            name='Parliament', slug='parliament')
+        national_assembly = models.Organisation.objects.create(
+            name='National Assembly', slug='national-assembly', kind=parliament)
+        email = models.ContactKind.objects.create(name='Email', slug='email')
+
+        person = models.Person.objects.create(
+            legal_name='Person One', slug='person-one')
+        models.Position.objects.create(
+            person=person, title=contact, category='political',
+            organisation=models.Organisation.objects.get(slug='party1-office1'))
+        models.Position.objects.create(
+            person=person, title=member, category='political',
+            organisation=national_assembly)
+        person.contacts.create(kind=email, value='one@example.org', preferred=True)
+
+        response = self.app.get(
+            reverse('latlon', kwargs={'lat': '-29.1', 'lon': '17.1'}))
+        mp_data = response.context['mp_data']
+        self.assertEqual([d['person'] for d in mp_data], [person])
+        self.assertEqual(mp_data[0]['party'].slug, 'party1')
+        self.assertEqual(mp_data[0]['email'], 'one@example.org')
+        self.assertEqual(
+            [p.organisation.slug for p in mp_data[0]['positions']],
+            ['national-assembly'])
+        self.assertEqual(response.context['mpl_data'], [])
+
+        # A search from elsewhere in the same grid cell should use
+        # the cached results:
+        models.Position.objects.filter(title=contact).delete()
+        response = self.app.get(
+            reverse('latlon', kwargs={'lat': '-29.1001', 'lon': '17.1002'}))
+        self.assertEqual(
+            [d['person'] for d in response.context['mp_data']], [person])
+
     def test_subplaces_page(self):
         response = self.app.get('/place/test_province/places/')
 
@@ -322,10 +378,8 @@ class SAPersonDetailViewTest(PersonSpeakerMappingsMixin, TestCase):
         # Make sure there are SayIt speakers for all Pombola
         call_command('pombola_sayit_sync_pombola_to_popolo')
 
-        # Put blank attendance data in the cache to stop us fetching from
-        # the live PMG API
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        # Store blank attendance data for this person
+        store_attendance(
             "https://api.pmg.org.za/member/moomin-finn/attendance/",
             [],
             )
@@ -392,6 +446,36 @@ class SAPersonDetailViewTest(PersonSpeakerMappingsMixin, TestCase):
             html=True,
         )
 
+    def test_contacts_grouped_by_kind(self):
+        person = models.Person.objects.get(slug='moomin-finn')
+        person.email = 'moomin@example.org'
+        person.save()
+        kinds = dict(
+            (slug, models.ContactKind.objects.create(slug=slug, name=slug))
+            for slug in ('cell', 'voice', 'email', 'twitter'))
+        for kind, value, preferred in (
+                ('cell', '0821234567', False),
+                ('voice', '0211234567', True),
+                ('email', 'moomin@example.org', False),
+                ('email', 'finn@example.org', False),
+                ('twitter', 'moominfinn', False)):
+            models.Contact.objects.create(
+                kind=kinds[kind], value=value, preferred=preferred,
+                content_object=person)
+
+        context = self.client.get(reverse('person', args=('moomin-finn',))).context
+
+        self.assertEqual(context['phone_contacts'], ['0211234567', '0821234567'])
+        self.assertEqual(context['twitter_contacts'], ['moominfinn'])
+        self.assertEqual(context['fax_contacts'], [])
+        self.assertEqual(
+            context['email_contacts'][0], ('moomin@example.org', True))
+        self.assertEqual(
+            sorted(context['email_contacts']),
+            [('finn@example.org', False),
+             ('moomin@example.org', False),
+             ('moomin@example.org', True)])
+
     def test_person_to_speaker_resolution(self):
         person = models.Person.objects.get(slug='moomin-finn')
         speaker = self.pombola_person_to_sayit_speaker(person)
@@ -517,8 +601,7 @@ class SAPersonDetailViewTest(PersonSpeakerMappingsMixin, TestCase):
         with open(test_data_path) as f:
             raw_data = json.load(f)
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/member/moomin-finn/attendance/",
             raw_data['results'],
             )
@@ -558,10 +641,9 @@ class SAPersonDetailViewTest(PersonSpeakerMappingsMixin, TestCase):
     @patch('requests.get', side_effect=connection_error)
     def test_attendance_data_requests_errors(self, m):
         self._setup_party_for_attendance(True)
-        # Check context if identifier exists, cache lookup misses
-        # and the PMG API is unavailable.
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.clear()
+        # Check context if identifier exists, but no attendance data
+        # has been fetched from the PMG API yet.
+        PMGAttendance.objects.all().delete()
 
         context = self.client.get(reverse('person', args=('moomin-finn',))).context
         assert context['attendance'] == 'UNAVAILABLE'
@@ -582,8 +664,7 @@ class SAPersonDetailViewTest(PersonSpeakerMappingsMixin, TestCase):
         with open(test_data_path) as f:
             raw_data = json.load(f)
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/member/moomin-finn/attendance/",
             raw_data['results'],
             )
@@ -892,8 +973,7 @@ class SAMpAttendancePageTest(TestCase):
             ],
         }]
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/",
             raw_data,
         )
@@ -933,8 +1013,7 @@ class SAMpAttendancePageTest(TestCase):
                     {u'date': u'2000-03-01', u'attendance': u'P'},]}],
             u'start_date': u'2000-01-01'}]
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/",
             raw_data,
         )
@@ -974,8 +1053,7 @@ class SAMpAttendancePageTest(TestCase):
                     {u'date': u'2000-03-01', u'attendance': u'P'},]}],
             u'start_date': u'2000-01-01'}]
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/",
             raw_data,
         )
@@ -1022,8 +1100,7 @@ class SAMpAttendancePageTest(TestCase):
                     {u'date': u'2019-07-01', u'attendance': u'P'}]}]
             }]
 
-        pmg_api_cache = caches['pmg_api']
-        pmg_api_cache.set(
+        store_attendance(
             "https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/",
             raw_data,
         )
@@ -1046,6 +1123,152 @@ class SAMpAttendancePageTest(TestCase):
 
         self.assertEqual(context['attendance_data'], expected)
 
+    def test_no_attendance_data_fetched_yet(self):
+        response = self.client.get(reverse('mp-attendance'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['attendance_data'], [])
+
+
+class PMGStubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serve the JSON documents in server.documents, supporting ETags"""
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        key = (path, tuple(sorted(
+            (k, v[0]) for k, v in parse_qs(query).items())))
+        self.server.requests.append(
+            (self.path, self.headers.getheader('If-None-Match')))
+
+        document = self.server.documents.get(key)
+        if document is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps(document)
+        etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+        if self.headers.getheader('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PMGStubServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), PMGStubHandler)
+        self.documents = {}
+        self.requests = []
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server_address[1])
+
+    def add_document(self, path, document, **params):
+        self.documents[(path, tuple(sorted(params.items())))] = document
+
+
+@attr(country='south_africa')
+class SARefreshPMGAttendanceTest(TestCase):
+    def setUp(self):
+        caches['pmg_api'].clear()
+
+        self.server = PMGStubServer()
+        self.server_thread = threading.Thread(target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+
+        party_kind = models.OrganisationKind.objects.create(name='Party', slug='party')
+        party = models.Organisation.objects.create(
+            name='Party1', slug='party1', kind=party_kind, show_attendance=True)
+        member = models.PositionTitle.objects.create(name='Member', slug='member')
+        self.person = models.Person.objects.create(legal_name='Person1', slug='person1')
+        models.Position.objects.create(
+            person=self.person, organisation=party, title=member, category='political')
+
+        # The all-members data is in three pages:
+        path = '/committee-meeting-attendance/meetings-by-member/'
+        self.years = [{'start_date': '{}-01-01'.format(year),
+                       'end_date': '{}-12-31'.format(year),
+                       'meetings_by_member': []}
+                      for year in range(2019, 2014, -1)]
+        for page in range(3):
+            if page < 2:
+                next_url = '{}{}?page={}'.format(self.server.base_url, path, page + 1)
+            else:
+                next_url = None
+            document = {
+                'count': 5,
+                'next': next_url,
+                'results': self.years[page * 2:page * 2 + 2],
+            }
+            if page == 0:
+                self.server.add_document(path, document)
+            else:
+                self.server.add_document(path, document, page=str(page))
+
+        self.server.add_document(
+            '/member/',
+            {'count': 1, 'results': [{'id': 42}]},
+            **{'filter[pa_link]': 'https://www.pa.org.za/person/person1/'})
+        self.meetings = [{'date': '2019-03-01', 'attendance': 'P'}]
+        self.server.add_document(
+            '/member/42/attendance/',
+            {'count': 1, 'next': None, 'results': self.meetings})
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        caches['pmg_api'].clear()
+
+    def refresh(self):
+        call_command(
+            'south_africa_refresh_pmg_attendance',
+            api_url=self.server.base_url, workers=3, stderr=StringIO())
+
+    def test_refresh(self):
+        self.refresh()
+
+        self.assertEqual(
+            get_stored_attendance(
+                'https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/'),
+            self.years)
+        self.assertEqual(self.person.get_identifier('za.org.pmg.api/member'), '42')
+        self.assertEqual(
+            get_stored_attendance('https://api.pmg.org.za/member/42/attendance/'),
+            self.meetings)
+        self.assertEqual(
+            SAPersonDetail(object=self.person).download_attendance_data(),
+            self.meetings)
+
+        # A second refresh should make conditional requests for each page
+        # and find nothing has changed:
+        del self.server.requests[:]
+        self.refresh()
+        self.assertEqual(len(self.server.requests), 4)
+        for path, if_none_match in self.server.requests:
+            self.assertTrue(if_none_match)
+        self.assertEqual(
+            get_stored_attendance(
+                'https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/'),
+            self.years)
+
+    def test_failed_refresh_keeps_stored_data(self):
+        self.refresh()
+        self.server.documents.clear()
+
+        self.refresh()
+        self.assertEqual(
+            get_stored_attendance('https://api.pmg.org.za/member/42/attendance/'),
+            self.meetings)
+
 
 @attr(country='south_africa')
 class SAPersonProfileSubPageTest(WebTest):
@@ -1115,9 +1338,8 @@ class SAPersonProfileSubPageTest(WebTest):
         )
 
         # Make some identifiers for these people so we avoid
-        # looking them up with PMG, and put blank attendance data
-        # in the cache to stop us fetching from the live PMG API.
-        pmg_api_cache = caches['pmg_api']
+        # looking them up with PMG, and store blank attendance data
+        # for them.
 
         for person in (self.deceased, self.former_mp):
             models.Identifier.objects.create(
@@ -1126,7 +1348,7 @@ class SAPersonProfileSubPageTest(WebTest):
                 content_object=person,
                 )
 
-            pmg_api_cache.set(
+            store_attendance(
                 "https://api.pmg.org.za/member/{}/attendance/".format(person.slug),
                 [],
                 )
@@ -1411,6 +1633,9 @@ class SAHansardIndexViewTest(TestCase):
                 ],
             },
         ])
+        # The index is built from the section summaries, which the
+        # importers would usually update:
+        SectionSummary.objects.rebuild()
 
     def test_index_page(self):
         c = Client()
@@ -1477,6 +1702,7 @@ class SACommitteeIndexViewTest(WebTest):
                 ],
             },
         ], instance=default_instance)
+        SectionSummary.objects.rebuild()
 
     def test_committee_index_page(self):
         response = self.app.get('/committee-minutes/')
@@ -2237,6 +2463,8 @@ class SAMembersInterestsBrowserTest(TestCase):
         EntryLineItem.objects.create(entry=entry3,key=u'Source',value=u'Source2')
         EntryLineItem.objects.create(entry=entry4,key=u'Source',value=u'Source2')
 
+        update_summaries([release1.id, release2.id])
+
     def test_members_interests_browser_complete_view(self):
         context = self.client.get(reverse('sa-interests-index')).context
 
@@ -2291,28 +2519,28 @@ class SAMembersInterestsBrowserTest(TestCase):
             reverse('sa-interests-index')+'?display=numberbyrepresentative'
         ).context
         self.assertEqual(len(context['data']), 3)
-        self.assertEqual(context['data'][0].c, 2)
+        self.assertEqual(context['data'][0].count, 2)
 
         #release filter
         context = self.client.get(
             reverse('sa-interests-index')+'?display=numberbyrepresentative&release=2013-data'
         ).context
         self.assertEqual(len(context['data']), 3)
-        self.assertEqual(context['data'][0].c, 2)
+        self.assertEqual(context['data'][0].count, 2)
 
     def test_members_interests_browser_numberbysource_view(self):
         context = self.client.get(
             reverse('sa-interests-index')+'?display=numberbysource'
         ).context
         self.assertEqual(len(context['data']), 2)
-        self.assertEqual(context['data'][0].c, 2)
+        self.assertEqual(context['data'][0].count, 2)
 
         #release filter
         context = self.client.get(
             reverse('sa-interests-index')+'?display=numberbyrepresentative&release=2012-data'
         ).context
         self.assertEqual(len(context['data']), 1)
-        self.assertEqual(context['data'][0].c, 1)
+        self.assertEqual(context['data'][0].count, 1)
 
     def test_members_interests_browser_sources_view(self):
         context = self.client.get(
@@ -2594,3 +2822,177 @@ class SACommitteesPopoloJSONTest(TestCase):
             ]
         }
         self.assertJSONEqual(response.content, expected_json)
+
+
+@attr(country='south_africa')
+class SAElectionStatisticsTest(TestCase):
+
+    def setUp(self):
+        party_kind = models.OrganisationKind.objects.create(name='Party', slug='party')
+        list_kind = models.OrganisationKind.objects.create(name='Election List', slug='election-list')
+        parliament_kind = models.OrganisationKind.objects.create(name='Parliament', slug='parliament')
+        models.PlaceKind.objects.create(name='Province', slug='province')
+
+        self.party1 = models.Organisation.objects.create(name='Party1', slug='party1', kind=party_kind)
+        self.party2 = models.Organisation.objects.create(name='Party2', slug='party2', kind=party_kind)
+        na = models.Organisation.objects.create(
+            name='National Assembly', slug='national-assembly', kind=parliament_kind)
+        national_list = models.Organisation.objects.create(
+            name='Party1 National Election List 2019',
+            slug='party1-national-election-list-2019',
+            kind=list_kind)
+        regional_list = models.Organisation.objects.create(
+            name='Party2 Regional Election List 2019',
+            slug='party2-regional-western-cape-election-list-2019',
+            kind=list_kind)
+
+        member = models.PositionTitle.objects.create(name='Member', slug='member')
+        candidate = models.PositionTitle.objects.create(name='1st Candidate', slug='1st-candidate')
+
+        self.person1 = models.Person.objects.create(legal_name='Person1', slug='person1')
+        person2 = models.Person.objects.create(legal_name='Person2', slug='person2')
+        self.person3 = models.Person.objects.create(legal_name='Person3', slug='person3')
+        person4 = models.Person.objects.create(legal_name='Person4', slug='person4')
+
+        for person in (self.person1, person2, self.person3):
+            models.Position.objects.create(person=person, organisation=na, title=member)
+        models.Position.objects.create(person=person4, organisation=na, title=member, end_date='2013-02-16')
+
+        models.Position.objects.create(person=self.person1, organisation=self.party1, title=member)
+        models.Position.objects.create(person=person2, organisation=self.party1, title=member)
+        models.Position.objects.create(person=self.person3, organisation=self.party1, title=member, end_date='2013-02-16')
+        models.Position.objects.create(person=self.person3, organisation=self.party2, title=member)
+        models.Position.objects.create(person=person4, organisation=self.party2, title=member)
+
+        models.Position.objects.create(person=self.person1, organisation=national_list, title=candidate)
+        models.Position.objects.create(person=self.person3, organisation=regional_list, title=candidate)
+        models.Position.objects.create(person=person4, organisation=national_list, title=candidate)
+
+    def test_update_for_year(self):
+        statistics = ElectionStatistics.objects.update_for_year('2019')
+        self.assertEqual(statistics.current_mps, 3)
+        self.assertEqual(statistics.rerunning_mps, 2)
+        self.assertEqual(statistics.percent_rerunning, 66)
+        self.assertEqual(
+            sorted(statistics.parties.values_list('party__slug', 'current_mps', 'rerunning_mps')),
+            [('party1', 3, 2), ('party2', 1, 1)])
+        self.assertEqual(list(statistics.party_switchers.all()), [self.person3])
+
+        # Updating again replaces the previous statistics:
+        ElectionStatistics.objects.update_for_year('2019')
+        self.assertEqual(ElectionStatistics.objects.count(), 1)
+        self.assertEqual(
+            ElectionPartyStatistics.objects.filter(statistics__election_year='2019').count(), 2)
+
+    def test_statistics_page(self):
+        ElectionStatistics.objects.update_for_year('2019')
+        context = self.client.get(
+            reverse('sa-election-statistics-year', args=('2019',))).context
+
+        self.assertEqual(context['current_mps']['all']['rerunning'], 2)
+        self.assertEqual(
+            [(p['party'], p['current'], p['rerunning']) for p in context['current_mps']['byparty']],
+            [(self.party1, 3, 2), (self.party2, 1, 1)])
+
+        [switcher] = context['people_new_party']
+        self.assertEqual(switcher['person'], self.person3)
+        self.assertEqual(
+            [p.organisation for p in switcher['current_positions']], [self.party2])
+        self.assertEqual(
+            [p.organisation for p in switcher['former_positions']], [self.party1])
+        self.assertEqual(
+            [p.organisation.slug for p in switcher['person_list']],
+            ['party2-regional-western-cape-election-list-2019'])
+
+    def test_statistics_page_without_stored_statistics(self):
+        context = self.client.get(
+            reverse('sa-election-statistics-year', args=('2019',))).context
+
+        self.assertEqual(context['current_mps']['all']['current'], 3)
+        self.assertEqual(context['current_mps']['all']['rerunning'], 2)
+        self.assertEqual(
+            [(p['party'], p['current'], p['rerunning']) for p in context['current_mps']['byparty']],
+            [(self.party1, 3, 2), (self.party2, 1, 1)])
+        self.assertEqual(
+            [p['person'] for p in context['people_new_party']], [self.person3])
+        # Viewing the page shouldn't store anything:
+        self.assertFalse(ElectionStatistics.objects.exists())
+
+
+@attr(country='south_africa')
+class SAQuestionIndexViewTest(TestCase):
+
+    def setUp(self):
+        create_sections([
+            {
+                'heading': u"Questions",
+                'subsections': [
+                    {   'heading': u"Questions asked to the Minister of Finance",
+                        'subsections': [
+                            {   'heading': u"Question about the budget",
+                                'speeches': [ 2, date(2013, 2, 18), time(9, 0) ],
+                            },
+                            {   'heading': u"Question about tax",
+                                'speeches': [ 1, date(2013, 2, 19), time(9, 0) ],
+                            },
+                        ],
+                    },
+                ],
+            },
+        ])
+        SectionSummary.objects.rebuild()
+
+    def test_questions_and_answers(self):
+        response = self.client.get(
+            reverse('section-list-question'), {'orderby': 'recentquestions'})
+        self.assertEqual(response.status_code, 200)
+
+        [unanswered, answered] = response.context['speeches']
+        self.assertEqual(unanswered.section.heading, u"Question about tax")
+        self.assertFalse(hasattr(unanswered, 'answer'))
+        self.assertEqual(answered.section.heading, u"Question about the budget")
+        self.assertEqual(answered.questionto, u"Minister of Finance")
+        speeches = Speech.objects.filter(section=answered.section).order_by('id')
+        self.assertEqual(answered.id, speeches[0].id)
+        self.assertEqual(answered.answer.id, speeches[1].id)
+
+    def test_recent_answers(self):
+        response = self.client.get(reverse('section-list-question'))
+        self.assertEqual(
+            [s.section.heading for s in response.context['speeches']],
+            [u"Question about the budget"])
+
+    def test_search(self):
+        # Start from an empty index of questions:
+        connections['default'].get_backend().clear(models=[Section])
+        budget = Section.objects.get(heading=u"Question about the budget")
+        tax = Section.objects.get(heading=u"Question about tax")
+        Speech.objects.filter(section=budget).update(
+            text=u"<p>What will the budget do about tax?</p>")
+        Speech.objects.filter(section=tax).update(
+            text=u"<p>Will tax go up?</p>")
+        # This updates the questions' search documents as well:
+        SectionSummary.objects.update_for_sections([budget.id, tax.id])
+
+        # Each question is found once, however many of its speeches match:
+        response = self.client.get(
+            reverse('section-list-question'),
+            {'q': 'tax', 'orderby': 'recentquestions'})
+        self.assertEqual(
+            [s.section for s in response.context['speeches']], [tax, budget])
+        self.assertEqual(response.context['paginator'].paginator.count, 2)
+
+        # Searching should keep the filter to answered questions:
+        response = self.client.get(reverse('section-list-question'), {'q': 'tax'})
+        self.assertEqual(
+            [s.section for s in response.context['speeches']], [budget])
+
+        response = self.client.get(
+            reverse('section-list-question'),
+            {'q': 'tax', 'orderby': 'recentquestions', 'minister': budget.parent.slug})
+        self.assertEqual(
+            [s.section for s in response.context['speeches']], [tax, budget])
+        response = self.client.get(
+            reverse('section-list-question'),
+            {'q': 'tax', 'orderby': 'recentquestions', 'minister': 'minister-of-nothing'})
+        self.assertEqual(list(response.context['speeches']), [])
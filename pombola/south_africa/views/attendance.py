@@ -1,20 +1,18 @@
 from __future__ import division
 
 import dateutil
-import json
-import requests
 import datetime
 from urlparse import urlsplit
 from collections import defaultdict
 
-from .constants import API_REQUESTS_TIMEOUT
-
-from django.core.cache import caches
 from django.views.generic import TemplateView
 from django.shortcuts import get_object_or_404
 
 from pombola.core.models import Position, Person
-from person import SAPersonDetail
+from pombola.south_africa.pmg_attendance import (
+    get_stored_attendance, meetings_by_member_url
+)
+from person import AttendanceAPIDown, SAPersonDetail
 
 
 class SAMpAttendanceView(TemplateView):
@@ -27,24 +25,11 @@ class SAMpAttendanceView(TemplateView):
         return int("{:.0f}".format(num / total * 100))
 
     def download_attendance_data(self):
-        attendance_url = next_url = 'https://api.pmg.org.za/committee-meeting-attendance/meetings-by-member/'
-
-        cache = caches['pmg_api']
-        results = cache.get(attendance_url)
-
+        # The data is fetched from PMG in the background by the
+        # south_africa_refresh_pmg_attendance command.
+        results = get_stored_attendance(meetings_by_member_url())
         if results is None:
-            results = []
-            while next_url:
-                resp = requests.get(next_url, timeout=API_REQUESTS_TIMEOUT)
-                data = json.loads(resp.text)
-                results.extend(data.get('results'))
-
-                next_url = data.get('next')
-
-            cache.set(attendance_url, results)
-
-        # Results are returned from the API most recent first, which
-        # is convenient for us.
+            return []
         return results
 
     def just_path_of_pa_url(self, ma):
@@ -240,14 +225,16 @@ class SAMpAttendanceView(TemplateView):
 
         # Page defaults
         context = {}
-        context['year'] = str(
-            dateutil.parser.parse(data[0]['end_date']).year)
+        context['year'] = ''
+        if data:
+            context['year'] = str(
+                dateutil.parser.parse(data[0]['end_date']).year)
 
-        # Default to post election records while 2019 is the latest records returned
-        # Once we get records for 2020 onward, this block can be removed as it
-        # will have no effect
-        if dateutil.parser.parse(data[0]['end_date']).year == 2019:
-            context['year'] = '2019 - post elections'
+            # Default to post election records while 2019 is the latest records returned
+            # Once we get records for 2020 onward, this block can be removed as it
+            # will have no effect
+            if dateutil.parser.parse(data[0]['end_date']).year == 2019:
+                context['year'] = '2019 - post elections'
 
         context['party'] = ''
         context['position'] = 'ministers'
@@ -368,9 +355,12 @@ class SAPersonAttendanceView(TemplateView):
         # Find (or 404) matching objects
         person = get_object_or_404(Person, slug=person_slug)
 
-        # Get the attendance records from the PMG API, or the cache
+        # Get the attendance records fetched from the PMG API
         person_detail = SAPersonDetail(object = person)
-        raw_data = person_detail.download_attendance_data()
+        try:
+            raw_data = person_detail.download_attendance_data()
+        except AttendanceAPIDown:
+            raw_data = []
         meetings_attended = person_detail.get_meetings_attended(raw_data)
 
         # Store person as 'object' for the person_base.html template
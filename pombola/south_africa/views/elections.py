@@ -1,10 +1,11 @@
 import re
 
-from django.db.models import Count, Q
+from django.db.models import Prefetch
 from django.views.generic import TemplateView
 from django.shortcuts import get_object_or_404
 
 from pombola.core import models
+from pombola.south_africa.models import ElectionStatistics, percent_rerunning
 
 
 class SAElectionOverviewMixin(TemplateView):
@@ -32,25 +33,27 @@ class SAElectionOverviewMixin(TemplateView):
         # Build the right election list names
         election_list_suffix = '-national-election-list-' + election_year
 
-        # All the running parties live in this list
-        running_parties = []
-
         # Find the slugs of all parties taking part in the national election
         national_running_party_lists = models.Organisation.objects.filter(
             kind=election_list,
             slug__endswith=election_list_suffix
         ).order_by('name')
 
-        # Loop through national sets and extract slugs
+        running_parties = []
         for l in national_running_party_lists:
             party_slug = l.slug.replace(election_list_suffix, '')
             if not party_slug in running_parties:
                 running_parties.append(party_slug)
 
-        # I am so sorry for this.
-        context['running_party_list'] = []
-        for running_party in running_parties:
-            context['running_party_list'].append(models.Organisation.objects.get(slug=running_party))
+        # Fetch all the running parties at once, keeping the order of
+        # their lists:
+        parties_by_slug = dict(
+            (party.slug, party) for party in
+            models.Organisation.objects.filter(slug__in=running_parties))
+        context['running_party_list'] = [
+            parties_by_slug[slug] for slug in running_parties
+            if slug in parties_by_slug
+        ]
 
         return context
 
@@ -66,85 +69,69 @@ class SAElectionStatisticsView(SAElectionOverviewMixin):
     def get_context_data(self, **kwargs):
         context = super(SAElectionStatisticsView, self).get_context_data(**kwargs)
 
-        context['current_mps'] = {'all': {}, 'byparty': []}
-
-        election_2014_query = (
-            Q(person__position__organisation__slug__contains='national-election-list-2014') |
-            (Q(person__position__organisation__slug__contains='election-list-2014') &
-             Q(person__position__organisation__slug__contains='regional'))
-        )
-
-        current_na_positions = (
-            models.Organisation.objects
-            .get(slug='national-assembly')
-            .position_set.all()
-            .currently_active()
-        )
-
-        context['current_mps']['all']['current'] = (
-            current_na_positions
-            .order_by('person__id')
-            .distinct('person__id')
-            .count()
-        )
-
-        context['current_mps']['all']['rerunning'] = (
-            current_na_positions
-            .filter(election_2014_query)
-            .order_by('person__id')
-            .distinct('person__id')
-            .count()
-        )
-
-        context['current_mps']['all']['percent_rerunning'] = 100 * context['current_mps']['all']['rerunning'] / context['current_mps']['all']['current']
-
-        #find the number of current MPs running for office per party
-        for p in context['party_list']:
-            party = models.Organisation.objects.get(slug=p.slug)
-
-            current = (
-                current_na_positions
-                .filter(person__position__organisation__slug=p.slug)
-                .order_by('person__id')
-                .distinct('person__id')
-                .count()
-            )
-
-            rerunning = (
-                current_na_positions
-                .filter(person__position__organisation__slug=p.slug)
-                .filter(election_2014_query)
-                .order_by('person__id')
-                .distinct('person__id')
-                .count()
-            )
-
-            if current:
-                percent = 100 * rerunning / current
-                context['current_mps']['byparty'].append({'party': party, 'current': current, 'rerunning': rerunning, 'percent_rerunning': percent})
-
-        # find individuals who appear to have switched party
-        context['people_new_party'] = []
+        election_year = context['election_year']
+
+        # These are calculated when the candidates are imported, rather
+        # than on every request (unless they haven't been yet):
+        statistics = ElectionStatistics.objects.get_for_year(election_year)
+
+        parties = models.Organisation.objects.in_bulk(
+            [party_id for party_id, current, rerunning in statistics['parties']])
+        context['current_mps'] = {
+            'all': {
+                'current': statistics['current_mps'],
+                'rerunning': statistics['rerunning_mps'],
+                'percent_rerunning': percent_rerunning(
+                    statistics['current_mps'], statistics['rerunning_mps']),
+            },
+            'byparty': sorted(
+                (
+                    {
+                        'party': parties[party_id],
+                        'current': current,
+                        'rerunning': rerunning,
+                        'percent_rerunning': percent_rerunning(current, rerunning),
+                    }
+                    for party_id, current, rerunning in statistics['parties']
+                ),
+                key=lambda p: p['party'].name
+            ),
+        }
+
+        # Individuals who appear to have switched party, with the
+        # positions to show for each of them fetched in one query per
+        # kind of position:
+        party_positions = models.Position.objects \
+            .filter(organisation__kind__slug='party') \
+            .select_related('organisation')
         people = models.Person.objects \
-            .filter(
-                position__organisation__kind__slug='party',
-                position__title__slug='member') \
-            .annotate(
-                num_parties=Count('position')).filter(num_parties__gt=1)
-
-        for person in people:
-            #check whether the person is a candidate - there is probably be a cleaner way to do this in the initial query
-            person_list = person.position_set.all().filter(
-                organisation__slug__contains='election-list-2014')
-            if person_list:
-                context['people_new_party'].append({
-                    'person': person,
-                    'current_positions': person.position_set.all().filter(
-                        organisation__kind__slug='party').currently_active(),
-                    'former_positions': person.position_set.all().filter(
-                        organisation__kind__slug='party').currently_inactive(),
-                    'person_list': person_list
-                })
+            .filter(id__in=statistics['party_switcher_ids']) \
+            .order_by('sort_name') \
+            .prefetch_related(
+                Prefetch(
+                    'position_set',
+                    queryset=party_positions.currently_active(),
+                    to_attr='current_party_positions'),
+                Prefetch(
+                    'position_set',
+                    queryset=party_positions.currently_inactive(),
+                    to_attr='former_party_positions'),
+                Prefetch(
+                    'position_set',
+                    queryset=models.Position.objects
+                    .filter(organisation__slug__contains='election-list-' + election_year)
+                    .select_related('organisation'),
+                    to_attr='election_list_positions'),
+            )
+        context['people_new_party'] = [
+            {
+                'person': person,
+                'current_positions': person.current_party_positions,
+                'former_positions': person.former_party_positions,
+                'person_list': person.election_list_positions,
+            }
+            for person in people
+        ]
 
         return context
 
@@ -1,12 +1,17 @@
+from collections import defaultdict
+
 import mapit
 import requests
 
 from .constants import API_REQUESTS_TIMEOUT
 
 from django import forms
+from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.geos import Point
 from django.contrib.gis.measure import D
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db.models import Prefetch, Q
 from django.http import Http404
 from django.shortcuts import redirect
 from django.utils.http import urlquote
@@ -28,6 +33,9 @@ CONSTITUENCY_OFFICE_PLACE_KIND_SLUGS = (
 )
 
 
+OFFICE_SEARCH_CACHE_TIMEOUT = 60 * 60
+
+
 class WardCouncillorAPIDown(Exception):
     pass
 
@@ -58,6 +66,10 @@ class LatLonDetailBaseView(BasePlaceDetailView):
     # Using 25km as the default, as that's what's used on MyReps.
     constituency_office_search_radius = 25
 
+    # Offices are searched for from points rounded to this many decimal
+    # places (about 100m), so that nearby searches share cached results.
+    office_search_grid_decimal_places = 3
+
     # The codes used here should match the party slugs, and the names of the
     # icon files in .../static/images/party-map-icons/
     party_slugs_that_have_logos = set((
@@ -149,37 +161,95 @@ class LatLonDetailBaseView(BasePlaceDetailView):
             }
         ]
 
-    def get_context_data(self, **kwargs):
-        context = super(LatLonDetailBaseView, self).get_context_data(**kwargs)
-
-        try:
-            context['ward_data'] = self.get_ward_councillors(self.location)
-        except WardCouncillorAPIDown as e:
-            context['ward_data'] = []
-            context['ward_data_not_available'] = u"The error was: {0}".format(e)
-
-        context['location'] = self.location
-        context['office_search_radius'] = self.constituency_office_search_radius
-
+    def get_constituency_office_data(self, location):
+        """Return lists of the MPs and MPLs with offices near a location
+
+        The results are cached for each cell of a grid of rounded
+        coordinates, and the search is done from the cell's centre; the
+        geocoder rounds to the same number of decimal places, so
+        searches for the same address will share the cached results."""
+        search_location = Point(
+            round(location.x, self.office_search_grid_decimal_places),
+            round(location.y, self.office_search_grid_decimal_places))
+        cache_key = 'latlon-offices:{radius}:{lat:.6f}:{lon:.6f}'.format(
+            radius=self.constituency_office_search_radius,
+            lat=search_location.y,
+            lon=search_location.x)
+
+        office_data = cache.get(cache_key)
+        if office_data is None:
+            office_data = self.find_constituency_office_data(search_location)
+            cache.set(cache_key, office_data, OFFICE_SEARCH_CACHE_TIMEOUT)
+        return office_data
+
+    def find_constituency_office_data(self, location):
         nearest_office_places = (
             ZAPlace.objects
             .filter(kind__slug__in=CONSTITUENCY_OFFICE_PLACE_KIND_SLUGS)
-            .distance(self.location)
+            .distance(location)
             .filter(location__distance_lte=(
-                self.location, D(km=self.constituency_office_search_radius)))
+                location, D(km=self.constituency_office_search_radius)))
             .order_by('distance')
             .select_related('organisation')
-            .prefetch_related('organisation__org_rels_as_b')
-            .prefetch_related('organisation__position_set')
+            .prefetch_related(
+                Prefetch(
+                    'organisation__org_rels_as_b',
+                    queryset=models.OrganisationRelationship.objects
+                        .select_related('kind', 'organisation_a')),
+                Prefetch(
+                    'organisation__contacts',
+                    queryset=models.Contact.objects.filter(kind__slug='address'),
+                    to_attr='address_contacts'),
+            )
         )
+        office_places = [
+            office_place for office_place in nearest_office_places
+            if office_place.organisation.is_ongoing()
+        ]
 
-        context['mp_data'] = mp_data = []
-        context['mpl_data'] = mpl_data = []
+        # Find the constituency contacts of all the offices at once:
+        contact_positions = defaultdict(list)
+        for position in models.Position.objects.filter(
+            organisation__in=[op.organisation for op in office_places],
+            title__slug='constituency-contact',
+        ).currently_active().select_related('person'):
+            contact_positions[position.organisation_id].append(position)
+
+        person_ids = set(
+            position.person_id
+            for positions in contact_positions.values()
+            for position in positions
+        )
 
-        for office_place in nearest_office_places:
+        # ... and then all their MP and MPL positions:
+        mp_positions = defaultdict(list)
+        mpl_positions = defaultdict(list)
+        for position in models.Position.objects.filter(
+            Q(organisation__slug='national-assembly') |
+            Q(organisation__kind__slug='provincial-legislature'),
+            person__in=person_ids,
+            title__slug='member',
+        ).currently_active().select_related('title', 'organisation__kind'):
+            if position.organisation.slug == 'national-assembly':
+                mp_positions[position.person_id].append(position)
+            if position.organisation.kind.slug == 'provincial-legislature':
+                mpl_positions[position.person_id].append(position)
+
+        # ... and their email addresses and phone numbers:
+        contacts = defaultdict(dict)
+        for person_id, kind_slug, value in models.Contact.objects.filter(
+            content_type=ContentType.objects.get_for_model(models.Person),
+            object_id__in=person_ids,
+            kind__slug__in=('email', 'voice'),
+        ).order_by('object_id', '-preferred', 'id') \
+                .values_list('object_id', 'kind__slug', 'value'):
+            contacts[person_id].setdefault(kind_slug, value)
+
+        mp_data = []
+        mpl_data = []
+
+        for office_place in office_places:
             organisation = office_place.organisation
-            if not organisation.is_ongoing():
-                continue
 
             # Get the party and party logo:
             party = None
@@ -191,39 +261,16 @@ class LatLonDetailBaseView(BasePlaceDetailView):
                         has_party_logo = True
 
             # Find all the constituency contacts:
-            for i, position in enumerate(organisation.position_set.filter(
-                title__slug='constituency-contact'
-            ).currently_active()):
+            for i, position in enumerate(contact_positions[organisation.id]):
                 person = position.person
                 element_id = 'constituency-contact-{office_id}-{i}'.format(
-                    office_id=position.organisation.id, i=i
+                    office_id=organisation.id, i=i
                 )
-                mp_positions = person.position_set \
-                    .filter(
-                        organisation__slug='national-assembly',
-                        title__slug='member'
-                    ) \
-                    .currently_active()
-                mpl_positions = person.position_set \
-                    .filter(
-                        organisation__kind__slug='provincial-legislature',
-                        title__slug='member'
-                    ) \
-                    .currently_active()
-                email, phone = None, None
-                email_contact = person.contacts.filter(kind__slug='email').first()
-
-                if email_contact:
-                    email = email_contact.value
-                phone_contact = person.contacts.filter(kind__slug='voice').first()
-
-                if phone_contact:
-                    phone = phone_contact.value
                 person_data = {
                     'name': person.legal_name,
                     'person': person,
-                    'email': email,
-                    'phone': phone,
+                    'email': contacts[person.id].get('email'),
+                    'phone': contacts[person.id].get('voice'),
                     'postal_addresses': [
                         pa.value for pa in office_place.postal_addresses()
                     ],
@@ -233,16 +280,33 @@ class LatLonDetailBaseView(BasePlaceDetailView):
                     'element_id': element_id,
                 }
 
-                if mp_positions:
-                    person_data['positions'] = mp_positions
+                if mp_positions[person.id]:
+                    person_data['positions'] = mp_positions[person.id]
                     person_data['is_mp'] = True
                     mp_data.append(person_data)
 
-                if mpl_positions:
-                    person_data['positions'] = mpl_positions
+                if mpl_positions[person.id]:
+                    person_data['positions'] = mpl_positions[person.id]
                     person_data['is_mpl'] = True
                     mpl_data.append(person_data)
 
+        return mp_data, mpl_data
+
+    def get_context_data(self, **kwargs):
+        context = super(LatLonDetailBaseView, self).get_context_data(**kwargs)
+
+        try:
+            context['ward_data'] = self.get_ward_councillors(self.location)
+        except WardCouncillorAPIDown as e:
+            context['ward_data'] = []
+            context['ward_data_not_available'] = u"The error was: {0}".format(e)
+
+        context['location'] = self.location
+        context['office_search_radius'] = self.constituency_office_search_radius
+
+        context['mp_data'], context['mpl_data'] = \
+            self.get_constituency_office_data(self.location)
+
         context['form'] = LocationSearchForm(
             initial={'q': self.request.GET.get('q')}
         )
@@ -9,7 +9,24 @@ from django.views.generic import TemplateView
 from django_date_extensions.fields import ApproximateDate
 
 from pombola.core import models
-from pombola.interests_register.models import Release, Category, Entry
+from pombola.interests_register.models import (
+    Release, Category, Entry, PersonCategorySummary, SourceCategorySummary
+)
+from pombola.interests_register.tabulation import get_release_tables
+
+
+def add_release_source_urls(releases):
+    """Set source_url on each release to the URL of its first source"""
+    releases = list(releases)
+    source_urls = {}
+    sources = models.InformationSource.objects.filter(
+        content_type=ContentType.objects.get_for_model(Release),
+        object_id__in=set(release.id for release in releases),
+    ).values_list('object_id', 'source')
+    for release_id, source_url in sources:
+        source_urls.setdefault(release_id, source_url)
+    for release in releases:
+        release.source_url = source_urls.get(release.id, '')
 
 
 class SAMembersInterestsIndex(TemplateView):
@@ -80,8 +97,6 @@ class SAMembersInterestsIndex(TemplateView):
         return context
 
     def get_complete_view(self, context):
-        release_content_type = ContentType.objects.get_for_model(Release)
-
         # Complete view - declarations for multiple people in multiple categories
         context['layout'] = 'complete'
 
@@ -107,79 +122,30 @@ class SAMembersInterestsIndex(TemplateView):
                 person__position__organisation__slug__in=context['party_slug_filter'],
                 person__position__start_date__lte=now_approx)
 
-        paginator = Paginator(people, 10)
-        page = self.request.GET.get('page')
-
-        try:
-            people_paginated = paginator.page(page)
-        except PageNotAnInteger:
-            people_paginated = paginator.page(1)
-        except EmptyPage:
-            people_paginated = paginator.page(paginator.num_pages)
+        people_paginated = self.paginate(
+            people.select_related('person', 'release'), 10)
 
         context['paginator'] = people_paginated
 
-        # Tabulate the data
+        add_release_source_urls(
+            entry_person.release for entry_person in people_paginated)
+        tables = get_release_tables(
+            (entry_person.release_id, entry_person.person_id)
+            for entry_person in people_paginated)
+
         data = []
         for entry_person in people_paginated:
-            person = entry_person.person
-            year = entry_person.release.date.year
-            person_data = []
-            person_categories = person.interests_register_entries.filter(
-                release=entry_person.release
-            ).order_by(
-                'category__id'
-            ).distinct(
-                'category__id'
-            )
-
-            sources = models.InformationSource.objects.filter(
-                content_type=release_content_type,
-                object_id=entry_person.release.id
-            )
-            if sources:
-                source_url = sources[0].source
-            else:
-                source_url = ''
-
-            for cat in person_categories:
-                entries = person.interests_register_entries.filter(
-                    category=cat.category,
-                    release=entry_person.release)
-
-                headers = []
-                headers_index = {}
-                cat_data = []
-                for entry in entries:
-                    row = [''] * len(headers)
-
-                    for entrylineitem in entry.line_items.all():
-                        if entrylineitem.key not in headers:
-                            headers_index[entrylineitem.key] = len(headers)
-                            headers.append(entrylineitem.key)
-                            row.append('')
-
-                        row[headers_index[entrylineitem.key]] = entrylineitem.value
-
-                    cat_data.append(row)
-
-                person_data.append({
-                    'category': cat.category,
-                    'headers': headers,
-                    'data': cat_data})
             data.append({
-                'person': person,
-                'data': person_data,
-                'year': year,
-                'source_url': source_url})
+                'person': entry_person.person,
+                'data': tables[(entry_person.release_id, entry_person.person_id)],
+                'year': entry_person.release.date.year,
+                'source_url': entry_person.release.source_url})
 
         context['data'] = data
 
         return context
 
     def get_section_view(self, context):
-        release_content_type = ContentType.objects.get_for_model(Release)
-
         # Section view - data for multiple people in different categories
         context['layout'] = 'section'
 
@@ -189,7 +155,8 @@ class SAMembersInterestsIndex(TemplateView):
 
         entries = Entry.objects.select_related(
             'person',
-            'category'
+            'category',
+            'release'
         ).all().filter(
             category__id=context['category_id']
         ).order_by(
@@ -217,21 +184,12 @@ class SAMembersInterestsIndex(TemplateView):
         except EmptyPage:
             entries_paginated = paginator.page(paginator.num_pages)
 
+        add_release_source_urls(entry.release for entry in entries_paginated)
+
         headers = ['Year', 'Person', 'Type']
         headers_index = {'Year': 0, 'Person': 1, 'Type': 2}
         data = []
         for entry in entries_paginated:
-            sources = models.InformationSource.objects.filter(
-                content_type=release_content_type,
-                object_id=entry.release.id
-            )
-            if sources:
-                source_url = sources[0].source
-            else:
-                source_url = ''
-
-            entry.release.source_url = source_url
-
             row = [''] * len(headers)
             row[0] = entry.release
             row[1] = entry.person
@@ -253,74 +211,42 @@ class SAMembersInterestsIndex(TemplateView):
 
         return context
 
-    def get_number_by_representative_view(self, context):
-        release_content_type = ContentType.objects.get_for_model(Release)
-
-        # numberbyrepresentative view - number of declarations per person per category
-        context['layout'] = 'numberbyrepresentative'
-
-        # Custom sql used as:
-        # Entry.objects.values('category', 'release', 'person').annotate(c=Count('id')).order_by('-c')
-        # ... returns a ValueQuerySet with foreign keys, not model instances
-        if context['category'] == 'all' and context['release'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max(id) as id, category_id, release_id, person_id,
-                count(*) as c FROM "interests_register_entry"
-                GROUP BY category_id, release_id, person_id ORDER BY c DESC''',
-                [])
-        elif context['category'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max(id) as id, category_id, release_id, person_id,
-                count(*) as c FROM "interests_register_entry"
-                WHERE "interests_register_entry"."release_id" = %s
-                GROUP BY category_id, release_id, person_id ORDER BY c DESC''',
-                [context['release_id']])
-        elif context['category'] != 'all' and context['release'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max(id) as id, category_id, release_id, person_id,
-                count(*) as c FROM "interests_register_entry"
-                WHERE "interests_register_entry"."category_id" = %s
-                GROUP BY category_id, release_id, person_id ORDER BY c DESC''',
-                [context['category_id']])
-        else:
-            data = Entry.objects.raw(
-                '''SELECT max(id) as id, category_id, release_id, person_id,
-                count(*) as c FROM "interests_register_entry"
-                WHERE "interests_register_entry"."category_id" = %s
-                AND "interests_register_entry"."release_id" = %s
-                GROUP BY category_id, release_id, person_id ORDER BY c DESC''',
-                [context['category_id'], context['release_id']])
-
-        paginator = Paginator(data, 20)
-        paginator._count = len(list(data))
+    def paginate(self, queryset, per_page):
+        paginator = Paginator(queryset, per_page)
         page = self.request.GET.get('page')
 
         try:
-            data_paginated = paginator.page(page)
+            return paginator.page(page)
         except PageNotAnInteger:
-            data_paginated = paginator.page(1)
+            return paginator.page(1)
         except EmptyPage:
-            data_paginated = paginator.page(paginator.num_pages)
-
-        for row in data_paginated:
-            sources = models.InformationSource.objects.filter(
-                content_type=release_content_type,
-                object_id=row.release.id
-            )
-            if sources:
-                source_url = sources[0].source
-            else:
-                source_url = ''
+            return paginator.page(paginator.num_pages)
+
+    def filter_summaries(self, summaries, context):
+        if context['release'] != 'all':
+            summaries = summaries.filter(release=context['release_id'])
+        if context['category'] != 'all':
+            summaries = summaries.filter(category=context['category_id'])
+        return summaries.order_by('-count', 'id')
+
+    def get_number_by_representative_view(self, context):
+        # numberbyrepresentative view - number of declarations per person per category
+        context['layout'] = 'numberbyrepresentative'
 
-            row.release.source_url = source_url
+        # The counts are precomputed when the register is imported,
+        # so the summary table can be paginated directly:
+        data = self.filter_summaries(
+            PersonCategorySummary.objects.select_related(
+                'release', 'category', 'person'),
+            context)
+        data_paginated = self.paginate(data, 20)
+        add_release_source_urls(row.release for row in data_paginated)
 
         context['data'] = data_paginated
 
         return context
 
     def get_numberbysource_view(self, context):
-        release_content_type = ContentType.objects.get_for_model(Release)
-
         context['categories'] = Category.objects.filter(
             slug__in=['sponsorships',
                       'gifts-and-hospitality',
@@ -329,77 +255,12 @@ class SAMembersInterestsIndex(TemplateView):
 
         # numberbysource view - number of declarations by source per category
         context['layout'] = 'numberbysource'
-        if context['category'] == 'all' and context['release'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max("interests_register_entrylineitem"."id") as id,
-                value, count(*) as c, release_id, category_id
-                FROM "interests_register_entrylineitem"
-                INNER JOIN "interests_register_entry"
-                ON ("interests_register_entrylineitem"."entry_id"
-                = "interests_register_entry"."id")
-                WHERE ("interests_register_entrylineitem"."key" = 'Source')
-                GROUP BY value, release_id, category_id ORDER BY c DESC''',
-                [])
-        elif context['category'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max("interests_register_entrylineitem"."id") as id,
-                value, count(*) as c, release_id, category_id
-                FROM "interests_register_entrylineitem"
-                INNER JOIN "interests_register_entry"
-                ON ("interests_register_entrylineitem"."entry_id"
-                = "interests_register_entry"."id")
-                WHERE ("interests_register_entrylineitem"."key" = 'Source'
-                AND "interests_register_entry"."release_id" = %s)
-                GROUP BY value, release_id, category_id ORDER BY c DESC''',
-                [context['release_id']])
-        elif context['release'] == 'all':
-            data = Entry.objects.raw(
-                '''SELECT max("interests_register_entrylineitem"."id") as id,
-                value, count(*) as c, release_id, category_id
-                FROM "interests_register_entrylineitem"
-                INNER JOIN "interests_register_entry"
-                ON ("interests_register_entrylineitem"."entry_id"
-                = "interests_register_entry"."id")
-                WHERE ("interests_register_entry"."category_id" = %s
-                AND "interests_register_entrylineitem"."key" = 'Source')
-                GROUP BY value, release_id, category_id ORDER BY c DESC''',
-                [context['category_id']])
-        else:
-            data = Entry.objects.raw(
-                '''SELECT max("interests_register_entrylineitem"."id") as id,
-                value, count(*) as c, release_id, category_id
-                FROM "interests_register_entrylineitem"
-                INNER JOIN "interests_register_entry"
-                ON ("interests_register_entrylineitem"."entry_id"
-                = "interests_register_entry"."id")
-                WHERE ("interests_register_entry"."category_id" = %s
-                AND "interests_register_entrylineitem"."key" = 'Source'
-                AND "interests_register_entry"."release_id" = %s)
-                GROUP BY value, release_id, category_id ORDER BY c DESC''',
-                [context['category_id'], context['release_id']])
-
-        paginator = Paginator(data, 20)
-        paginator._count = len(list(data))
-        page = self.request.GET.get('page')
-
-        try:
-            data_paginated = paginator.page(page)
-        except PageNotAnInteger:
-            data_paginated = paginator.page(1)
-        except EmptyPage:
-            data_paginated = paginator.page(paginator.num_pages)
-
-        for row in data_paginated:
-            sources = models.InformationSource.objects.filter(
-                content_type=release_content_type,
-                object_id=row.release.id
-            )
-            if sources:
-                source_url = sources[0].source
-            else:
-                source_url = ''
 
-            row.release.source_url = source_url
+        data = self.filter_summaries(
+            SourceCategorySummary.objects.select_related('release', 'category'),
+            context)
+        data_paginated = self.paginate(data, 20)
+        add_release_source_urls(row.release for row in data_paginated)
 
         context['data'] = data_paginated
 
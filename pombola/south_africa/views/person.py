@@ -1,23 +1,20 @@
 from __future__ import division
 
 import dateutil
-import json
 import logging
 import re
-import requests
-import urllib
 import datetime
 
-from .constants import API_REQUESTS_TIMEOUT
 from urlparse import urlsplit
 
-from django.contrib.contenttypes.models import ContentType
-from django.core.cache import caches
 from django.db.models import Q
 
 from pombola.core import models
 from pombola.core.views import PersonDetail, PersonSpeakerMappingsMixin
-from pombola.interests_register.models import Release
+from pombola.interests_register.tabulation import get_tabulated_interests
+from pombola.south_africa.pmg_attendance import (
+    PMG_MEMBER_SCHEME, get_stored_attendance, member_attendance_url
+)
 
 from speeches.models import Speech
 
@@ -41,6 +38,19 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
     #  P:   Present
     present_values = set(('P', 'DE', 'L', 'LDE'))
 
+    # The context variables for lists of contact values, and the
+    # slugs of the kinds of contact to include in each:
+    contact_kinds_for_context = (
+        ('twitter_contacts', ('twitter',)),
+        ('facebook_contacts', ('facebook',)),
+        ('linkedin_contacts', ('linkedin',)),
+        ('youtube_contacts', ('youtube',)),
+        ('whoswhosa_contacts', ('whos-who-sa',)),
+        ('phone_contacts', ('cell', 'voice')),
+        ('fax_contacts', ('fax',)),
+        ('address_contacts', ('address',)),
+    )
+
     def get_recent_speeches_for_section(self, tags, limit=5):
         pombola_person = self.object
         sayit_speaker = self.pombola_person_to_sayit_speaker(pombola_person)
@@ -51,86 +61,73 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
 
         speeches = Speech.objects \
             .filter(tags__name__in=tags, speaker=sayit_speaker) \
+            .select_related('section__parent') \
             .order_by('-start_date', '-start_time')
 
         if limit:
             speeches = speeches[:limit]
+            # Fetch the speeches now, so that the template checking
+            # how many there are doesn't make a COUNT query each time:
+            len(speeches)
 
         return speeches
 
-    def get_tabulated_interests(self):
-        interests = self.object.interests_register_entries.all()
-        tabulated = {}
-
-        release_content_type = ContentType.objects.get_for_model(Release)
-
-        for entry in interests:
-            release = entry.release
-            category = entry.category
-
-            if release.id not in tabulated:
-                sources = models.InformationSource.objects.filter(
-                    content_type=release_content_type,
-                    object_id=release.id
-                )
-
-                tabulated[release.id] = {
-                    'name': release.name,
-                    'categories': {},
-                    'informationsource': sources
-                }
-
-            if category.id not in tabulated[release.id]['categories']:
-                tabulated[release.id]['categories'][category.id] = {
-                    'name': category.name,
-                    'headings': [],
-                    'headingindex': {},
-                    'headingcount': 1,
-                    'entries': []
-                }
-
-            #create row list
-            tabulated[release.id]['categories'][category.id]['entries'].append(
-                [''] * (tabulated[entry.release.id]['categories'][entry.category.id]['headingcount'] - 1)
-            )
-
-            #loop through each 'cell' in the row
-            for entrylistitem in entry.line_items.all():
-                #if the heading for the column does not yet exist, create it
-                if entrylistitem.key not in tabulated[entry.release.id]['categories'][entry.category.id]['headingindex']:
-                    tabulated[release.id]['categories'][category.id]['headingindex'][entrylistitem.key] = tabulated[entry.release.id]['categories'][entry.category.id]['headingcount'] - 1
-                    tabulated[release.id]['categories'][category.id]['headingcount'] += 1
-                    tabulated[release.id]['categories'][category.id]['headings'].append(entrylistitem.key)
-
-                    #loop through each row that already exists to ensure lists are the same size
-                    for (key, line) in enumerate(tabulated[release.id]['categories'][category.id]['entries']):
-                        tabulated[entry.release.id]['categories'][entry.category.id]['entries'][key].append('')
-
-                #record the 'cell' in the correct position in the row list
-                tabulated[release.id]['categories'][category.id]['entries'][-1][tabulated[release.id]['categories'][category.id]['headingindex'][entrylistitem.key]] = entrylistitem.value
-
-        ret = []
+    def get_contacts_context(self):
+        """Return the context variables for all the person's contacts
 
-        for release_id, release_data in tabulated.items():
-            release = Release.objects.get(pk=release_id)
-
-            ret.append((release_data, release.date))
-
-        ret.sort(key=lambda x: x[1], reverse=True)
+        The contacts are all fetched with one query, and split up by
+        the slug of their kind here."""
+        context = dict((key, []) for key, kinds in self.contact_kinds_for_context)
+        # The email attribute of the person might also be duplicated
+        # in a contact of type email, so create a set of email
+        # addresses:
+        email_contacts = set()
+        if self.object.email:
+            email_contacts.add((self.object.email, True))
 
-        return ret
+        contacts = self.object.contacts.values_list('kind__slug', 'value', 'preferred')
+        for kind_slug, value, preferred in contacts:
+            if kind_slug == 'email':
+                email_contacts.add((value, preferred))
+            for key, kinds in self.contact_kinds_for_context:
+                if kind_slug in kinds:
+                    context[key].append(value)
 
-    def list_contacts_by_kind(self, kind_slugs):
-        return self.object.contacts \
-            .filter(kind__slug__in=kind_slugs)
+        context['email_contacts'] = sorted(email_contacts, key=lambda tup: not tup[1])
+        return context
 
-    def list_contacts_values(self, kind_slugs):
-        return self.list_contacts_by_kind(kind_slugs) \
-            .values_list('value', flat=True)
+    def get_important_organisations(self):
+        """Return the organisations of current and former important positions
 
-    def list_contacts_with_preferred(self, kind_slugs):
-        return self.list_contacts_by_kind(kind_slugs) \
-            .values_list('value', 'preferred')
+        This returns two lists of organisations, ordered by name.  The
+        positions are all fetched in one query and split into current
+        and former ones here; an organisation that the person has a
+        current position in isn't included in the former ones."""
+        today = datetime.date.today()
+        positions = (
+            self.object.position_set
+            .all()
+            .political()
+            .filter(organisation__kind__slug__in=self.important_org_kind_slugs)
+            .select_related('organisation')
+        )
+        current = {}
+        former = {}
+        for position in positions:
+            if position.active_start_date is None or position.active_end_date is None:
+                continue
+            if position.active_start_date <= today <= position.active_end_date:
+                current[position.organisation_id] = position.organisation
+            elif position.active_end_date < today:
+                former[position.organisation_id] = position.organisation
+
+        def by_name(organisations):
+            return sorted(organisations, key=lambda o: o.name)
+
+        return (
+            by_name(current.values()),
+            by_name(o for o_id, o in former.items() if o_id not in current),
+        )
 
     def get_former_parties(self, person):
         former_party_memberships = (
@@ -146,41 +143,6 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
         return models.Organisation.objects.filter(
             position__in=former_party_memberships).distinct()
 
-    def store_or_get_pmg_member_id(self, scheme='za.org.pmg.api/member'):
-        identifier = self.object.get_identifier(scheme)
-
-        if not identifier:
-            # First find the id of the person
-            pa_link = urllib.quote(
-                "https://www.pa.org.za/person/{}/".format(self.object.slug))
-
-            url_fmt = "https://api.pmg.org.za/member/?filter[pa_link]={}"
-            api_search_url = url_fmt.format(pa_link)
-            try:
-                search_resp = requests.get(
-                    api_search_url, timeout=API_REQUESTS_TIMEOUT)
-            except requests.exceptions.RequestException:
-                raise AttendanceAPIDown
-            search_data = json.loads(search_resp.text)
-
-            if not search_data.get('count'):
-                return None
-
-            if search_data['count'] > 1:
-                logger.error(
-                    'Duplicate members at PMG with slug {} - SKIPPING'.format(self.object.slug))
-                return None
-
-            identifier = search_data['results'][0]['id']
-
-            models.Identifier.objects.create(
-                scheme=scheme,
-                identifier=identifier,
-                content_object=self.object,
-            )
-
-        return identifier
-
     def get_active_minister_positions(self, years):
         """
         Return a year:active_ministerial_position dict for the list of years provided
@@ -203,32 +165,24 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
                 return True
         return False
 
-    def get_attendance_data_url(self, attendance_url_template="https://api.pmg.org.za/member/{}/attendance/"):
-        identifier = self.store_or_get_pmg_member_id()
+    def get_attendance_data_url(self):
+        identifier = self.object.get_identifier(PMG_MEMBER_SCHEME)
 
         if identifier:
-            return attendance_url_template.format(identifier)
+            return member_attendance_url(identifier)
 
     def download_attendance_data(self):
-        attendance_url = next_url = self.get_attendance_data_url()
-
-        cache = caches['pmg_api']
-        results = cache.get(attendance_url)
-
+        # The data is fetched from PMG in the background by the
+        # south_africa_refresh_pmg_attendance command, which also
+        # looks up people's PMG member IDs; until that's happened
+        # the attendance is unavailable.
+        attendance_url = self.get_attendance_data_url()
+        if not attendance_url:
+            raise AttendanceAPIDown
+
+        results = get_stored_attendance(attendance_url)
         if results is None:
-            results = []
-            while next_url:
-                try:
-                    resp = requests.get(next_url, timeout=API_REQUESTS_TIMEOUT)
-                except requests.exceptions.RequestException:
-                    raise AttendanceAPIDown
-
-                data = json.loads(resp.text)
-                results.extend(data.get('results'))
-
-                next_url = data.get('next')
-
-            cache.set(attendance_url, results)
+            raise AttendanceAPIDown
 
         # Results are returned from the API most recent first, which
         # is convenient for us.
@@ -348,45 +302,11 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
 
     def get_context_data(self, **kwargs):
         context = super(SAPersonDetail, self).get_context_data(**kwargs)
-        context['twitter_contacts'] = self.list_contacts_values(('twitter',))
-        context['facebook_contacts'] = self.list_contacts_values(('facebook',))
-        context['linkedin_contacts'] = self.list_contacts_values(('linkedin',))
-        context['youtube_contacts'] = self.list_contacts_values(('youtube',))
-        context['whoswhosa_contacts'] = self.list_contacts_values(('whos-who-sa',))
-        # The email attribute of the person might also be duplicated
-        # in a contact of type email, so create a set of email
-        # addresses:
-        email_contacts = set(self.list_contacts_with_preferred(('email',)))
-        if self.object.email:
-            email_contacts.add((self.object.email, True))
-
-        context['email_contacts'] = sorted(email_contacts, key=lambda tup: not tup[1])
-        context['phone_contacts'] = self.list_contacts_values(('cell', 'voice'))
-        context['fax_contacts'] = self.list_contacts_values(('fax',))
-        context['address_contacts'] = self.list_contacts_values(('address',))
-
-        orgs_from_important_positions = models.Organisation.objects.filter(
-            kind__slug__in=self.important_org_kind_slugs,
-            position__in=self.object.politician_positions(),
-        )
-
-        former_important_positions = (
-            self.object.position_set
-            .all()
-            .political()
-            .previous()
-            .filter(organisation__kind__slug__in=self.important_org_kind_slugs)
-        )
-
-        former_orgs_from_important_positions = models.Organisation.objects.filter(
-            position__in=former_important_positions,
-        ).exclude(id__in=orgs_from_important_positions)
-
-        context['organizations_from_important_positions'] = \
-            orgs_from_important_positions.distinct()
+        context.update(self.get_contacts_context())
 
-        context['organizations_from_former_important_positions'] = \
-            former_orgs_from_important_positions.distinct()
+        context['organizations_from_important_positions'], \
+            context['organizations_from_former_important_positions'] = \
+            self.get_important_organisations()
 
         # FIXME - the titles used here will need to be checked and fixed.
         context['hansard'] = self.get_recent_speeches_for_section(
@@ -396,14 +316,11 @@ class SAPersonDetail(PersonSpeakerMappingsMixin, PersonDetail):
         context['question'] = self.get_recent_speeches_for_section(
             ('question', 'answer'), limit=3)
 
-        context['interests'] = self.get_tabulated_interests()
+        context['interests'] = get_tabulated_interests(self.object)
         if self.object.date_of_death is not None:
             context['former_parties'] = self.get_former_parties(self.object)
 
-        show_attendance = False
-        for party in self.object.parties():
-            if party.show_attendance:
-                show_attendance = True
+        show_attendance = self.object.parties().filter(show_attendance=True).exists()
         if show_attendance:
             try:
                 context['attendance'], context['latest_meetings_attended'] = \
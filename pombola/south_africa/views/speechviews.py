@@ -1,19 +1,21 @@
 import re
+from collections import defaultdict
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.core.urlresolvers import reverse
-from django.db.models import Count, Min, Max
+from django.db.models import F, Max
 from django.http import Http404
 from django.views.generic import RedirectView, TemplateView
 from django.shortcuts import get_object_or_404, redirect
 
-from haystack.query import RelatedSearchQuerySet
+from haystack.query import SearchQuerySet
 from haystack.inputs import AutoQuery
 
 from pombola.core import models
 from pombola.core.views import PersonSpeakerMappingsMixin
+from pombola.za_hansard.models import question_sections
 
 from slug_helpers.views import SlugRedirect
 
@@ -59,15 +61,15 @@ class SASpeechesIndex(NamespaceMixin, TemplateView):
         # The parent_sections form the headings which are expanded by javascript
         # to reveal the debate_sections
         #
-        # FIXME ideally we'd have start_date for sections rather than
-        # having to get MAX('start_date') from the speeches table
+        # The dates and numbers of speeches in each section come from
+        # the section summaries, which are updated when speeches are
+        # imported, rather than from the speeches table itself.
 
         # exclude sections without subsections and
         # with subsections that have no speeches
         section_filter = {
             self.section_parent_field: top_section,
-            'children__speech__id__isnull': False,
-            'children__id__isnull': False
+            'children__summary__isnull': False,
         }
 
         # get a list of all the section headings
@@ -76,7 +78,7 @@ class SASpeechesIndex(NamespaceMixin, TemplateView):
             .filter(**section_filter) \
             .values('heading') \
             .distinct() \
-            .annotate(latest_start_date=Max('children__speech__start_date')) \
+            .annotate(latest_start_date=Max('children__summary__latest_speech_date')) \
             .order_by('-latest_start_date')
 
         # use Paginator to cut this down to the sections for the current page
@@ -95,7 +97,7 @@ class SASpeechesIndex(NamespaceMixin, TemplateView):
             .objects \
             .values('id', 'heading') \
             .filter(**section_filter) \
-            .annotate(latest_start_date=Max('children__speech__start_date')) \
+            .annotate(latest_start_date=Max('children__summary__latest_speech_date')) \
             .order_by('-latest_start_date', 'heading')
 
         # get the subsections based on the relevant section ids
@@ -103,8 +105,12 @@ class SASpeechesIndex(NamespaceMixin, TemplateView):
         parent_ids = list(section['id'] for section in parent_sections)
         debate_sections = Section \
             .objects \
-            .filter(parent_id__in=parent_ids, speech__id__isnull=False) \
-            .annotate(start_order=Min('speech__id'), speech_start_date=Max('speech__start_date'), speech_count=Count('speech__id')) \
+            .filter(parent_id__in=parent_ids, summary__isnull=False) \
+            .select_related('parent') \
+            .annotate(
+                start_order=F('summary__first_speech_id'),
+                speech_start_date=F('summary__latest_speech_date'),
+                speech_count=F('summary__speech_count')) \
             .exclude(heading='') \
             .order_by('-speech_start_date', 'parent__heading', 'start_order')
 
@@ -197,65 +203,39 @@ class SAQuestionIndex(TemplateView):
         if not context['orderby'] in ['recentquestions', 'recentanswers']:
             context['orderby'] = 'recentquestions'
 
-        search_result_sections = []
+        page = self.request.GET.get('page')
 
         if context['q'] != '':
-            #using a RelatedSearchQuerySet seems to result in fewer
-            #queries, although the same results can be achieved with a
-            #SearchQuerySet
-            query = RelatedSearchQuerySet().models(Speech)
-            query = query.filter(
-                tags__name__in=['question', 'answer'],
-                content=AutoQuery(context['q']),
-            ).load_all()
-
-            all_speeches = Speech.objects.all().filter(
-                tags__name__in=['question', 'answer'])
-
+            # Each question is indexed with its answer as one document,
+            # so the search backend does the filtering, ordering and
+            # pagination, and only the sections on the page are loaded.
+            sections = SearchQuerySet().models(Section).filter(
+                content=AutoQuery(context['q']))
             if context['minister'] != 'all':
-                all_speeches = all_speeches.filter(
-                    section__parent__slug=context['minister']
-                )
-
-            query = query.load_all_queryset(Speech, all_speeches)
-
-            for result in query:
-                search_result_sections.append(result.object.section.id)
-
-        sections = Section \
-            .objects \
-            .filter(
-                parent__parent__heading='Questions'
-            ) \
-            .select_related('parent__heading') \
-            .prefetch_related('speech_set') \
-            .annotate(
-                earliest_date=Min('speech__start_date'),
-                smallest_id=Min('speech__id'),
-                number_speeches=Count('speech'),
-                latest_date=Max('speech__start_date'),
-            )
-
-        if context['minister'] != 'all':
-            sections = sections.filter(parent__slug=context['minister'])
-
-        if len(search_result_sections) > 0:
-            sections = sections.filter(id__in=search_result_sections)
-
-        if context['orderby'] == 'recentanswers':
-            sections = sections.filter(number_speeches__gt=1).order_by(
-                '-latest_date',
-                '-smallest_id'
-            )
+                sections = sections.filter(
+                    minister_exact__exact=context['minister'])
+            if context['orderby'] == 'recentanswers':
+                sections = sections.filter(answered=True).order_by(
+                    '-answer_date', '-first_speech_id')
+            else:
+                sections = sections.order_by(
+                    '-question_date', '-first_speech_id')
         else:
-            sections = sections.order_by(
-                '-earliest_date',
-                '-smallest_id'
-            )
+            sections = question_sections()
+            if context['minister'] != 'all':
+                sections = sections.filter(parent__slug=context['minister'])
+            if context['orderby'] == 'recentanswers':
+                sections = sections.filter(summary__speech_count__gt=1).order_by(
+                    '-summary__latest_speech_date',
+                    '-summary__first_speech_id'
+                )
+            else:
+                sections = sections.order_by(
+                    '-summary__earliest_speech_date',
+                    '-summary__first_speech_id'
+                )
 
         paginator = Paginator(sections, 10)
-        page = self.request.GET.get('page')
-
         try:
             sections = paginator.page(page)
         except PageNotAnInteger:
@@ -263,21 +243,42 @@ class SAQuestionIndex(TemplateView):
         except EmptyPage:
             sections = paginator.page(paginator.num_pages)
 
+        if context['q'] != '':
+            section_ids = [int(result.pk) for result in sections]
+            sections_by_id = question_sections().in_bulk(section_ids)
+            page_sections = [
+                sections_by_id[section_id] for section_id in section_ids
+                if section_id in sections_by_id
+            ]
+        else:
+            page_sections = list(sections)
+
         context['paginator'] = sections
 
+        # Fetch the speeches for every section on the page at once; the
+        # first is the question and, if there's more than one, the last
+        # is the answer.
+        section_speeches = defaultdict(list)
+        for speech in Speech.objects \
+                .filter(section__in=page_sections) \
+                .select_related('speaker'):
+            section_speeches[speech.section_id].append(speech)
+
         #format questions and answers for the template
         questions = []
-        for section in sections:
-            question = section.speech_set.all()[0]
+        for section in page_sections:
+            speeches = section_speeches[section.id]
+            if not speeches:
+                continue
+            question = speeches[0]
+            question.section = section
             question.questionto = section.parent.heading.replace(
                 'Questions asked to the ', '')
             question.questionto_slug = section.parent.slug
 
             #assume if there is more than one speech that the question is answered
-            if len(section.speech_set.all()) > 1:
-                question.answer = section \
-                    .speech_set \
-                    .all()[len(section.speech_set.all()) - 1]
+            if len(speeches) > 1:
+                question.answer = speeches[-1]
 
                 #extract the actual reply from the reply text (replies
                 #often include the original question and other text,
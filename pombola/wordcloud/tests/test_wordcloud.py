@@ -1,36 +1,50 @@
 # coding=UTF-8
-from mock import patch, Mock
+from datetime import date
 
 from django.test import TestCase
 
+from pombola.core.models import Person
+from pombola.hansard.models import Entry, Sitting, SittingTermCount, Source, Venue
 from pombola.wordcloud.wordcloud import popular_words
 
 
-def debug_print():
-    print 'DEBUGGING'
-
-
-@patch('pombola.wordcloud.wordcloud.recent_entries')
 class TestPopularWords(TestCase):
-    def make_entries(self, recent_entries, text_entries):
-        recent_entries.return_value = [
-            Mock(**{'object.content': x}) for x in text_entries
-            ]
+    def setUp(self):
+        self.venue = Venue.objects.create(
+            name='National Assembly', slug='national-assembly')
+        self.sittings = []
 
-    def test_popular_words_punctuation(self, recent_entries):
+    def make_sitting(self, text_entries, start_date=date(2016, 5, 1), speaker=None):
+        source = Source.objects.create(
+            name='Hansard {0}'.format(start_date), date=start_date)
+        sitting = Sitting.objects.create(
+            source=source, venue=self.venue, start_date=start_date)
+        for i, text in enumerate(text_entries):
+            Entry.objects.create(
+                sitting=sitting,
+                type='speech',
+                page_number=1,
+                text_counter=i,
+                speaker=speaker,
+                content=text,
+            )
+        SittingTermCount.objects.update_for_sittings([sitting.id])
+        return sitting
+
+    def test_popular_words_punctuation(self):
         text_entries = [
             'Testing! Testing!',
             'Testing again.',
             ]
 
-        self.make_entries(recent_entries, text_entries)
+        self.make_sitting(text_entries)
 
         self.assertEqual(
             [{'text': 'testing', 'link': '/search/hansard/?q=testing', 'weight': 3}],
             popular_words(),
             )
 
-    def test_popular_words(self, recent_entries):
+    def test_popular_words(self):
         text_entries = [
             'As well as issuing 107 formal notices to underperforming academies, '
             'we have intervened and changed the sponsor in 75 cases of particular '
@@ -41,38 +55,67 @@ class TestPopularWords(TestCase):
             'be inadequate.',
             ]
 
-        self.make_entries(recent_entries, text_entries)
+        self.make_sitting(text_entries)
 
         words = popular_words()
 
         expected = [
             {'text': 'academies', 'link': '/search/hansard/?q=academies', 'weight': 2},
+            {'text': '107', 'link': '/search/hansard/?q=107', 'weight': 1},
+            {'text': '75', 'link': '/search/hansard/?q=75', 'weight': 1},
+            {'text': 'academy', 'link': '/search/hansard/?q=academy', 'weight': 1},
+            {'text': 'cases', 'link': '/search/hansard/?q=cases', 'weight': 1},
             {'text': 'changed', 'link': '/search/hansard/?q=changed', 'weight': 1},
-            {'text': 'underperforming', 'link': '/search/hansard/?q=underperforming', 'weight': 1},
+            {'text': 'commissioner', 'link': '/search/hansard/?q=commissioner', 'weight': 1},
+            {'text': 'concern', 'link': '/search/hansard/?q=concern', 'weight': 1},
+            {'text': 'constituency', 'link': '/search/hansard/?q=constituency', 'weight': 1},
+            {'text': 'evident', 'link': '/search/hansard/?q=evident', 'weight': 1},
+            {'text': 'failing', 'link': '/search/hansard/?q=failing', 'weight': 1},
+            {'text': 'formal', 'link': '/search/hansard/?q=formal', 'weight': 1},
             {'text': 'inadequate', 'link': '/search/hansard/?q=inadequate', 'weight': 1},
-            {'text': 'sponsor', 'link': '/search/hansard/?q=sponsor', 'weight': 1},
+            {'text': 'interested', 'link': '/search/hansard/?q=interested', 'weight': 1},
+            {'text': 'intervened', 'link': '/search/hansard/?q=intervened', 'weight': 1},
             {'text': 'intervention', 'link': '/search/hansard/?q=intervention', 'weight': 1},
+            {'text': 'involved', 'link': '/search/hansard/?q=involved', 'weight': 1},
+            {'text': 'issuing', 'link': '/search/hansard/?q=issuing', 'weight': 1},
             {'text': 'judges', 'link': '/search/hansard/?q=judges', 'weight': 1},
-            {'text': 'ofsted', 'link': '/search/hansard/?q=ofsted', 'weight': 1},
-            {'text': '107', 'link': '/search/hansard/?q=107', 'weight': 1},
-            {'text': 'interested', 'link': '/search/hansard/?q=interested', 'weight': 1},
+            {'text': 'lady', 'link': '/search/hansard/?q=lady', 'weight': 1},
             {'text': 'notices', 'link': '/search/hansard/?q=notices', 'weight': 1},
-            {'text': 'concern', 'link': '/search/hansard/?q=concern', 'weight': 1},
-            {'text': 'commissioner', 'link': '/search/hansard/?q=commissioner', 'weight': 1},
-            {'text': 'intervened', 'link': '/search/hansard/?q=intervened', 'weight': 1},
-            {'text': 'academy', 'link': '/search/hansard/?q=academy', 'weight': 1},
+            {'text': 'ofsted', 'link': '/search/hansard/?q=ofsted', 'weight': 1},
             {'text': 'regional', 'link': '/search/hansard/?q=regional', 'weight': 1},
-            {'text': '75', 'link': '/search/hansard/?q=75', 'weight': 1},
             {'text': 'schools', 'link': '/search/hansard/?q=schools', 'weight': 1},
-            {'text': 'cases', 'link': '/search/hansard/?q=cases', 'weight': 1},
-            {'text': 'lady', 'link': '/search/hansard/?q=lady', 'weight': 1},
-            {'text': 'issuing', 'link': '/search/hansard/?q=issuing', 'weight': 1},
-            {'text': 'formal', 'link': '/search/hansard/?q=formal', 'weight': 1},
-            {'text': 'evident', 'link': '/search/hansard/?q=evident', 'weight': 1},
-            {'text': 'involved', 'link': '/search/hansard/?q=involved', 'weight': 1},
-            {'text': 'failing', 'link': '/search/hansard/?q=failing', 'weight': 1},
-            {'text': 'constituency', 'link': '/search/hansard/?q=constituency', 'weight': 1},
+            {'text': 'sponsor', 'link': '/search/hansard/?q=sponsor', 'weight': 1},
+            {'text': 'underperforming', 'link': '/search/hansard/?q=underperforming', 'weight': 1},
             ]
 
-        # I guess this is slightly fragile and relies on the ordering being preserved.
+        # Words used equally often are in alphabetical order.
         self.assertEqual(words, expected)
+
+    def test_popular_words_in_recent_sittings(self):
+        self.make_sitting(['Budget budget budget'], start_date=date(2016, 1, 1))
+        self.make_sitting(['Drought drought'], start_date=date(2016, 2, 1))
+        self.make_sitting(['Drought roads'], start_date=date(2016, 3, 1))
+
+        self.assertEqual(
+            [(w['text'], w['weight']) for w in popular_words(max_sittings=2)],
+            [('drought', 3), ('roads', 1)])
+        self.assertEqual(
+            [(w['text'], w['weight']) for w in popular_words(max_sittings=3)],
+            [('budget', 3), ('drought', 3), ('roads', 1)])
+
+    def test_popular_words_for_speaker(self):
+        speaker = Person.objects.create(legal_name='Test Speaker', slug='test-speaker')
+        self.make_sitting(['Budget budget'], start_date=date(2016, 1, 1), speaker=speaker)
+        self.make_sitting(['Drought drought'], start_date=date(2016, 2, 1))
+        sitting = self.make_sitting(['Roads'], start_date=date(2016, 3, 1))
+
+        self.assertEqual(
+            [(w['text'], w['weight']) for w in popular_words(max_sittings=1, speaker=speaker)],
+            [('budget', 2)])
+
+        # Assigning a speaker updates the counts:
+        sitting.entry_set.update(speaker=speaker)
+        SittingTermCount.objects.update_for_sittings([sitting.id])
+        self.assertEqual(
+            [(w['text'], w['weight']) for w in popular_words(max_sittings=1, speaker=speaker)],
+            [('roads', 1)])
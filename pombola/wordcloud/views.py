@@ -3,17 +3,32 @@ import os
 
 from django.conf import settings
 from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
 from django.views.decorators.cache import cache_page
 
+from pombola.core.models import Person
+
 from .wordcloud import popular_words
 
 
 @cache_page(60*60*4)
-def wordcloud(request, max_entries=30):
-    """ Return tag cloud JSON results"""
+def wordcloud(request, max_sittings=30):
+    """ Return tag cloud JSON results
+
+    The words come from the most recent max_sittings sittings; if there's
+    a 'speaker' parameter with a person's slug, only their words are used."""
+
+    max_sittings = int(max_sittings)
+
+    speaker_slug = request.GET.get('speaker')
+    if speaker_slug:
+        speaker = get_object_or_404(Person, slug=speaker_slug)
+        return HttpResponse(
+            json.dumps(popular_words(max_sittings=max_sittings, speaker=speaker)),
+            content_type='application/json',
+        )
 
-    max_entries = int(max_entries)
-    leaf_name = 'wordcloud-{0}.json'.format(max_entries)
+    leaf_name = 'wordcloud-{0}.json'.format(max_sittings)
     subdir = 'wordcloud_cache'
     cache_path = os.path.join(
         settings.MEDIA_ROOT, subdir, leaf_name
@@ -32,7 +47,7 @@ def wordcloud(request, max_entries=30):
         )
         return response
 
-    content = json.dumps(popular_words(max_entries=max_entries))
+    content = json.dumps(popular_words(max_sittings=max_sittings))
 
     return HttpResponse(
         content,
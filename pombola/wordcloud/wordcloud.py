@@ -1,8 +1,5 @@
 import os
-from operator import itemgetter
-import re
 
-from haystack.query import SearchQuerySet
 from pombola.hansard import models as hansard_models
 
 
@@ -11,33 +8,34 @@ BASEDIR = os.path.dirname(__file__)
 with open(os.path.join(BASEDIR, 'stopwords.txt'), 'rU') as f:
     STOP_WORDS = set(f.read().splitlines())
 
-def recent_entries(max_entries=10):
-    return SearchQuerySet().models(hansard_models.Entry).order_by('-sitting_start_date')[:max_entries]
-
-
-def popular_words(max_entries=10, max_words=50):
-    sqs = recent_entries(max_entries)
-
-    # Generate tag cloud from content of returned entries
-    words = {}
-    for entry in sqs:
-        text = re.sub(ur'[^\w\s]', '', entry.object.content.lower())
-
-        for x in text.split():
-            if x not in STOP_WORDS:
-                words[x] = 1 + words.get(x, 0)
-
-    wordlist = []
-
-    for word in words:
-        wordlist.append(
-            {
-                "text": word,
-                "weight": words.get(word),
-                "link": "/search/hansard/?q=%s" % word,
-                }
-            )
-
-    wordlist.sort(key=itemgetter('weight'), reverse=True)
-
-    return wordlist[:max_words]
+def recent_sittings(max_sittings=10, speaker=None):
+    sittings = hansard_models.Sitting.objects.all()
+    if speaker is not None:
+        sittings = sittings.filter(
+            id__in=hansard_models.SittingTermCount.objects
+            .filter(speaker=speaker)
+            .values('sitting_id'))
+    return sittings.order_by('-start_date', '-start_time', '-id')[:max_sittings]
+
+
+def popular_words(max_sittings=10, max_words=50, speaker=None):
+    """Return the most used words in the most recent sittings
+
+    If speaker is given, only words used by that person are counted,
+    in the most recent sittings they spoke in.  The counts are looked
+    up in the SittingTermCount table with a single query."""
+
+    term_counts = hansard_models.SittingTermCount.objects.filter(
+        sitting__in=recent_sittings(max_sittings, speaker))
+    if speaker is not None:
+        term_counts = term_counts.filter(speaker=speaker)
+
+    return [
+        {
+            "text": word,
+            "weight": weight,
+            "link": "/search/hansard/?q=%s" % word,
+        }
+        for word, weight in term_counts.popular_terms(
+            exclude_terms=STOP_WORDS, limit=max_words)
+    ]
@@ -3,7 +3,9 @@ import logging
 from django.core.exceptions import ObjectDoesNotExist
 
 from popolo_name_resolver.resolve import ResolvePopoloName
-from speeches.models import Speaker
+from speeches.models import Speaker, Speech
+
+from pombola.search.indexing import update_search_index
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +28,9 @@ class AllowedPersonFilter(object):
 
 
 class ImportZAMixin(object):
+
+    tag_batch_size = 1000
+
     def __init__(self, instance=None, commit=True, pombola_id_blacklist=None, **kwargs):
         super(ImportZAMixin, self).__init__(
             instance=instance,
@@ -34,6 +39,51 @@ class ImportZAMixin(object):
         )
         self.person_cache = {}
         self.pombola_id_blacklist = pombola_id_blacklist
+        self.pending_speeches = []
+        self.pending_speech_tags = []
+
+    def make(self, cls, **kwargs):
+        """Make an object, keeping track of the speeches made
+
+        Each speech is saved as it's made, so it has its ID straight
+        away, but tagging the speeches and updating their search index
+        entries is left to save_pending_speeches, which does it for
+        all of a document's speeches at once."""
+        obj = super(ImportZAMixin, self).make(cls, **kwargs)
+        if cls is Speech and self.commit:
+            self.pending_speeches.append(obj)
+        return obj
+
+    def add_speech_tag(self, speech, tag):
+        """Tag a speech when save_pending_speeches is next called"""
+        self.pending_speech_tags.append((speech, tag))
+
+    def save_pending_speeches(self):
+        """Tag and index the speeches made since this was last called
+
+        The tags are added in bulk, and then the speeches are indexed
+        for search in one batch, so that the index includes the tags."""
+        speeches = self.pending_speeches
+        speech_tags = self.pending_speech_tags
+        self.pending_speeches = []
+        self.pending_speech_tags = []
+        if not speeches:
+            return speeches
+
+        Speech.tags.through.objects.bulk_create(
+            [
+                Speech.tags.through(speech_id=speech.id, tag_id=tag.id)
+                for speech, tag in speech_tags
+            ],
+            batch_size=self.tag_batch_size,
+        )
+        update_search_index(
+            Speech,
+            Speech.objects.filter(id__in=[speech.id for speech in speeches])
+            .select_related('instance', 'speaker')
+            .prefetch_related('tags')
+        )
+        return speeches
 
     def set_resolver_for_date(self, date_string='', date=None):
         self.resolver = ResolvePopoloName(
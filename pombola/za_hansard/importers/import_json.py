@@ -80,10 +80,17 @@ class ImportJson (ImportZAMixin, ImporterBase):
         if self.delete_existing and self.commit:
             section.speech_set.all().delete()
 
+        if limit:
+            existing_speeches = section.speech_set.count()
+
+        tags = {}
+        imported_texts = set()
+
         for s in data.get('speeches', []):
 
             if self.do_not_import_duplicate:
-                if section.speech_set.filter(text=s['text']).count():
+                if s['text'] in imported_texts or \
+                        section.speech_set.filter(text=s['text']).count():
                     continue
 
             display_name = s['personname']
@@ -94,7 +101,7 @@ class ImportJson (ImportZAMixin, ImporterBase):
             if party:
                 display_name += ' (%s)' % party
 
-            if limit and section.speech_set.count() >= limit:
+            if limit and existing_speeches + len(self.pending_speeches) >= limit:
                 break
 
             speech_start_date_string = s.get('date', None)
@@ -125,11 +132,17 @@ class ImportJson (ImportZAMixin, ImporterBase):
                                end_time=None,
                                )
 
+            imported_texts.add(s['text'])
+
             for tagname in s.get('tags', []):
                 if self.commit:
-                    (tag, _) = Tag.objects.get_or_create(
-                        name=tagname, instance=self.instance)
-                    speech.tags.add(tag)
+                    if tagname not in tags:
+                        (tags[tagname], _) = Tag.objects.get_or_create(
+                            name=tagname, instance=self.instance)
+                    self.add_speech_tag(speech, tags[tagname])
+
+        if self.commit:
+            self.save_pending_speeches()
 
         return section
 
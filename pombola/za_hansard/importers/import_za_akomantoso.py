@@ -19,8 +19,10 @@ def title_case_heading(heading):
 
 
 class ImportZAAkomaNtoso(ImportZAMixin, ImportAkomaNtoso):
-    def __init__(self, section_parent_headings=[], **kwargs):
+    def __init__(self, section_parent_headings=[], tags=(), **kwargs):
         self.section_parent_headings = section_parent_headings
+        # These tags are added to every speech that's imported:
+        self.tags = tags
         super(ImportZAAkomaNtoso, self).__init__(**kwargs)
 
     def construct_title(self, node):
@@ -59,6 +61,10 @@ class ImportZAAkomaNtoso(ImportZAMixin, ImportAkomaNtoso):
         self.start_date = datetime.strptime(start_date, '%Y-%m-%d')
 
         self.visit(mainSection, section)
+        for speech in self.pending_speeches:
+            for tag in self.tags:
+                self.add_speech_tag(speech, tag)
+        self.save_pending_speeches()
         self.imported_section_ids.add(section.id)
         return section
 
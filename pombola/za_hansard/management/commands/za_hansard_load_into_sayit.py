@@ -6,7 +6,7 @@ import sys
 
 from pombola.za_hansard.importers.import_za_akomantoso import ImportZAAkomaNtoso
 from speeches.models import Section, Tag, Speech
-from pombola.za_hansard.models import Source
+from pombola.za_hansard.models import SectionSummary, Source
 from instances.models import Instance
 
 from django.conf import settings
@@ -62,7 +62,11 @@ class Command(BaseCommand):
             sources = sources.filter(id=options['id'])
 
         if options['delete_existing']:
-            Speech.objects.filter(tags__name='hansard').delete()
+            speeches = Speech.objects.filter(tags__name='hansard')
+            emptied_section_ids = set(
+                speeches.values_list('section_id', flat=True))
+            speeches.delete()
+            SectionSummary.objects.update_for_sections(emptied_section_ids)
 
         section_ids = []
 
@@ -77,7 +81,8 @@ class Command(BaseCommand):
                 continue
 
             importer = ImportZAAkomaNtoso(instance=instance,
-                                          section_parent_headings=s.section_parent_headings)
+                                          section_parent_headings=s.section_parent_headings,
+                                          tags=[hansard_tag])
             try:
                 self.stdout.write("TRYING %s\n" % path)
                 section = importer.import_document(path)
@@ -91,8 +96,7 @@ class Command(BaseCommand):
             s.last_sayit_import = datetime.datetime.now(pytz.utc)
             s.save()
 
-            for speech in section.descendant_speeches():
-                speech.tags.add(hansard_tag)
+        SectionSummary.objects.update_for_section_trees(section_ids)
 
         self.stdout.write('Imported %d / %d sections\n' %
                           (len(section_ids), len(sources)))
@@ -2,7 +2,9 @@ from bs4 import BeautifulSoup, NavigableString
 import csv
 from datetime import datetime, timedelta
 import errno
+import hashlib
 import json
+from multiprocessing.pool import ThreadPool
 from optparse import make_option
 import os
 from os.path import dirname, join, exists
@@ -11,6 +13,7 @@ import re
 import requests
 
 from django.conf import settings
+from django.core.cache import caches
 from django.core.management.base import BaseCommand, CommandError
 
 from instances.models import Instance
@@ -19,7 +22,9 @@ import pombola.za_hansard.chairperson as chair
 from pombola.za_hansard.chairperson import strip_tags_from_html
 from pombola.za_hansard.datejson import DateEncoder
 from pombola.za_hansard.importers.import_json import ImportJson
-from pombola.za_hansard.models import PMGCommitteeAppearance, PMGCommitteeReport
+from pombola.za_hansard.models import (
+    PMGCommitteeAppearance, PMGCommitteeReport, SectionSummary
+)
 
 # This scraper relies on certain conventions in the text that's
 # authored by PMG in their committee reports. For example, the first
@@ -78,16 +83,20 @@ def mkdir_p(path):
 
 mkdir_p(source_cache_directory)
 
+# The ETag and Last-Modified headers of each committee's API response
+# are kept in the (persistent) 'pmg_api' cache, along with a hash of
+# each meeting that's been processed, so that committees and meetings
+# that haven't changed since the last scrape can be skipped.
+VALIDATORS_KEY_PREFIX = 'scraper-validators:'
+MEETING_HASH_KEY_PREFIX = 'scraper-meeting:'
+
 
-def get_authenticated(url):
+def get_authenticated(url, headers=None):
     """A wrapper for python-requests's get, but with the API auth header"""
 
-    return requests.get(
-        url,
-        headers={
-            'Authentication-Token': settings.PMG_API_KEY,
-        }
-    )
+    headers = dict(headers or {})
+    headers['Authentication-Token'] = settings.PMG_API_KEY
+    return requests.get(url, headers=headers)
 
 
 def get_authenticated_json(url, cache_filename=None):
@@ -96,6 +105,45 @@ def get_authenticated_json(url, cache_filename=None):
     return get_authenticated(url).json()
 
 
+def get_authenticated_json_if_modified(url, use_stored_validators=True):
+    """Make a conditional request for JSON from the API
+
+    This returns a tuple of the parsed JSON and the response's
+    validators.  If the stored validators for the URL show that it
+    hasn't changed, the JSON is None.  The validators aren't stored
+    here, since they should only be once the response has been dealt
+    with - use store_validators for that."""
+
+    headers = {}
+    stored = caches['pmg_api'].get(VALIDATORS_KEY_PREFIX + url)
+    if stored and use_stored_validators:
+        if stored['etag']:
+            headers['If-None-Match'] = stored['etag']
+        if stored['last_modified']:
+            headers['If-Modified-Since'] = stored['last_modified']
+
+    response = get_authenticated(url, headers)
+    if headers and response.status_code == 304:
+        return None, stored
+    response.raise_for_status()
+    validators = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    return response.json(), validators
+
+
+def store_validators(url, validators):
+    if validators['etag'] or validators['last_modified']:
+        caches['pmg_api'].set(VALIDATORS_KEY_PREFIX + url, validators, None)
+
+
+def meeting_hash(event):
+    """Return a hash of everything about a meeting that the scraper uses"""
+
+    return hashlib.sha1(json.dumps(event, sort_keys=True)).hexdigest()
+
+
 def all_committees():
     """A generator function to yield all committees from the PMG API"""
 
@@ -306,14 +354,69 @@ class Command(BaseCommand):
         make_option('--meeting',
                     type='int',
                     help='Only process the meeting with this ID',
-                    )
+                    ),
+        make_option('--workers',
+                    type='int',
+                    default=4,
+                    help='The number of committees to fetch at once (with --scrape)',
+                    ),
+        make_option('--refresh',
+                    default=False,
+                    action='store_true',
+                    help="Fetch and process meetings even if they haven't changed (with --scrape)",
+                    ),
+        make_option('--dump-html',
+                    default=False,
+                    action='store_true',
+                    help='Write prettified HTML of each meeting to the cache for debugging',
+                    ),
     )
 
-    def handle_committee(self, committee):
+    def fetch_committee(self, committee):
+        """Fetch the full details of a committee, including its meetings
+
+        This is called from the worker threads, so mustn't touch the
+        database."""
+        try:
+            results, validators = get_authenticated_json_if_modified(
+                committee['url'], use_stored_validators=self.skip_unchanged)
+        except Exception as e:
+            return committee, None, None, e
+        return committee, results, validators, None
+
+    def scrape_committees(self, committees):
+        """Fetch committees concurrently and process them as they arrive
+
+        Committees that haven't changed since they were last scraped
+        are skipped without downloading them again."""
+        pool = ThreadPool(self.options['workers'])
+        try:
+            for committee, full_committee_results, validators, error in \
+                    pool.imap_unordered(self.fetch_committee, committees):
+                if error:
+                    message = u"WARNING: failed to fetch committee {0}: {1}\n"
+                    self.stderr.write(message.format(committee['name'], error))
+                    continue
+                if full_committee_results is None:
+                    self.committees_unchanged += 1
+                    continue
+                self.handle_committee(committee, full_committee_results)
+                # Only now that all its meetings have been saved can
+                # the committee be skipped next time if it's unchanged:
+                if self.options['commit'] and self.process_all_meetings:
+                    store_validators(committee['url'], validators)
+        finally:
+            pool.close()
+            pool.join()
+
+    @property
+    def skip_unchanged(self):
+        return not self.options['refresh'] and self.process_all_meetings
+
+    def handle_committee(self, committee, full_committee_results):
         self.stdout.write("=======================================\n")
         self.stdout.write(
             u"handling committee: {0}\n".format(committee['name']))
-        full_committee_results = get_authenticated_json(committee['url'])
 
         if 'events' not in full_committee_results:
             self.stdout.write("No events for that committee!\n")
@@ -322,6 +425,12 @@ class Command(BaseCommand):
         for i, event in enumerate(full_committee_results['events']):
             if not (self.process_all_meetings or self.specified_meeting(event['id'])):
                 continue
+            hash_key = MEETING_HASH_KEY_PREFIX + str(event['id'])
+            event_hash = meeting_hash(event)
+            if self.skip_unchanged and caches['pmg_api'].get(hash_key) == event_hash:
+                self.meetings_unchanged += 1
+                continue
+            self.meetings_processed += 1
             self.stdout.write(u"committee {0}\n".format(committee['name']))
             msg = "api_committee_id {0} api_meeting_id {1}\n"
             self.stdout.write(msg.format(committee['id'], event['id']))
@@ -342,6 +451,8 @@ class Command(BaseCommand):
                 event['body'],
                 event['chairperson']
             )
+            if self.options['commit']:
+                caches['pmg_api'].set(hash_key, event_hash, None)
 
     def get_meeting_report(self, committee, committee_event):
         api_committee_id = committee['id']
@@ -395,10 +506,14 @@ class Command(BaseCommand):
 
     def get_appearances(self, meeting_report, body, api_chairperson):
         meeting_id = meeting_report.api_meeting_id
-        write_prettified_html(body, meeting_id, 'meeting-body')
+        if self.options['dump_html']:
+            write_prettified_html(body, meeting_id, 'meeting-body')
         body = re.sub(r'&nbsp;', ' ', body)
         body = strip_tags_from_html(body)
-        soup = write_prettified_html(body, meeting_id, 'meeting-body-bleached')
+        if self.options['dump_html']:
+            soup = write_prettified_html(body, meeting_id, 'meeting-body-bleached')
+        else:
+            soup = BeautifulSoup(body)
         chairpeople = api_chairperson or find_chairpeople(soup)
 
         appearances = []
@@ -539,9 +654,24 @@ class Command(BaseCommand):
                 for row in csv.DictReader(f):
                     self.meeting_from_api_id[row['committee_meeting_id']] = row
 
-            for committee in all_committees():
-                if self.process_all_committees or self.specified_committee(committee['id']):
-                    self.handle_committee(committee)
+            if options['workers'] < 1:
+                raise CommandError("--workers must be at least 1")
+
+            self.committees_unchanged = 0
+            self.meetings_unchanged = 0
+            self.meetings_processed = 0
+
+            self.scrape_committees(
+                committee for committee in all_committees()
+                if self.process_all_committees or self.specified_committee(committee['id'])
+            )
+
+            message = "Processed {0} meetings ({1} unchanged meetings and {2} unchanged committees skipped)\n"
+            self.stdout.write(message.format(
+                self.meetings_processed,
+                self.meetings_unchanged,
+                self.committees_unchanged,
+            ))
 
         if options['save_json']:
 
@@ -653,6 +783,9 @@ class Command(BaseCommand):
                     message = 'WARNING: failed to import {0}: {1}'
                     self.stderr.write(message.format(report.id, e))
 
+            if options['commit']:
+                SectionSummary.objects.update_for_section_trees(section_ids)
+
             self.stdout.write(str(section_ids))
             self.stdout.write('\n')
 
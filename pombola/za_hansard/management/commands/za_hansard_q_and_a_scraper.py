@@ -7,10 +7,9 @@ import dateutil.parser
 import string
 import parslepy
 import json
+import multiprocessing
 import time
 
-import subprocess
-
 from datetime import datetime, date, timedelta
 
 from optparse import make_option
@@ -23,7 +22,9 @@ from django.core.exceptions import MultipleObjectsReturned
 
 import requests
 
-from pombola.za_hansard.models import Question, Answer, QuestionPaper
+from pombola.za_hansard.models import (
+    Question, Answer, QuestionPaper, SectionSummary
+)
 from pombola.za_hansard.importers.import_json import ImportJson
 from instances.models import Instance
 
@@ -160,6 +161,11 @@ class Command(BaseCommand):
                     action='store_true',
                     help='Whether to commit SayIt import corrections',
                     ),
+        make_option('--conversion-workers',
+                    default=multiprocessing.cpu_count(),
+                    type='int',
+                    help='The number of answer documents to convert at once (with --process-answers)',
+                    ),
     )
 
     start_url_q = ('http://www.parliament.gov.za/live/',
@@ -477,6 +483,8 @@ class Command(BaseCommand):
 
         self.stdout.write("Processing %d records" % len(unprocessed))
 
+        # First make sure all the documents have been downloaded:
+        row_for_filename = {}
         for row in unprocessed:
             filename = os.path.join(
                 settings.ANSWER_CACHE,
@@ -516,17 +524,37 @@ class Command(BaseCommand):
                         'ERROR BadStatusLine while processing %d (%s)\n' % (row.id, e))
                     continue
 
-            try:
-                text = question_scraper.extract_answer_text_from_word_document(
-                    filename)
+            row_for_filename[filename] = row
+
+        # ... then convert them, in a pool of worker processes if there
+        # are several workers.  The workers don't touch the database;
+        # the answers are all updated here.
+        workers = options['conversion_workers']
+        if workers < 1:
+            raise CommandError("--conversion-workers must be at least 1")
+        if workers > 1:
+            pool = multiprocessing.Pool(workers)
+            results = pool.imap_unordered(
+                question_scraper.convert_answer_document, row_for_filename)
+        else:
+            pool = None
+            results = (
+                question_scraper.convert_answer_document(filename)
+                for filename in row_for_filename)
+
+        try:
+            for filename, text, error in results:
+                row = row_for_filename[filename]
+                if error:
+                    self.stdout.write('%s %d\n' % (error, row.id))
+                    continue
                 row.processed_code = Answer.PROCESSED_OK
                 row.text = text
                 row.save()
-            except subprocess.CalledProcessError:
-                self.stdout.write('ERROR in antiword processing %d\n' % row.id)
-            except UnicodeDecodeError:
-                self.stdout.write(
-                    'ERROR in antiword processing (UnicodeDecodeError) %d\n' % row.id)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
 
     def match_answers(self, *args, **options):
         # Only consider answers that aren't already associated with a
@@ -766,6 +794,9 @@ class Command(BaseCommand):
         self.stdout.write('Questions: Imported %d / %d sections\n' %
                           (len(section_ids), len(questions)))
 
+        SectionSummary.objects.update_for_section_trees(
+            section.id for section in section_ids)
+
         answers = (Answer.objects
                    .filter(sayit_section=None)  # not already imported
                    .filter(processed_code=Answer.PROCESSED_OK)
@@ -796,6 +827,8 @@ class Command(BaseCommand):
         self.stdout.write('Answers: Imported %d / %d sections\n' %
                           (len(section_ids), len(answers)))
 
+        SectionSummary.objects.update_for_section_trees(section_ids)
+
     def correct_existing_sayit_import(self, *args, **options):
         from pombola.slug_helpers.models import SlugRedirect
         instance = None
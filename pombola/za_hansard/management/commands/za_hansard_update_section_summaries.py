@@ -0,0 +1,20 @@
+# This command recalculates the summaries of every SayIt section that
+# has speeches. The summaries are updated when Hansard, committee
+# minutes and questions are imported into SayIt, and the migration that
+# creates the table fills it, so this only needs to be run if speeches
+# have been edited in the SayIt admin.
+
+from django.core.management.base import NoArgsCommand
+
+from pombola.za_hansard.models import SectionSummary
+
+
+class Command(NoArgsCommand):
+
+    help = 'Rebuild the section summaries used by the Hansard, committee and question indexes'
+
+    def handle_noargs(self, **options):
+        SectionSummary.objects.rebuild()
+        if int(options['verbosity']) > 1:
+            print "There are now {0} section summaries".format(
+                SectionSummary.objects.count())
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speeches', '0001_initial'),
+        ('za_hansard', '0004_auto_20190322_1856'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionSummary',
+            fields=[
+                ('section', models.OneToOneField(related_name='summary', primary_key=True, serialize=False, to='speeches.Section')),
+                ('earliest_speech_date', models.DateField(null=True, blank=True)),
+                ('latest_speech_date', models.DateField(db_index=True, null=True, blank=True)),
+                ('speech_count', models.PositiveIntegerField()),
+                ('first_speech_id', models.IntegerField(db_index=True)),
+            ],
+        ),
+    ]
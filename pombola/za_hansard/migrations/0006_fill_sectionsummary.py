@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('za_hansard', '0005_sectionsummary'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            """
+            INSERT INTO za_hansard_sectionsummary
+                (section_id, earliest_speech_date, latest_speech_date,
+                 speech_count, first_speech_id)
+            SELECT section_id, min(start_date), max(start_date), count(*), min(id)
+            FROM speeches_speech
+            WHERE section_id IS NOT NULL
+            GROUP BY section_id
+            """,
+            "DELETE FROM za_hansard_sectionsummary",
+        ),
+    ]
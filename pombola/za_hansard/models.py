@@ -4,10 +4,12 @@ import re
 import httplib2
 import calendar
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from speeches.models import Section
+from speeches.models import Section, Speech
+
+from pombola.search.indexing import update_search_index
 
 HTTPLIB2_HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_3) AppleWebKit/601.4.4 (KHTML, like Gecko) Version/9.0.3 Safari/601.4.4'
@@ -471,4 +473,108 @@ class Question(models.Model):
         # be done in postgres directly, I think.
         # 1) At least one of written_number and oral_number must be non-null.
 
+
+def section_tree_ids(section_ids):
+    """Return the IDs of these sections and all of their descendants"""
+    all_ids = set(section_ids)
+    new_ids = all_ids
+    while new_ids:
+        new_ids = set(
+            Section.objects.filter(parent_id__in=new_ids)
+            .values_list('id', flat=True)) - all_ids
+        all_ids |= new_ids
+    return all_ids
+
+
+def question_sections():
+    """Return the SayIt sections that each hold a question and its answer
+
+    Questions are in a section for each question, inside a section for
+    each minister, inside 'Questions'; only those with speeches (and so
+    a summary) are included."""
+    return Section.objects \
+        .filter(parent__parent__heading='Questions', summary__isnull=False) \
+        .select_related('parent', 'summary')
+
+
+class SectionSummaryManager(models.Manager):
+
+    def update_for_section_trees(self, section_ids):
+        """Update the summaries of these sections and their descendants
+
+        This is for after a document has been imported into SayIt,
+        where the importer only returns the top section it created."""
+        self.update_for_sections(section_tree_ids(section_ids))
+
+    def update_for_sections(self, section_ids, chunk_size=500):
+        """Recalculate the summaries of these sections from their speeches
+
+        Sections that no longer have any speeches lose their summary."""
+        section_ids = sorted(set(s for s in section_ids if s is not None))
+        for i in range(0, len(section_ids), chunk_size):
+            self.recount(section_ids[i:i + chunk_size])
+            # The search index's documents for questions include the
+            # summaries and the text of the speeches:
+            update_search_index(
+                Section,
+                question_sections()
+                .filter(id__in=section_ids[i:i + chunk_size])
+                .prefetch_related('speech_set'))
+
+    def recount(self, section_ids):
+        summaries = Speech.objects.filter(section_id__in=section_ids) \
+            .order_by() \
+            .values('section_id') \
+            .annotate(
+                earliest=models.Min('start_date'),
+                latest=models.Max('start_date'),
+                count=models.Count('id'),
+                first_id=models.Min('id')) \
+            .values_list('section_id', 'earliest', 'latest', 'count', 'first_id')
+
+        with transaction.atomic():
+            self.filter(section_id__in=section_ids).delete()
+            self.bulk_create(
+                (
+                    self.model(
+                        section_id=section_id,
+                        earliest_speech_date=earliest,
+                        latest_speech_date=latest,
+                        speech_count=count,
+                        first_speech_id=first_id,
+                    )
+                    for section_id, earliest, latest, count, first_id in summaries
+                ),
+                batch_size=1000,
+            )
+
+    def rebuild(self):
+        sections_with_speeches = Speech.objects.exclude(section=None) \
+            .order_by() \
+            .values_list('section_id', flat=True) \
+            .distinct()
+        self.exclude(section_id__in=sections_with_speeches).delete()
+        self.update_for_sections(sections_with_speeches)
+
+
+class SectionSummary(models.Model):
+    """The dates, number and first ID of the speeches in a SayIt section
+
+    SayIt sections have no dates of their own, so without this the
+    Hansard, committee and question indexes have to aggregate over the
+    speeches table for every page view."""
+
+    section = models.OneToOneField(
+        Section, primary_key=True, related_name='summary')
+    earliest_speech_date = models.DateField(blank=True, null=True)
+    latest_speech_date = models.DateField(blank=True, null=True, db_index=True)
+    speech_count = models.PositiveIntegerField()
+    first_speech_id = models.IntegerField(db_index=True)
+
+    objects = SectionSummaryManager()
+
+    def __unicode__(self):
+        return u"%s: %d speeches" % (self.section, self.speech_count)
+
+
 # CREATE TABLE completed_documents (`url` string);
@@ -74,6 +74,53 @@ def extract_answer_text_from_word_document(filename):
     return text
 
 
+def converted_answer_text_path(content):
+    """Return where the text converted from an answer document is kept
+
+    The converted text is cached by a hash of the document's
+    contents, so it's reused even if the answer it came from changes
+    or is scraped again."""
+    digest = hashlib.sha1(content).hexdigest()
+    return os.path.join(settings.ANSWER_CACHE, 'text', digest[:2], digest + '.txt')
+
+
+def convert_answer_document(filename):
+    """Extract the text of an answer document, using the cache if possible
+
+    This returns a tuple of the filename, the text and an error
+    message, one of the latter two being None.  It's used from a pool
+    of worker processes, so catches the conversion errors itself
+    rather than raising them."""
+    try:
+        with open(filename, 'rb') as f:
+            text_path = converted_answer_text_path(f.read())
+
+        if os.path.exists(text_path):
+            with open(text_path) as f:
+                return filename, f.read().decode('utf-8'), None
+
+        text = extract_answer_text_from_word_document(filename)
+
+        directory = os.path.dirname(text_path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Another worker may have just created it:
+                if not os.path.isdir(directory):
+                    raise
+        fd, temporary_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            f.write(text.encode('utf-8'))
+        os.rename(temporary_path, text_path)
+
+        return filename, text, None
+    except subprocess.CalledProcessError:
+        return filename, None, 'ERROR in antiword processing'
+    except UnicodeDecodeError:
+        return filename, None, 'ERROR in antiword processing (UnicodeDecodeError)'
+
+
 def check_output_wrapper(*args, **kwargs):
 
     # Python 2.7
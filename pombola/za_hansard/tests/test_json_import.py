@@ -1,14 +1,21 @@
+import json
 import os
+import shutil
+import tempfile
 from datetime import date
 
 from django.core.management import call_command
 from django.utils.unittest import skip
 
+from mock import patch
+
 from instances.tests import InstanceTestCase
 from popolo_name_resolver.resolve import (
     EntityName, ResolvePopoloName, recreate_entities
 )
 
+from speeches.models import Section, Speech
+
 from pombola.za_hansard.importers.import_json import ImportJson
 
 
@@ -118,3 +125,53 @@ class ImportJsonTests(InstanceTestCase):
         self.assertEquals(s0_grandparent.title, 'Top Section')
         self.assertEquals(s1_grandparent.title, 'Top Section')
         self.assertEquals(s0_grandparent.id, s1_grandparent.id)
+
+
+class ImportJsonTaggingTests(InstanceTestCase):
+
+    def setUp(self):
+        super(ImportJsonTaggingTests, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.document_path = os.path.join(self.tmp_dir, 'answer.json')
+        with open(self.document_path, 'w') as f:
+            json.dump({
+                'parent_section_titles': ['Questions', 'Minister of Finance'],
+                'title': 'Question about the budget',
+                'date': '2013-02-18',
+                'speeches': [
+                    {'personname': '', 'text': 'First reply', 'tags': ['answer']},
+                    {'personname': '', 'text': 'Second reply', 'tags': ['answer']},
+                ],
+            }, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @patch('pombola.za_hansard.importers.import_base.update_search_index')
+    def test_speeches_imported_into_existing_section_are_tagged(self, mock_update):
+        # Answers are imported into the section that already has the
+        # question in it:
+        section = Section.objects.get_or_create_with_parents(
+            instance=self.instance,
+            headings=['Questions', 'Minister of Finance', 'Question about the budget'])
+        question = Speech.objects.create(
+            instance=self.instance, section=section, text='The question')
+
+        imported_section = ImportJson(instance=self.instance).import_document(
+            self.document_path)
+
+        self.assertEqual(imported_section, section)
+        self.assertEqual(
+            list(section.speech_set.order_by('id').values_list('text', flat=True)),
+            ['The question', 'First reply', 'Second reply'])
+        self.assertFalse(question.tags.exists())
+        self.assertEqual(
+            sorted(Speech.objects.filter(tags__name='answer').values_list('text', flat=True)),
+            ['First reply', 'Second reply'])
+
+        # The new speeches, and only those, are indexed once:
+        [(model, indexed_speeches), _] = mock_update.call_args
+        self.assertEqual(model, Speech)
+        self.assertEqual(
+            sorted(s.text for s in indexed_speeches),
+            ['First reply', 'Second reply'])
@@ -0,0 +1,49 @@
+from mock import patch, Mock
+from nose.plugins.attrib import attr
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from pombola.za_hansard.management.commands.za_hansard_pmg_api_scraper import (
+    get_authenticated_json_if_modified, store_validators
+)
+
+COMMITTEE_URL = 'https://api.pmg.org.za/committee/1/'
+
+
+def fake_response(status_code, data=None, headers=None):
+    response = Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = data
+    return response
+
+
+# The pmg_api cache is only configured for South Africa:
+@attr(country='south_africa')
+class ConditionalRequestTests(TestCase):
+
+    def setUp(self):
+        caches['pmg_api'].clear()
+
+    @patch('pombola.za_hansard.management.commands.za_hansard_pmg_api_scraper.requests')
+    def test_unchanged_committee_is_not_downloaded_again(self, mock_requests):
+        mock_requests.get.return_value = fake_response(
+            200, {'events': []}, {'ETag': '"abc"'})
+        data, validators = get_authenticated_json_if_modified(COMMITTEE_URL)
+        self.assertEqual(data, {'events': []})
+        store_validators(COMMITTEE_URL, validators)
+
+        mock_requests.get.return_value = fake_response(304)
+        data, validators = get_authenticated_json_if_modified(COMMITTEE_URL)
+        self.assertIsNone(data)
+        headers = mock_requests.get.call_args[1]['headers']
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+
+    @patch('pombola.za_hansard.management.commands.za_hansard_pmg_api_scraper.requests')
+    def test_validators_can_be_ignored(self, mock_requests):
+        store_validators(COMMITTEE_URL, {'etag': '"abc"', 'last_modified': None})
+        mock_requests.get.return_value = fake_response(200, {'events': []})
+        data, validators = get_authenticated_json_if_modified(
+            COMMITTEE_URL, use_stored_validators=False)
+        self.assertEqual(data, {'events': []})
+        headers = mock_requests.get.call_args[1]['headers']
+        self.assertNotIn('If-None-Match', headers)
@@ -4,6 +4,8 @@ from mock import patch
 import os
 import re
 import requests
+import shutil
+import tempfile
 import datetime
 import json
 import lxml.etree
@@ -41,6 +43,25 @@ class ZAAnswerTests(TestCase):
 
         self.assertEqual(text, expected)
 
+    def test_converted_answer_text_is_cached(self):
+        input_doc_file = sample_file('answer_1.doc')
+        expected = open(sample_file('answer_1_expected.txt')).read().decode('UTF-8')
+        cache_dir = tempfile.mkdtemp()
+        try:
+            with self.settings(ANSWER_CACHE=cache_dir):
+                self.assertEqual(
+                    question_scraper.convert_answer_document(input_doc_file),
+                    (input_doc_file, expected, None))
+
+                # The second time, the text should come from the cache:
+                with patch.object(question_scraper, 'extract_answer_text_from_word_document') as extract:
+                    self.assertEqual(
+                        question_scraper.convert_answer_document(input_doc_file),
+                        (input_doc_file, expected, None))
+                    self.assertFalse(extract.called)
+        finally:
+            shutil.rmtree(cache_dir)
+
 
 class ZAIteratorBaseMixin(object):
 
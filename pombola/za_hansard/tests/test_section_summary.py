@@ -0,0 +1,51 @@
+from datetime import date, time
+
+from django.test import TestCase
+
+from speeches.models import Section, Speech
+from speeches.tests import create_sections
+
+from ..models import SectionSummary
+
+
+class SectionSummaryTests(TestCase):
+
+    def setUp(self):
+        create_sections([
+            {
+                'heading': u"Committee Minutes",
+                'subsections': [
+                    {   'heading': u"Agriculture, Forestry and Fisheries",
+                        'subsections': [
+                            {   'heading': u"16 November 2012",
+                                'speeches': [ 3, date(2013, 2, 18), time(12, 0) ],
+                            },
+                            {   'heading': u"Empty section",
+                            },
+                        ],
+                    },
+                ],
+            },
+        ])
+        self.top_section = Section.objects.get(heading=u"Committee Minutes")
+        self.section = Section.objects.get(heading=u"16 November 2012")
+
+    def test_update_for_section_trees(self):
+        SectionSummary.objects.update_for_section_trees([self.top_section.id])
+
+        summary = SectionSummary.objects.get()
+        self.assertEqual(summary.section, self.section)
+        self.assertEqual(summary.speech_count, 3)
+        self.assertEqual(summary.earliest_speech_date, date(2013, 2, 18))
+        self.assertEqual(summary.latest_speech_date, date(2013, 2, 18))
+        self.assertEqual(
+            summary.first_speech_id,
+            Speech.objects.filter(section=self.section).order_by('id')[0].id)
+
+    def test_summary_removed_when_speeches_are_deleted(self):
+        SectionSummary.objects.rebuild()
+        self.assertEqual(SectionSummary.objects.count(), 1)
+
+        Speech.objects.filter(section=self.section).delete()
+        SectionSummary.objects.update_for_sections([self.section.id])
+        self.assertEqual(SectionSummary.objects.count(), 0)